@@ -5,22 +5,16 @@ from stores.serializer import StoreListSerializer, StoreSerializer, BookingStore
 from users.serializer import TinyUserSerializer
 from stores.serializer import BookingStoreList
 from stores.models import Store
+from common.serializers import DateTimeColumn, Method, ValuesSerializer, wants
+from django.db.models import F
+from django.utils.functional import cached_property
 
 
 
 class BookingStoreSerializer(ModelSerializer):
-    # photos = serializers.JSONField(required=False)
-
-    photos = serializers.SerializerMethodField()
-
-    def get_photos(self, store):
-        if store.store_photo:
-            return [store.store_photo]
-        return []
-    
     class Meta:
         model = Store
-        fields = ("pk", "name", "photos",  "created_at")
+        fields = ("pk", "name", "cover_photo",  "created_at")
 
 
 class BookingSerializer(ModelSerializer):
@@ -30,3 +24,47 @@ class BookingSerializer(ModelSerializer):
     class Meta:
         model = Booking
         fields = ("pk", "store")
+
+
+class BookingStoreValuesSerializer(ValuesSerializer):
+    """BookingStoreSerializer 와 같은 출력을 .values() row로 만든다."""
+
+    fields = {
+        "pk": "pk",
+        "name": "name",
+        "cover_photo": "cover_photo",
+        "created_at": DateTimeColumn("created_at"),
+    }
+
+
+class BookingValuesSerializer(ValuesSerializer):
+    """BookingSerializer 와 같은 출력. 찜한 store는 모든 booking 것을 한 번의 쿼리로 읽는다 (store pk 순)."""
+
+    fields = {
+        "pk": "pk",
+        "store": Method(),
+    }
+
+    @classmethod
+    def from_queryset(cls, queryset, context=None):
+        context = context or {}
+        rows = list(queryset.values(*cls.columns_for(context.get("fields"))))
+        if not wants(context.get("fields"), "store"):
+            return cls(rows, context=context)
+        store_rows = list(
+            Store.objects.filter(bookings__in=[row["pk"] for row in rows])
+            .values(*BookingStoreValuesSerializer.columns, booking_pk=F("bookings"))
+            .order_by("pk")
+        )
+        return cls(rows, context={**context, "store_rows": store_rows})
+
+    @cached_property
+    def stores_by_booking(self):
+        store_rows = self.context["store_rows"]
+        stores = {}
+        for store_row, store in zip(store_rows, BookingStoreValuesSerializer(store_rows).data):
+            stores.setdefault(store_row["booking_pk"], []).append(store)
+        return stores
+
+    def get_store(self, row):
+        return self.stores_by_booking.get(row["pk"], [])
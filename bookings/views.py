@@ -8,8 +8,10 @@ from django.db.models import Prefetch #모델을 통해 직접 필터링하는 
 import jwt
 
 from .models import Booking
-from .serializers import BookingSerializer, BookingStoreSerializer
+from .serializers import BookingSerializer, BookingStoreSerializer, BookingValuesSerializer
 from stores.models import Store
+from common.serializers import requested_fields
+from config.schema import FIELDS_PARAMETERS
 
 # swagger 추가
 from drf_yasg.utils import swagger_auto_schema
@@ -27,7 +29,7 @@ class Bookings(APIView):
             openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER),
             openapi.Parameter('keyword', openapi.IN_QUERY, description="Keyword to search stores", type=openapi.TYPE_STRING),
             openapi.Parameter('type', openapi.IN_QUERY, description="Type of store", type=openapi.TYPE_STRING, multiple=True),
-        ]
+        ] + FIELDS_PARAMETERS
     )
 
 
@@ -55,13 +57,17 @@ class Bookings(APIView):
         end = start + page_size
 
         # 사용자의 모든 예약된 상점 가져오기
-        # prefetch_related: 조인을 하지 않고 개별 쿼리를 실행 후, django에서 직접 데이터 조합
+        # prefetch_related 대신 BookingValuesSerializer가 store를 한 번의 쿼리로 읽어 조합한다.
         # user_bookings = Booking.objects.filter(user__username=request.user.username).prefetch_related('store')
-        user_bookings = Booking.objects.filter(user__kakao_id=kakao_id).prefetch_related('store')
+        user_bookings = Booking.objects.filter(user__kakao_id=kakao_id)
         
         paginated_bookings = user_bookings[start:end]
 
-        serializer = BookingSerializer(paginated_bookings, many=True, context={"request": request})
+        fields = requested_fields(request, BookingValuesSerializer.field_names())
+        serializer = BookingValuesSerializer.from_queryset(
+            paginated_bookings,
+            context={"request": request, "fields": fields},
+        )
         return Response(serializer.data)
 
 
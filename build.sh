@@ -8,11 +8,17 @@ pip install --no-cache-dir setuptools
 # Install dependencies
 pip install --no-cache-dir -r requirements.txt
 
+# Generate the OpenAPI schema once (served as a static file, see config/schema.py)
+mkdir -p generated_static/schema
+python manage.py generate_swagger -f json -o generated_static/schema/openapi.json --overwrite
+
 # Collect static files
 python manage.py collectstatic --no-input
 
-# Apply database migrations
-python manage.py migrate
+# Apply database migrations (같은 DB를 쓰는 다른 서비스는 SKIP_MIGRATE=1)
+if [ "${SKIP_MIGRATE:-0}" != "1" ]; then
+    python manage.py migrate
+fi
 
 # Start the application server
 exec "$@"
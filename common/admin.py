@@ -1,3 +1,50 @@
 from django.contrib import admin
+from .models import Job, Photo
 
-# Register your models here.
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "name",
+        "status",
+        "attempts",
+        "run_at",
+        "wait_ms",
+        "duration_ms",
+        "progress",
+        "locked_by",
+        "created_at",
+    )
+    list_filter = (
+        "status",
+        "name",
+    )
+    readonly_fields = (
+        "created_at",
+        "updated_at",
+        "started_at",
+        "finished_at",
+        "wait_ms",
+        "duration_ms",
+    )
+
+
+@admin.register(Photo)
+class PhotoAdmin(admin.ModelAdmin):
+    list_display = (
+        "key",
+        "owner",
+        "status",
+        "width",
+        "height",
+        "file_size",
+        "created_at",
+    )
+    list_filter = ("status",)
+    raw_id_fields = ("owner",)
+    readonly_fields = (
+        "key",
+        "variants",
+        "created_at",
+        "updated_at",
+    )
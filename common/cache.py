@@ -0,0 +1,55 @@
+"""
+versioned cache
+
+계산 결과를 "<이름>:<version>:<key>" 로 cache 에 넣고, 데이터가 바뀌면 version 만 올린다. (bump)
+예전 key 는 다시 읽히지 않고 timeout 이 지나면 사라지므로 key 를 하나씩 지울 필요가 없다.
+
+version 은 cache 가 아니라 DB(CacheVersion)에 둔다. cache 가 process 마다 따로인 locmem 이어도
+모든 worker 가 같은 version 을 보고, replica 에서 읽으면 데이터와 version 이 같이 늦는다.
+
+    def facets(...):
+        return cached("stores.facets", params, lambda: compute(...), timeout=300)
+
+    bump("stores.facets")  # 데이터를 바꾼 뒤 (transaction commit 후)
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import CacheVersion
+
+
+def version(name):
+    """name 의 현재 version (한 번의 쿼리, 한 번도 bump 하지 않았으면 1)"""
+    return CacheVersion.objects.filter(name=name).values_list("version", flat=True).first() or 1
+
+
+def bump(name):
+    """name 의 version 을 올려 지금까지 cache 한 값을 모두 버린다."""
+    if CacheVersion.objects.filter(name=name).update(version=F("version") + 1):
+        return
+    try:
+        with transaction.atomic():
+            CacheVersion.objects.create(name=name, version=2)
+    except IntegrityError:
+        # 다른 요청이 먼저 만들었다.
+        CacheVersion.objects.filter(name=name).update(version=F("version") + 1)
+
+
+def bump_on_commit(name):
+    """transaction 이 commit 된 뒤에 bump 한다. (commit 전 데이터를 새 version 으로 cache 하지 않도록)"""
+    transaction.on_commit(lambda: bump(name))
+
+
+def cached(name, key, compute, timeout=None):
+    """name 의 현재 version 으로 key 의 값을 cache 에서 읽고, 없으면 compute() 해서 넣는다."""
+    digest = hashlib.md5(repr(key).encode()).hexdigest()
+    cache_key = f"{name}:{version(name)}:{digest}"
+    value = cache.get(cache_key)
+    if value is None:
+        value = compute()
+        cache.set(cache_key, value, timeout)
+    return value
@@ -0,0 +1,262 @@
+"""
+thread-safe DB connection pool
+
+driver에 의존하지 않도록 connect/ping/reset/close 를 함수로 받는다.
+common.db.pooled_postgresql backend가 psycopg2 connection으로 사용하고, 테스트는 가짜 connection으로 검증한다.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """timeout 안에 connection을 얻지 못한 경우"""
+
+
+class _Entry:
+    __slots__ = ("connection", "created_at", "released_at")
+
+    def __init__(self, connection, now):
+        self.connection = connection
+        self.created_at = now
+        self.released_at = now
+
+
+class ConnectionPool:
+
+    def __init__(
+        self,
+        connect,
+        min_size=1,
+        max_size=10,
+        timeout=10.0,
+        max_lifetime=30 * 60,
+        max_idle=10 * 60,
+        ping_after=1.0,
+        ping=None,
+        reset=None,
+        close=None,
+        stats_interval=60.0,
+        name="default",
+    ):
+        if not 0 <= min_size <= max_size:
+            raise ValueError("0 <= min_size <= max_size 이어야 합니다.")
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle  # min_size 보다 많은 connection 중 이 시간(초) 이상 놀던 것은 maintain()이 닫는다.
+        self.ping_after = ping_after  # 이 시간(초) 이상 놀던 connection만 꺼낼 때 ping 한다.
+        self.ping = ping
+        self.reset = reset
+        self.close_connection = close or (lambda connection: connection.close())
+        self.stats_interval = stats_interval
+        self.name = name
+        self.pid = os.getpid()
+        self.closed = False
+
+        self._idle = deque()
+        self._in_use = {}  # id(connection) -> _Entry
+        self._opening = 0
+        self._cond = threading.Condition()
+        self._last_stats = time.monotonic()
+        self.counters = {
+            "created": 0,
+            "closed": 0,
+            "acquired": 0,
+            "waited": 0,
+            "timeouts": 0,
+            "ping_failures": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+        }
+
+    @property
+    def size(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def warm(self):
+        """min_size 만큼 미리 연결해 둔다. (worker 시작 시 호출)"""
+        while True:
+            with self._cond:
+                if self.closed or self.size >= self.min_size:
+                    return
+                self._opening += 1
+            entry = self._open()
+            with self._cond:
+                self._opening -= 1
+            self._add_idle(entry)
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        while True:
+            with self._cond:
+                if self._idle:
+                    entry = self._idle.pop()  # 최근에 쓴 connection부터 (LIFO)
+                    self._in_use[id(entry.connection)] = entry
+                elif self.size < self.max_size:
+                    entry = None
+                    self._opening += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters["timeouts"] += 1
+                        logger.warning("pool %s: no connection within %.1fs (size=%s)", self.name, self.timeout, self.size)
+                        raise PoolTimeout(f"{self.timeout}s 안에 DB connection을 얻지 못했습니다.")
+                    waited = True
+                    self._cond.wait(remaining)
+                    continue
+
+            if entry is None:
+                entry = self._open()
+                with self._cond:
+                    self._opening -= 1
+                    self._in_use[id(entry.connection)] = entry
+            elif not self._healthy(entry):
+                with self._cond:
+                    del self._in_use[id(entry.connection)]
+                self._discard(entry)
+                continue
+
+            with self._cond:
+                self._record_wait(start, waited)
+            return entry.connection
+
+    def release(self, connection, discard=False):
+        with self._cond:
+            entry = self._in_use.pop(id(connection), None)
+        if entry is None:
+            # pool 밖에서 만들어진 connection
+            self.close_connection(connection)
+            return
+        if not discard and self.reset is not None:
+            try:
+                self.reset(connection)
+            except Exception:
+                logger.warning("pool %s: failed to reset connection, discarding", self.name, exc_info=True)
+                discard = True
+        if discard or self.closed or self._expired(entry, time.monotonic()):
+            self._discard(entry)
+            return
+        entry.released_at = time.monotonic()
+        self._add_idle(entry)
+
+    def maintain(self):
+        """놀던 connection을 정리하고 min_size 까지 다시 채운다. (background thread가 주기적으로 호출)
+
+        - 수명(max_lifetime)이 지난 idle connection은 닫는다.
+        - min_size 를 넘는 connection 중 max_idle 이상 놀던 것은 닫는다. (오래 논 것부터)
+        - 버리거나 만료된 만큼 줄어든 pool을 min_size 까지 다시 연결한다.
+        """
+        now = time.monotonic()
+        closing = []
+        with self._cond:
+            keep = deque()
+            for entry in self._idle:
+                if self._expired(entry, now):
+                    closing.append(entry)
+                else:
+                    keep.append(entry)
+            # 왼쪽이 가장 오래 놀던 connection (acquire 는 오른쪽에서 꺼낸다)
+            while (
+                keep
+                and self.max_idle
+                and len(keep) + len(self._in_use) + self._opening > self.min_size
+                and now - keep[0].released_at >= self.max_idle
+            ):
+                closing.append(keep.popleft())
+            self._idle = keep
+        for entry in closing:
+            self._close(entry)
+        self.warm()
+        return len(closing)
+
+    def close_all(self):
+        """idle connection을 모두 닫고, 사용 중인 connection은 반납할 때 닫는다."""
+        with self._cond:
+            self.closed = True
+            idle, self._idle = list(self._idle), deque()
+        for entry in idle:
+            self._close(entry)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self.counters)
+            stats.update(size=self.size, idle=len(self._idle), in_use=len(self._in_use))
+        acquired = stats["acquired"] or 1
+        stats["wait_ms_avg"] = stats["wait_ms_total"] / acquired
+        return stats
+
+    def _open(self):
+        try:
+            connection = self.connect()
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.counters["created"] += 1
+        return _Entry(connection, time.monotonic())
+
+    def _add_idle(self, entry):
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def _expired(self, entry, now):
+        return bool(self.max_lifetime) and now - entry.created_at >= self.max_lifetime
+
+    def _healthy(self, entry):
+        now = time.monotonic()
+        if self._expired(entry, now):
+            return False
+        if self.ping is None or now - entry.released_at < self.ping_after:
+            return True
+        try:
+            self.ping(entry.connection)
+            return True
+        except Exception:
+            with self._cond:
+                self.counters["ping_failures"] += 1
+            return False
+
+    def _discard(self, entry):
+        # 자리가 났으므로 기다리는 thread를 깨운다.
+        self._close(entry)
+        with self._cond:
+            self._cond.notify()
+
+    def _close(self, entry):
+        try:
+            self.close_connection(entry.connection)
+        except Exception:
+            pass
+        with self._cond:
+            self.counters["closed"] += 1
+
+    def _record_wait(self, start, waited):
+        # self._cond를 잡은 상태에서 호출된다.
+        wait_ms = (time.monotonic() - start) * 1000
+        counters = self.counters
+        counters["acquired"] += 1
+        counters["wait_ms_total"] += wait_ms
+        counters["wait_ms_max"] = max(counters["wait_ms_max"], wait_ms)
+        if waited:
+            counters["waited"] += 1
+        now = time.monotonic()
+        if self.stats_interval and now - self._last_stats >= self.stats_interval:
+            self._last_stats = now
+            logger.info(
+                "pool %s: size=%s idle=%s in_use=%s acquired=%s waited=%s timeouts=%s wait_ms_max=%.1f",
+                self.name, self.size, len(self._idle), len(self._in_use), counters["acquired"],
+                counters["waited"], counters["timeouts"], counters["wait_ms_max"],
+            )
@@ -0,0 +1,166 @@
+"""
+connection pool을 쓰는 PostgreSQL backend (Django 5.0에는 내장 pool이 없다)
+
+    DATABASES["default"] = dj_database_url.config(engine="common.db.pooled_postgresql", conn_max_age=0)
+    DATABASES["default"]["POOL"] = {"MIN_SIZE": 2, "MAX_SIZE": 10}
+
+Django가 요청이 끝날 때 connection을 닫으면(CONN_MAX_AGE=0) 실제로 끊지 않고 process 공용 pool에 돌려준다.
+다음 요청은 pool에서 꺼내 쓰므로 TCP/TLS/인증 handshake 비용이 요청 시간에서 빠진다.
+
+POOL 옵션 (초 단위)
+- MIN_SIZE / MAX_SIZE : worker process 당 유지할 최소 / 최대 connection 수
+- TIMEOUT             : MAX_SIZE 를 다 쓰고 있을 때 기다리는 최대 시간
+- MAX_LIFETIME        : 이 시간 이상 된 connection은 반납할 때 닫고 새로 연결
+- MAX_IDLE            : MIN_SIZE 를 넘는 connection 중 이 시간 이상 놀던 것은 닫는다
+- PING_AFTER          : 이 시간 이상 놀던 connection은 꺼낼 때 SELECT 1 로 확인 (pre-ping)
+- MAINTAIN_INTERVAL   : idle 정리 / MIN_SIZE 재연결(ConnectionPool.maintain) 간격
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from common.db.pool import ConnectionPool, PoolTimeout
+from .creation import DatabaseCreation
+
+logger = logging.getLogger("common.db.pool")
+
+DEFAULT_POOL_OPTIONS = {
+    "MIN_SIZE": 1,
+    "MAX_SIZE": 10,
+    "TIMEOUT": 10.0,
+    "MAX_LIFETIME": 30 * 60,
+    "MAX_IDLE": 10 * 60,
+    "PING_AFTER": 1.0,
+    "MAINTAIN_INTERVAL": 30.0,
+    "STATS_INTERVAL": 60.0,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def ping(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    if not connection.autocommit:
+        # SELECT 1 이 연 transaction 이 남아 있으면 Django 가 autocommit 을 바꾸지 못한다.
+        connection.rollback()
+
+
+def connect(conn_params, isolation_level=None):
+    """postgresql backend의 get_new_connection 에서 wrapper와 상관없는 부분 (pool이 wrapper를 붙잡지 않도록)"""
+    connection = base.Database.connect(**conn_params)
+    # Django 를 거치지 않고 미리 연결한(warm) connection 도 Django 가 연결한 것처럼 autocommit 으로 둔다.
+    # (driver 기본값인 autocommit=False 면 ping 이 transaction 을 열어 두고, 꺼낸 뒤 set_autocommit 이 실패한다)
+    connection.autocommit = True
+    if isolation_level is not None:
+        connection.isolation_level = isolation_level
+    if not base.is_psycopg3:
+        # JSONField 를 두 번 decode 하지 않도록 (Django 와 같은 설정)
+        base.psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+    return connection
+
+
+def reset(connection):
+    # 열린 transaction이 남은 connection을 다른 요청에 넘기지 않는다.
+    if connection.closed:
+        raise base.Database.InterfaceError("connection already closed")
+    if connection.get_transaction_status() != base.Database.extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+
+
+def get_pool(key):
+    pool = _pools.get(key)
+    # preload 후 fork 된 worker는 부모의 socket을 쓰면 안 되므로 새 pool을 만든다.
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    return None
+
+
+def close_pool(key):
+    pool = _pools.pop(key, None)
+    if pool is not None and pool.pid == os.getpid():
+        pool.close_all()
+
+
+def pool_stats():
+    return {pool.name: pool.stats() for pool in _pools.values() if pool.pid == os.getpid()}
+
+
+def _maintain(key, pool, interval):
+    # 처음 connection은 요청한 thread가 직접 연결하므로 MIN_SIZE 가 1보다 클 때만 바로 채운다.
+    first = pool.min_size > 1
+    # pool 이 닫히거나(close_pool) 다른 pool 로 바뀌면 끝난다.
+    while not pool.closed and _pools.get(key) is pool:
+        if not first:
+            time.sleep(interval)
+        first = False
+        try:
+            pool.maintain()
+        except Exception:
+            logger.warning("pool %s: failed to open MIN_SIZE connections", pool.name, exc_info=True)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self):
+        # 테스트 DB로 바뀌는 경우처럼 NAME이 달라지면 다른 pool을 쓴다.
+        key = (self.alias, self.settings_dict["NAME"])
+        pool = get_pool(key)
+        if pool is not None:
+            return pool
+        with _pools_lock:
+            pool = get_pool(key)
+            if pool is None:
+                options = {**DEFAULT_POOL_OPTIONS, **self.settings_dict.get("POOL", {})}
+                isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+                pool = _pools[key] = ConnectionPool(
+                    connect=functools.partial(
+                        connect,
+                        self.get_connection_params(),
+                        None if isolation_level is None else IsolationLevel(isolation_level),
+                    ),
+                    min_size=options["MIN_SIZE"],
+                    max_size=options["MAX_SIZE"],
+                    timeout=options["TIMEOUT"],
+                    max_lifetime=options["MAX_LIFETIME"],
+                    max_idle=options["MAX_IDLE"],
+                    ping_after=options["PING_AFTER"],
+                    ping=ping,
+                    reset=reset,
+                    stats_interval=options["STATS_INTERVAL"],
+                    name=self.alias,
+                )
+                threading.Thread(
+                    target=_maintain, args=(key, pool, options["MAINTAIN_INTERVAL"]), daemon=True
+                ).start()
+        return pool
+
+    def get_new_connection(self, conn_params):
+        try:
+            connection = self.pool.acquire()
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+        # 원래 get_new_connection 이 wrapper에 설정하던 값 (connection 쪽 설정은 처음 연결할 때 끝났다)
+        self.isolation_level = IsolationLevel(
+            self.settings_dict["OPTIONS"].get("isolation_level", IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def close_pool(self):
+        """이 connection을 닫고 process의 pool도 닫는다. (preload 한 부모 process가 fork 전에 호출)"""
+        self.close()
+        close_pool((self.alias, self.settings_dict["NAME"]))
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.release(self.connection)
@@ -0,0 +1,11 @@
+from django.db.backends.postgresql.creation import DatabaseCreation as PostgresDatabaseCreation
+
+
+class DatabaseCreation(PostgresDatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # pool에 남은 idle connection이 있으면 DROP DATABASE 가 실패한다.
+        from .base import close_pool
+
+        close_pool((self.connection.alias, test_database_name))
+        super()._destroy_test_db(test_database_name, verbosity)
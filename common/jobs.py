@@ -0,0 +1,231 @@
+"""
+DB 기반 background job queue
+
+요청 안에서 처리하기 무거운 작업(대량 cascade 삭제, 외부 API 호출, 집계 재계산 등)을
+jobs 테이블에 넣어두고 `python manage.py run_workers` 가 꺼내서 실행한다.
+별도 broker(redis, rabbitmq) 없이 기존 DB만 사용한다.
+
+    from common.jobs import task, enqueue
+
+    @task("stores.purge")
+    def purge_store(job, store_pk):
+        ...
+
+    enqueue("stores.purge", {"store_pk": 1})
+
+task 함수는 각 app의 `tasks.py` 에 정의하면 CommonConfig.ready() 에서 자동으로 import 된다.
+"""
+
+import logging
+import random
+import socket
+import os
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(name):
+    """함수를 job 이름으로 등록한다. 등록된 함수는 (job, **payload) 로 호출된다."""
+
+    def decorator(func):
+        _registry[name] = func
+        func.job_name = name
+        return func
+
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"등록되지 않은 job 입니다: {name}")
+
+
+def enqueue(name, payload=None, delay=None, max_attempts=None):
+    """job을 저장하고 바로 반환한다. 실제 실행은 worker가 한다."""
+    if callable(name):
+        name = name.job_name
+    run_at = timezone.now()
+    if delay:
+        run_at += timedelta(seconds=delay)
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        run_at=run_at,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def backoff(attempts):
+    """재시도 대기 시간(초): base * 2^(attempts-1), 최대 JOB_RETRY_MAX_SECONDS, ±10% jitter"""
+    delay = min(
+        settings.JOB_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)),
+        settings.JOB_RETRY_MAX_SECONDS,
+    )
+    return delay * random.uniform(0.9, 1.1)
+
+
+def heartbeat(worker, pks, now=None):
+    """실행 중인 job의 locked_at 을 갱신해 살아 있다고 알린다. worker가 JOB_HEARTBEAT_SECONDS 마다 호출한다."""
+    if not pks:
+        return 0
+    return Job.objects.filter(
+        pk__in=pks,
+        status=Job.StatusChoices.RUNNING,
+        locked_by=worker,
+    ).update(locked_at=now or timezone.now())
+
+
+def requeue_stale(now=None):
+    """heartbeat 가 JOB_LOCK_TIMEOUT 이상 끊긴 job(죽은 worker)을 다시 대기열에 넣는다.
+
+    claim 에서 이미 attempts 를 올렸으므로 한 번의 실행 시도로 센다.
+    worker를 계속 죽이는 job이 무한히 다시 실행되지 않도록 max_attempts 에 닿으면 FAILED 로 둔다.
+    """
+    now = now or timezone.now()
+    stale = Job.objects.filter(
+        status=Job.StatusChoices.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT),
+    )
+    error = f"worker lost: no heartbeat for {settings.JOB_LOCK_TIMEOUT}s"
+    requeued = 0
+    for pk, attempts, max_attempts, locked_at in stale.values_list("pk", "attempts", "max_attempts", "locked_at"):
+        if attempts >= max_attempts:
+            fields = dict(status=Job.StatusChoices.FAILED, finished_at=now)
+            logger.error("job %s lost its worker, failed permanently after %s attempts", pk, attempts)
+        else:
+            fields = dict(status=Job.StatusChoices.QUEUED, run_at=now + timedelta(seconds=backoff(attempts)))
+            logger.warning("job %s lost its worker, retry at %s", pk, fields["run_at"])
+        # 그 사이 heartbeat 가 들어왔으면(locked_at 변경) 건드리지 않는다.
+        requeued += Job.objects.filter(
+            pk=pk, status=Job.StatusChoices.RUNNING, locked_at=locked_at
+        ).update(locked_by="", locked_at=None, last_error=error, **fields)
+    return requeued
+
+
+def claim(worker, batch=1):
+    """실행할 job을 최대 batch 개 가져와 RUNNING 으로 표시하고 pk 목록을 반환한다.
+
+    Postgres 처럼 SKIP LOCKED 를 지원하면 다른 worker가 잡고 있는 row를 건너뛰고,
+    SQLite 에서는 status 조건부 UPDATE(compare-and-set)로 row 단위 lock을 흉내낸다.
+    """
+    now = timezone.now()
+    ready = Job.objects.filter(
+        status=Job.StatusChoices.QUEUED,
+        run_at__lte=now,
+    ).order_by("run_at", "pk")
+    claimed_fields = dict(
+        status=Job.StatusChoices.RUNNING,
+        locked_by=worker,
+        locked_at=now,
+        attempts=F("attempts") + 1,
+    )
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pks = list(
+                ready.select_for_update(skip_locked=True).values_list("pk", flat=True)[:batch]
+            )
+            Job.objects.filter(pk__in=pks).update(**claimed_fields)
+        return pks
+
+    pks = []
+    for pk in ready.values_list("pk", flat=True)[:batch]:
+        won = Job.objects.filter(pk=pk, status=Job.StatusChoices.QUEUED).update(**claimed_fields)
+        if won:
+            pks.append(pk)
+    return pks
+
+
+def run_job(pk):
+    """claim 된 job 하나를 실행하고 결과/지표를 기록한다. (이름, 실행 시간(ms), 성공 여부)를 반환한다."""
+    job = Job.objects.get(pk=pk)
+    started = timezone.now()
+    wait_ms = (started - job.run_at).total_seconds() * 1000
+    start = time.perf_counter()
+    try:
+        get_task(job.name)(job, **job.payload)
+    except Exception:
+        duration_ms = (time.perf_counter() - start) * 1000
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            status = Job.StatusChoices.FAILED
+            run_at = job.run_at
+            logger.error("job %s failed permanently after %s attempts", job, job.attempts)
+        else:
+            status = Job.StatusChoices.QUEUED
+            run_at = timezone.now() + timedelta(seconds=backoff(job.attempts))
+            logger.warning("job %s failed, retry at %s", job, run_at)
+        Job.objects.filter(pk=pk).update(
+            status=status,
+            run_at=run_at,
+            locked_by="",
+            locked_at=None,
+            started_at=started,
+            finished_at=timezone.now(),
+            wait_ms=wait_ms,
+            duration_ms=duration_ms,
+            last_error=error,
+        )
+        return job.name, duration_ms, False
+
+    duration_ms = (time.perf_counter() - start) * 1000
+    Job.objects.filter(pk=pk).update(
+        status=Job.StatusChoices.DONE,
+        locked_by="",
+        locked_at=None,
+        started_at=started,
+        finished_at=timezone.now(),
+        wait_ms=wait_ms,
+        duration_ms=duration_ms,
+        last_error="",
+    )
+    return job.name, duration_ms, True
+
+
+def delete_in_batches(queryset, batch_size=None, job=None, label=None):
+    """queryset을 batch_size 개씩 나눠 삭제한다. 한 번에 큰 트랜잭션/lock을 잡지 않기 위해 사용한다."""
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    model = queryset.model
+    label = label or model._meta.label_lower
+    # 한 job 이 같은 label 로 여러 번 지우면(purge_user 가 store 마다 purge_store) 진행 상황에 수를 더한다.
+    before = job.progress.get(label, 0) if job is not None else 0
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        model._base_manager.filter(pk__in=pks).delete()
+        deleted += len(pks)
+        if job is not None:
+            job.update_progress(**{label: before + deleted})
+
+
+def run_pending(worker=None, batch=100):
+    """테스트/관리용: 대기 중인 job을 현재 thread에서 모두 실행한다."""
+    worker = worker or worker_id()
+    done = 0
+    while True:
+        pks = claim(worker, batch=batch)
+        if not pks:
+            return done
+        for pk in pks:
+            run_job(pk)
+            done += 1
@@ -0,0 +1,96 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max
+from django.db.models.functions import Floor
+
+from stores import clusters, geo
+from stores.models import Store
+from users.models import User
+
+SEOUL = (37.42, 37.70, 126.80, 127.18)
+KOREA = (33.1, 38.6, 125.0, 129.6)
+KINDS = ("food", "cafe")
+
+
+class Command(BaseCommand):
+    help = "stores/clusters 를 StoreCell 집계와 Store 전체 GROUP BY 로 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stores", type=int, default=200_000)
+        parser.add_argument("--repeat", type=int, default=5, help="zoom 마다 검색할 화면 수")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        # 측정용 데이터는 끝나면 rollback 한다.
+        with transaction.atomic():
+            start = time.perf_counter()
+            self.seed(options["stores"], rng)
+            self.stdout.write(f"{options['stores']} stores 생성 {time.perf_counter() - start:.0f}s (서울 60%, 전국 40%)")
+            start = time.perf_counter()
+            cells = clusters.rebuild()
+            self.stdout.write(f"rebuild {cells} cells {time.perf_counter() - start:.1f}s")
+
+            # zoom 별 화면 크기 (지도 1280x800px 정도)
+            for zoom in (7, 10, 12, 14):
+                width = 360 / (1 << zoom) * 5
+                boxes = []
+                for _ in range(options["repeat"]):
+                    lat, lng = rng.uniform(*SEOUL[:2]), rng.uniform(*SEOUL[2:])
+                    boxes.append((lat - width / 3, lat + width / 3, lng - width / 2, lng + width / 2))
+                self.run(zoom, boxes)
+
+            # signal 로 store 하나를 옮길 때 드는 시간
+            timings = []
+            for store in Store.objects.order_by("?")[:20]:
+                store.latitude, store.longitude = rng.uniform(*SEOUL[:2]), rng.uniform(*SEOUL[2:])
+                start = time.perf_counter()
+                store.save()
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(f"store 위치 변경 (save + cell 갱신) {statistics.median(timings):.1f}ms")
+            transaction.set_rollback(True)
+
+    def seed(self, count, rng):
+        owner = User.objects.create(username="bench-clusters")
+        batch = []
+        for i in range(count):
+            box = SEOUL if rng.random() < 0.6 else KOREA
+            latitude, longitude = rng.uniform(*box[:2]), rng.uniform(*box[2:])
+            batch.append(Store(
+                name=f"가게 {i}", description="desc", description_excerpt="desc", kind_menu=rng.choice(KINDS),
+                city="", owner=owner, latitude=latitude, longitude=longitude, geocell=geo.encode(latitude, longitude),
+                pet_friendly=rng.random() < 0.2,
+            ))
+            if len(batch) == 10_000:
+                Store.objects.bulk_create(batch)
+                batch = []
+        Store.objects.bulk_create(batch)
+
+    def run(self, zoom, boxes):
+        def store_scan(box, **filters):
+            # StoreCell 없이 화면 안 store 를 zoom 격자로 바로 GROUP BY
+            min_lat, max_lat, min_lng, max_lng = box
+            return list(
+                Store.objects.filter(
+                    latitude__range=(min_lat, max_lat), longitude__range=(min_lng, max_lng), **filters
+                ).annotate(
+                    x=Floor((F("longitude") + 180) * ((1 << (zoom + 2)) / 360)),
+                    y=Floor((F("latitude") + 90) * ((1 << (zoom + 1)) / 180)),
+                ).values("x", "y").annotate(total=Count("pk"), latitude=Avg("latitude"), longitude=Avg("longitude"), top=Max("pk"))
+            )
+
+        for name, search in (
+            ("cells", lambda box: clusters.clusters(box, zoom)),
+            ("cells+filter", lambda box: clusters.clusters(box, zoom, kind_menu="cafe", pet_friendly=True)),
+            ("store scan", store_scan),
+        ):
+            timings = []
+            for box in boxes:
+                start = time.perf_counter()
+                found = search(box)
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(f"zoom {zoom:>2}  {name:<12} {statistics.median(timings):8.1f}ms  ({len(found)} clusters)")
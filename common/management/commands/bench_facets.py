@@ -0,0 +1,89 @@
+import random
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from regions.models import Region
+from stores import facets
+from stores.models import Store
+from users.models import User
+
+WORDS = ("카페", "식당", "분식", "베이커리", "치킨", "국밥", "파스타", "라멘", "버거", "커피")
+
+
+class Command(BaseCommand):
+    help = "stores/facets 를 chip 마다 COUNT 하는 방식, GROUP BY 한 번, 미리 센 StoreFacetCount, cache 로 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stores", type=int, default=300_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        # 측정용 데이터는 끝나면 rollback 한다.
+        with transaction.atomic():
+            start = time.perf_counter()
+            self.seed(options["stores"], rng)
+            self.stdout.write(f"{options['stores']} stores 생성 {time.perf_counter() - start:.0f}s")
+            start = time.perf_counter()
+            counters = facets.rebuild()
+            self.stdout.write(f"rebuild {counters} counters {time.perf_counter() - start:.1f}s")
+
+            seoul = Region.objects.get(name="서울특별시", parent=None).pk
+            for label, params in (
+                ("전체", {}),
+                ("type=cafe, 서울", {"kinds": ["cafe"], "region": seoul}),
+                ("keyword=카페", {"keyword": "카페"}),
+                ("keyword=카페, 서울", {"keyword": "카페", "region": seoul}),
+            ):
+                self.run(label, params, options["repeat"])
+            transaction.set_rollback(True)
+
+    def seed(self, count, rng):
+        owner = User.objects.create(username="bench-facets")
+        regions = list(Region.objects.values_list("pk", flat=True)) + [None]
+        batch = []
+        for i in range(count):
+            batch.append(Store(
+                name=f"{rng.choice(WORDS)} {i}", description="desc", description_excerpt="desc",
+                kind_menu=rng.choice(Store.StoreMenuChoices.values), pet_friendly=rng.random() < 0.2,
+                city="", owner=owner, region_id=rng.choice(regions),
+            ))
+            if len(batch) == 10_000:
+                Store.objects.bulk_create(batch)
+                batch = []
+        Store.objects.bulk_create(batch)
+
+    def run(self, label, params, repeat):
+        def per_chip():
+            # chip(type 3개, pet_friendly 2개, region 아래 단계)마다 목록 조건으로 COUNT
+            stores = Store.objects.all()
+            if params.get("keyword"):
+                stores = stores.filter(name__icontains=params["keyword"])
+            if params.get("region"):
+                stores = stores.filter(region__in=Region.objects.subtree(params["region"]).values("pk"))
+            for kind in Store.StoreMenuChoices.values:
+                stores.filter(kind_menu=kind).count()
+            for pet_friendly in (True, False):
+                stores.filter(pet_friendly=pet_friendly).count()
+            for region in Region.objects.filter(parent_id=params.get("region")).values_list("pk", flat=True):
+                stores.filter(region__in=Region.objects.subtree(region).values("pk")).count()
+
+        def uncached():
+            cache.clear()
+            facets.facets(**params)
+
+        def cached():
+            facets.facets(**params)
+
+        for name, search in (("chip 마다 COUNT", per_chip), ("facets", uncached), ("facets cached", cached)):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                search()
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(f"{label:<18} {name:<16} {statistics.median(timings):8.1f}ms")
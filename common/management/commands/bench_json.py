@@ -0,0 +1,84 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from common.renderers import FastJSONRenderer, orjson
+from reviews.models import Reviews
+from reviews.serializers import ReviewSerializer
+from stores.models import Store
+from stores.serializer import StoreListSerializer
+from users.models import User
+
+PHOTO = "https://imagedelivery.net/delight-spot/{}/public"
+
+
+class Command(BaseCommand):
+    help = "store 목록 / 리뷰 목록 응답을 stdlib JSONRenderer 와 FastJSONRenderer(orjson)로 encode 하는 시간을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=50, help="응답 하나에 들어가는 store / review 수")
+        parser.add_argument("--repeat", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write("orjson 이 설치되지 않아 FastJSONRenderer 도 stdlib 로 동작합니다.")
+        # 측정용 데이터는 끝나면 rollback 한다.
+        with transaction.atomic():
+            payloads = self.seed(options["items"])
+            for label, data in payloads.items():
+                self.run(label, data, options["repeat"])
+            transaction.set_rollback(True)
+
+    def seed(self, items):
+        owner = User.objects.create(username="bench-json-owner", avatar=PHOTO.format("owner"))
+        users = User.objects.bulk_create(
+            User(username=f"bench-json-{i}", name=f"리뷰어 {i}", avatar=PHOTO.format(i)) for i in range(items)
+        )
+        store = None
+        for i in range(items):
+            store = Store.objects.create(
+                name=f"맛집 {i}",
+                description="숯불에 구운 고기와 직접 담근 김치가 유명한 집. " * 4,
+                kind_menu="food",
+                city="서울",
+                owner=owner,
+            )
+            store.set_photos([PHOTO.format(f"{i}-{n}") for n in range(3)])
+        Reviews.objects.bulk_create(
+            Reviews(
+                user=user,
+                store=store,
+                description="분위기도 좋고 친절했어요. 주차는 조금 불편합니다. " * 3,
+                review_photo=[PHOTO.format(f"review-{user.pk}")],
+                **{field: 1 + (user.pk + n) % 5 for n, field in enumerate(
+                    ("taste_rating", "atmosphere_rating", "kindness_rating", "clean_rating")
+                )},
+            )
+            for user in users
+        )
+        stores = Store.objects.with_ratings().select_related("owner").order_by("-pk")[:items]
+        reviews = store.reviews.select_related("user")
+        return {
+            "stores": StoreListSerializer(stores, many=True, context={"liked_store_pks": set()}).data,
+            "reviews": ReviewSerializer(reviews, many=True).data,
+        }
+
+    def run(self, label, data, repeat):
+        results = {}
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                body = renderer.render(data, "application/json")
+                timings.append((time.perf_counter() - start) * 1_000_000)
+            results[type(renderer).__name__] = (statistics.median(timings), body)
+
+        (stdlib_us, stdlib_body), (fast_us, fast_body) = results.values()
+        self.stdout.write(
+            f"{label:<8} {len(data)} items, {len(fast_body) / 1024:.1f}KB: "
+            f"JSONRenderer {stdlib_us:.0f}us, FastJSONRenderer {fast_us:.0f}us "
+            f"({stdlib_us / fast_us:.1f}x, same output: {stdlib_body == fast_body})"
+        )
@@ -0,0 +1,64 @@
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from config.log import JsonFormatter, QueueFileHandler, RequestIdFilter
+
+
+class Command(BaseCommand):
+    help = "기존 동기 FileHandler와 queue 기반 QueueFileHandler의 log 호출 1회 비용을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--records", type=int, default=50000)
+        parser.add_argument("--disk-latency-us", type=float, default=0, help="write 한 번마다 더할 지연 (느린 디스크 흉내)")
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp()
+        try:
+            file_handler = logging.FileHandler(os.path.join(directory, "debug.log"))
+            self.slow_down(file_handler, options)
+            self.run("FileHandler (기존)", file_handler, options)
+
+            queue_handler = QueueFileHandler(os.path.join(directory, "app.log"), queue_size=options["records"])
+            queue_handler.setFormatter(JsonFormatter())
+            queue_handler.addFilter(RequestIdFilter())
+            self.slow_down(queue_handler.target, options)
+            self.run("QueueFileHandler", queue_handler, options)
+        finally:
+            shutil.rmtree(directory)
+
+    def slow_down(self, handler, options):
+        delay = options["disk_latency_us"] / 1e6
+        if not delay:
+            return
+        emit = handler.emit
+
+        def slow_emit(record):
+            time.sleep(delay)
+            emit(record)
+
+        handler.emit = slow_emit
+
+    def run(self, label, handler, options):
+        logger = logging.getLogger(f"bench.logging.{id(handler)}")
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(handler)
+
+        sql = "SELECT * FROM stores_store WHERE id = %s"
+        start = time.perf_counter()
+        # 요청 thread가 실제로 쓴 CPU 시간 (listener thread 몫 제외)
+        cpu_start = time.thread_time()
+        for i in range(options["records"]):
+            logger.debug("(0.001) %s; args=(%s,)", sql, i)
+        cpu = time.thread_time() - cpu_start
+        elapsed = time.perf_counter() - start
+        handler.close()
+        records = options["records"]
+        self.stdout.write(
+            f"{label:<20} wall={elapsed / records * 1e6:6.2f}us/call caller_cpu={cpu / records * 1e6:6.2f}us/call"
+        )
@@ -0,0 +1,60 @@
+import statistics
+import time
+
+import jwt
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from users.models import User
+
+# config.middleware 도입 전 stack
+FULL_STACK = {
+    "config.middleware.APISessionMiddleware": "django.contrib.sessions.middleware.SessionMiddleware",
+    "config.middleware.APICsrfViewMiddleware": "django.middleware.csrf.CsrfViewMiddleware",
+    "config.middleware.APIAuthenticationMiddleware": "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "config.middleware.APIMessageMiddleware": "django.contrib.messages.middleware.MessageMiddleware",
+}
+
+
+class Command(BaseCommand):
+    help = "token 인증 API 요청을 전체 middleware stack과 fast path로 보내 요청당 시간/쿼리 수를 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--path", default="/api/v1/users/me")
+
+    def handle(self, *args, **options):
+        # 측정용 유저/session은 끝나면 rollback 한다.
+        with transaction.atomic():
+            user = User.objects.create(username="bench-middleware")
+            token = jwt.encode({"pk": user.pk}, settings.SECRET_KEY, algorithm="HS256")
+            full_stack = [FULL_STACK.get(name, name) for name in settings.MIDDLEWARE]
+
+            with override_settings(MIDDLEWARE=full_stack):
+                self.run("full stack", token, user, options)
+            self.run("token fast path", token, user, options)
+            transaction.set_rollback(True)
+
+    def run(self, label, token, user, options):
+        client = Client(HTTP_JWT=token, SERVER_NAME="localhost")
+        # 브라우저 client처럼 session cookie도 같이 보낸다.
+        client.force_login(user)
+
+        latencies = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(options["requests"]):
+                start = time.perf_counter()
+                response = client.get(options["path"])
+                latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            self.stderr.write(f"{label}: {options['path']} -> {response.status_code}")
+
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        self.stdout.write(
+            f"{label:<16} p50={statistics.median(latencies):.3f}ms p95={p95:.3f}ms "
+            f"queries/request={len(queries) / options['requests']:.1f}"
+        )
@@ -0,0 +1,103 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from stores import geo
+from stores.models import Store
+from stores.serializer import NearbyStoreValuesSerializer
+from users.models import User
+
+SEOUL = (37.42, 37.70, 126.80, 127.18)
+KOREA = (33.1, 38.6, 125.0, 129.6)
+
+
+class Command(BaseCommand):
+    help = "stores/nearby 쿼리를 전체 scan(haversine), 위도/경도 사각형, geocell index 로 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stores", type=int, default=1_000_000)
+        parser.add_argument("--radius", default="500,2000,10000", help="비교할 반경(m) (쉼표로 구분)")
+        parser.add_argument("--repeat", type=int, default=5, help="반경마다 검색할 위치 수")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        # 측정용 데이터는 끝나면 rollback 한다.
+        with transaction.atomic():
+            start = time.perf_counter()
+            self.seed(options["stores"], rng)
+            self.stdout.write(f"{options['stores']} stores 생성 {time.perf_counter() - start:.0f}s (서울 60%, 전국 40%)")
+
+            centers = [(rng.uniform(*SEOUL[:2]), rng.uniform(*SEOUL[2:])) for _ in range(options["repeat"])]
+            for radius in (int(r) for r in options["radius"].split(",")):
+                self.run(radius, centers)
+            transaction.set_rollback(True)
+
+    def seed(self, count, rng):
+        owner = User.objects.create(username="bench-nearby")
+        batch = []
+        for i in range(count):
+            box = SEOUL if rng.random() < 0.6 else KOREA
+            latitude, longitude = rng.uniform(*box[:2]), rng.uniform(*box[2:])
+            batch.append(Store(
+                name=f"가게 {i}", description="desc", description_excerpt="desc", kind_menu="food", city="",
+                owner=owner, latitude=latitude, longitude=longitude, geocell=geo.encode(latitude, longitude),
+            ))
+            if len(batch) == 10_000:
+                Store.objects.bulk_create(batch)
+                batch = []
+        Store.objects.bulk_create(batch)
+
+    def run(self, radius, centers):
+        def full_scan(latitude, longitude):
+            return (
+                Store.objects.annotate(distance=geo.distance_expression(latitude, longitude))
+                .filter(distance__lte=radius).order_by("distance", "pk")
+            )
+
+        def bounding_box(latitude, longitude):
+            min_lat, max_lat, min_lng, max_lng = geo.bounding_box(latitude, longitude, radius)
+            return (
+                Store.objects.filter(latitude__range=(min_lat, max_lat), longitude__range=(min_lng, max_lng))
+                .annotate(distance=geo.distance_expression(latitude, longitude))
+                .filter(distance__lte=radius).order_by("distance", "pk")
+            )
+
+        def geocell(latitude, longitude):
+            return Store.objects.nearby(latitude, longitude, radius)
+
+        results = {}
+        for name, search in (("full scan", full_scan), ("lat/lng box", bounding_box), ("geocell", geocell)):
+            timings = []
+            for latitude, longitude in centers[:2] if name == "full scan" else centers:
+                start = time.perf_counter()
+                pks = list(search(latitude, longitude).values_list("pk", flat=True)[:10])
+                timings.append((time.perf_counter() - start) * 1000)
+                results.setdefault((latitude, longitude), []).append(pks)
+            self.stdout.write(f"radius {radius:>5}m  {name:<11} {statistics.median(timings):8.1f}ms")
+
+        # API 한 page: 반경을 넓혀 가며 거리 정렬(index 만) + 카드 10개 (평점 GROUP BY 포함)
+        timings = []
+        for latitude, longitude in centers:
+            start = time.perf_counter()
+            NearbyStoreValuesSerializer.from_nearby(
+                Store.objects.nearest(latitude, longitude, radius, 0, 10), context={"liked_store_pks": set()}
+            ).data
+            timings.append((time.perf_counter() - start) * 1000)
+        self.stdout.write(f"radius {radius:>5}m  {'API page':<11} {statistics.median(timings):8.1f}ms")
+
+        # 후보 수 (geocell + 사각형 조건까지 통과한 row)와 결과가 같은지
+        latitude, longitude = centers[0]
+        candidates = Store.objects.filter(geo.nearby_filter(latitude, longitude, radius)).count()
+        within = Store.objects.nearby(latitude, longitude, radius).count()
+        same = all(len({tuple(pks) for pks in found}) == 1 for found in results.values())
+        self.stdout.write(f"radius {radius:>5}m  후보 {candidates} rows -> 반경 안 {within} rows, same result: {same}")
+        if radius == 500:
+            with connection.cursor() as cursor:
+                sql, params = Store.objects.nearby(latitude, longitude, radius).values("pk")[:10].query.sql_with_params()
+                if connection.vendor == "sqlite":
+                    cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                    self.stdout.write("  plan: " + " / ".join(row[-1] for row in cursor.fetchall()))
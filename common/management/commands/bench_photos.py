@@ -0,0 +1,67 @@
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+
+from common import photos
+
+
+def _render(data, draft=True):
+    variants = photos.render_variants(BytesIO(data), draft=draft)
+    return {size: {fmt: len(body) for fmt, body in encoded.items()} for size, (_, _, encoded) in variants.items()}
+
+
+def sample_jpeg(width, height, seed):
+    """카메라 사진처럼 잘 압축되지 않는(noise + gradient) 측정용 JPEG"""
+    from PIL import Image
+
+    noise = Image.effect_noise((width, height), 40 + seed % 20)
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (noise, gradient, gradient.transpose(Image.Transpose.ROTATE_90).resize((width, height))))
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = "업로드 사진 변환(common.photos.render_variants)의 CPU 처리량을 측정합니다. (storage / DB 제외)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--images", type=int, default=16)
+        parser.add_argument("--width", type=int, default=4032)
+        parser.add_argument("--height", type=int, default=3024)
+        parser.add_argument(
+            "--workers", default=f"1,2,{os.cpu_count()}", help="비교할 worker 수 (쉼표로 구분)"
+        )
+
+    def handle(self, *args, **options):
+        images = [sample_jpeg(options["width"], options["height"], i) for i in range(options["images"])]
+        original_kb = statistics.mean(len(data) for data in images) / 1024
+        self.stdout.write(
+            f"{len(images)} JPEG, {options['width']}x{options['height']}, 평균 {original_kb:.0f}KB, CPU {os.cpu_count()}"
+        )
+
+        # 1 worker: draft(축소 decode) 유무에 따른 사진 한 장 변환 시간
+        for draft in (False, True):
+            timings = []
+            for data in images[:4]:
+                start = time.perf_counter()
+                sizes = _render(data, draft)
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(f"draft={draft!s:<5} {statistics.median(timings):.0f}ms/photo")
+        self.stdout.write("  ".join(
+            f"{size} jpeg {body['jpeg'] / 1024:.0f}KB / webp {body['webp'] / 1024:.0f}KB" for size, body in sizes.items()
+        ))
+
+        # worker pool 크기별 처리량 (run_workers --mode thread / process 와 같은 pool)
+        for count in sorted({int(n) for n in options["workers"].split(",")}):
+            for name, pool_class in (("thread", ThreadPoolExecutor), ("process", ProcessPoolExecutor)):
+                with pool_class(max_workers=count) as pool:
+                    list(pool.map(_render, images[:count]))  # warm-up (process 시작, import)
+                    start = time.perf_counter()
+                    list(pool.map(_render, images))
+                    elapsed = time.perf_counter() - start
+                self.stdout.write(f"{name:<7} x{count:<2} {len(images) / elapsed:.1f} photos/s")
@@ -0,0 +1,95 @@
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer, BookingValuesSerializer
+from reviews.models import Reviews
+from reviews.serializers import ReviewSerializer, ReviewValuesSerializer
+from stores.models import Store
+from stores.serializer import StoreListSerializer, StoreListValuesSerializer
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "목록 API의 ModelSerializer 와 ValuesSerializer 의 row 당 serialize 시간을 비교합니다. (쿼리 시간 제외)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        # 측정용 데이터는 끝나면 rollback 한다.
+        with transaction.atomic():
+            user = self.seed(options["rows"])
+            request = SimpleNamespace(user=user)
+            context = {"request": request, "liked_store_pks": set()}
+
+            stores = Store.objects.with_ratings().select_related("owner").order_by("-pk")
+            reviews = Reviews.objects.select_related("user").order_by("pk")
+            bookings = Booking.objects.prefetch_related(
+                Prefetch("store", queryset=Store.objects.order_by("pk"))
+            ).order_by("pk")
+            store_instances = list(stores)
+            store_rows = list(stores.values(*StoreListValuesSerializer.columns))
+            review_instances = list(reviews)
+            review_rows = list(reviews.values(*ReviewValuesSerializer.columns))
+            booking_instances = list(bookings)
+            booking_rows = list(bookings.values(*BookingValuesSerializer.columns))
+            booking_context = BookingValuesSerializer.from_queryset(bookings).context
+
+            self.run(
+                "stores",
+                lambda: StoreListSerializer(store_instances, many=True, context=context).data,
+                lambda: StoreListValuesSerializer(store_rows, context=context).data,
+                options["repeat"],
+            )
+            self.run(
+                "reviews",
+                lambda: ReviewSerializer(review_instances, many=True).data,
+                lambda: ReviewValuesSerializer(review_rows).data,
+                options["repeat"],
+            )
+            self.run(
+                "bookings",
+                lambda: BookingSerializer(booking_instances, many=True).data,
+                lambda: BookingValuesSerializer(booking_rows, context=booking_context).data,
+                options["repeat"],
+            )
+            transaction.set_rollback(True)
+
+    def seed(self, rows):
+        owner = User.objects.create(username="bench-serializers", avatar="https://example.com/owner.png")
+        stores = [
+            Store.objects.create(
+                name=f"가게 {i}", description="desc " * 20, kind_menu="food", city="서울", owner=owner,
+                cover_photo=f"https://example.com/{i}.png",
+            )
+            for i in range(rows)
+        ]
+        Reviews.objects.bulk_create(
+            Reviews(user=owner, store=store, description="review " * 10, taste_rating=4, clean_rating=3)
+            for store in stores
+        )
+        for i in range(0, rows, 10):
+            Booking.objects.create(user=owner).store.set(stores[i:i + 10])
+        return owner
+
+    def run(self, label, model_serializer, values_serializer, repeat):
+        results = []
+        for serialize in (model_serializer, values_serializer):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                data = serialize()
+                timings.append((time.perf_counter() - start) * 1_000_000)
+            results.append(statistics.median(timings) / len(data))
+        model_us, values_us = results
+        self.stdout.write(
+            f"{label:<9} {len(data)} rows: ModelSerializer {model_us:.1f}us/row, "
+            f"ValuesSerializer {values_us:.1f}us/row ({model_us / values_us:.1f}x)"
+        )
@@ -0,0 +1,109 @@
+import logging
+import multiprocessing
+import signal
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from common import jobs
+
+logger = logging.getLogger("common.jobs")
+
+
+def _process_init():
+    # spawn 된 process에서 Django를 다시 초기화한다.
+    import django
+
+    django.setup()
+
+
+def _execute(pk):
+    close_old_connections()
+    try:
+        return jobs.run_job(pk)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "jobs 테이블의 background job을 thread/process pool로 실행합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="동시에 실행할 job 수")
+        parser.add_argument("--mode", choices=("thread", "process"), default="thread")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="대기 job이 없을 때 polling 간격(초)")
+        parser.add_argument("--stats-interval", type=float, default=60.0, help="실행 지표 로그 간격(초)")
+        parser.add_argument("--once", action="store_true", help="대기 중인 job을 모두 처리하면 종료")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        worker = jobs.worker_id()
+        size = options["workers"]
+        if options["mode"] == "process":
+            # 자식은 첫 submit 때 만들어지므로 그 사이 claim()이 다시 연 부모 연결을
+            # fork로 물려받지 않도록 spawn으로 새 interpreter를 띄운다.
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                max_workers=size,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_process_init,
+            )
+        else:
+            pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix="job-worker")
+
+        stats = defaultdict(lambda: {"ok": 0, "failed": 0, "ms": 0.0})
+        running = {}
+        last_stats = last_heartbeat = time.monotonic()
+        self.stdout.write(f"{worker}: {options['mode']} pool x{size} 시작")
+
+        try:
+            while not self.stopping:
+                if running and time.monotonic() - last_heartbeat > settings.JOB_HEARTBEAT_SECONDS:
+                    jobs.heartbeat(worker, list(running.values()))
+                    last_heartbeat = time.monotonic()
+                jobs.requeue_stale()
+                free = size - len(running)
+                if free > 0:
+                    for pk in jobs.claim(worker, batch=free):
+                        running[pool.submit(_execute, pk)] = pk
+
+                if not running:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                done, _ = wait(running, timeout=options["poll_interval"], return_when=FIRST_COMPLETED)
+                for future in done:
+                    pk = running.pop(future)
+                    try:
+                        name, duration_ms, ok = future.result()
+                    except Exception:
+                        logger.exception("job %s crashed the worker", pk)
+                        continue
+                    stats[name]["ok" if ok else "failed"] += 1
+                    stats[name]["ms"] += duration_ms
+
+                if time.monotonic() - last_stats > options["stats_interval"]:
+                    self._log_stats(stats)
+                    last_stats = time.monotonic()
+        finally:
+            pool.shutdown(wait=True)
+            self._log_stats(stats)
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def _log_stats(self, stats):
+        for name, stat in sorted(stats.items()):
+            count = stat["ok"] + stat["failed"]
+            self.stdout.write(
+                f"{name}: ok={stat['ok']} failed={stat['failed']} avg={stat['ms'] / count:.1f}ms"
+            )
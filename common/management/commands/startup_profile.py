@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# 새 process에서 API worker(gunicorn.conf.py 의 config.wsgi)가 부팅하는 것과 같은 순서로 app을 띄우고 첫 요청을 보낸다.
+BOOT_SCRIPT = """
+import time
+start = time.perf_counter()
+from config.wsgi import application
+loaded = time.perf_counter()
+from django.test import Client
+response = Client(SERVER_NAME="localhost").get({path!r})
+done = time.perf_counter()
+print("BOOT", (loaded - start) * 1000, (done - start) * 1000, response.status_code)
+"""
+
+# gunicorn preload_app: 부모가 app을 띄우고 warm_up 한 뒤 fork 한 worker의 첫 응답 시간
+PRELOAD_SCRIPT = """
+import os, time
+from config.wsgi import application
+from config.startup import warm_up
+warm_up()
+start = time.perf_counter()
+pid = os.fork()
+if pid == 0:
+    from django.test import Client
+    response = Client(SERVER_NAME="localhost").get({path!r})
+    print("BOOT", 0, (time.perf_counter() - start) * 1000, response.status_code, flush=True)
+    os._exit(0)
+os.waitpid(pid, 0)
+"""
+
+
+class Command(BaseCommand):
+    help = "python -X importtime 으로 worker 부팅 시 import 비용과 첫 응답까지 걸리는 시간을 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/v1/notices", help="첫 요청을 보낼 경로")
+        parser.add_argument("--top", type=int, default=25, help="cumulative 시간이 큰 top-level package 수")
+        parser.add_argument("--runs", type=int, default=3, help="첫 응답 시간 측정 횟수 (중간값 사용)")
+        parser.add_argument("--preload", action="store_true", help="preload 된 부모에서 fork 한 worker의 첫 응답도 측정")
+
+    def handle(self, *args, **options):
+        script = BOOT_SCRIPT.format(path=options["path"])
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings")}
+
+        result = self.boot(script, env, importtime=True)
+        self.report_imports(result.stderr, options["top"])
+
+        timings = []
+        for _ in range(options["runs"]):
+            started = time.perf_counter()
+            result = self.boot(script, env)
+            process_ms = (time.perf_counter() - started) * 1000
+            load_ms, first_ms, status = self.parse_boot(result.stdout)
+            timings.append((first_ms, load_ms, process_ms, status))
+        timings.sort()
+        first_ms, load_ms, process_ms, status = timings[len(timings) // 2]
+        self.stdout.write(
+            f"\napp load {load_ms:.0f}ms, first response {first_ms:.0f}ms "
+            f"(GET {options['path']} -> {status}), process total {process_ms:.0f}ms"
+        )
+
+        if options["preload"]:
+            script = PRELOAD_SCRIPT.format(path=options["path"])
+            firsts = sorted(self.parse_boot(self.boot(script, env).stdout)[1] for _ in range(options["runs"]))
+            self.stdout.write(f"preloaded worker first response {firsts[len(firsts) // 2]:.0f}ms")
+
+    def boot(self, script, env, importtime=False):
+        command = [sys.executable]
+        if importtime:
+            command += ["-X", "importtime"]
+        result = subprocess.run(
+            command + ["-c", script], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            self.stderr.write(result.stderr[-2000:])
+            raise SystemExit(result.returncode)
+        return result
+
+    def parse_boot(self, stdout):
+        line = next(line for line in stdout.splitlines() if line.startswith("BOOT "))
+        _, load_ms, first_ms, status = line.split()
+        return float(load_ms), float(first_ms), int(status)
+
+    def report_imports(self, stderr, top):
+        # "import time: self [us] | cumulative | imported package"
+        packages = defaultdict(int)
+        total = 0
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+            total += int(self_us)
+            # top-level package 단위로 self 시간을 합친다.
+            packages[name.lstrip().split(".")[0]] += int(self_us)
+
+        self.stdout.write(f"total import time {total / 1000:.0f}ms\n")
+        self.stdout.write(f"{'package':<32}{'ms':>8}")
+        for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f"{name:<32}{us / 1000:8.1f}")
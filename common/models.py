@@ -1,4 +1,8 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 # 데이터베이스에 추가하지 않는 model -> 다른 model에서 재사용하기 위한 model
@@ -16,3 +20,112 @@ class CommonModel(models.Model):
     # Django에서 model을 configure할 때 사용
     class Meta:
         abstract = True  # 데이터베이스에 저장하지 않는다.
+
+
+class Job(CommonModel):
+    """Background Job Model Definition (common.jobs.enqueue 로 생성)"""
+
+    class StatusChoices(models.TextChoices):
+        QUEUED = ("queued", "Queued")
+        RUNNING = ("running", "Running")
+        DONE = ("done", "Done")
+        FAILED = ("failed", "Failed")
+
+    name = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=StatusChoices,
+        default=StatusChoices.QUEUED,
+    )
+    run_at = models.DateTimeField(default=timezone.now)  # 이 시간 이후에 실행 (retry backoff)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    # 실행 지표
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    wait_ms = models.FloatField(null=True, blank=True)  # run_at ~ 실행 시작까지 대기 시간
+    duration_ms = models.FloatField(null=True, blank=True)  # 마지막 실행에 걸린 시간
+    last_error = models.TextField(blank=True, default="")
+    progress = models.JSONField(default=dict, blank=True)  # 오래 걸리는 job의 진행 상황
+
+    def __str__(self):
+        return f"{self.name}#{self.pk} ({self.status})"
+
+    def update_progress(self, **progress):
+        self.progress.update(progress)
+        # 진행 상황 기록이 heartbeat 역할도 한다.
+        Job.objects.filter(pk=self.pk, status=Job.StatusChoices.RUNNING).update(
+            progress=self.progress, locked_at=timezone.now()
+        )
+
+    class Meta:
+        verbose_name_plural = "Jobs"
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="common_job_claim_idx"),
+        ]
+
+
+
+class CacheVersion(models.Model):
+    """versioned cache (common.cache) 의 이름별 version. 데이터가 바뀌면 올려서 예전 cache key 를 모두 버린다."""
+
+    name = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+def original_photo_name(photo, filename):
+    """photos/<key>/original.<확장자> (client 가 보낸 파일 이름은 쓰지 않는다)"""
+    return f"photos/{photo.key.hex}/original.{filename.rsplit('.', 1)[-1]}"
+
+
+def photo_variant_name(key, size, ext):
+    """변환된 사진 파일 이름: photos/<key>/<size>.<ext> (원본과 같은 directory)"""
+    return f"photos/{key.hex}/{size}.{ext}"
+
+
+class Photo(CommonModel):
+    """업로드된 사진 원본과 크기별 변환 결과 (common.photos)"""
+
+    class StatusChoices(models.TextChoices):
+        PENDING = ("pending", "Pending")  # 원본만 있고 변환 job 대기 중
+        READY = ("ready", "Ready")
+        FAILED = ("failed", "Failed")  # 원본을 이미지로 읽을 수 없음
+
+    key = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="uploaded_photos",
+    )
+    original = models.FileField(upload_to=original_photo_name, max_length=200)
+    content_type = models.CharField(max_length=50, blank=True, default="")
+    file_size = models.PositiveIntegerField(default=0)
+    # 원본 크기 (EXIF 회전 반영)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=StatusChoices,
+        default=StatusChoices.PENDING,
+    )
+    variants = models.JSONField(default=dict, blank=True)  # {"thumb": [width, height], ...}
+
+    def __str__(self):
+        return f"{self.key.hex} ({self.status})"
+
+    @property
+    def url(self):
+        return self.original.url
+
+    class Meta:
+        verbose_name_plural = "Photos"
@@ -0,0 +1,201 @@
+"""
+업로드 사진 저장 / 크기별 변환 (thumbnail, WebP)
+
+POST photos 로 받은 원본은 default storage(STORAGES["default"], 기본은 MEDIA_ROOT 아래 파일)에
+photos/<key>/original.<확장자> 로 저장하고, background job(common.process_photo)이 PHOTO_SIZES 의 크기마다
+photos/<key>/<size>.jpg, photos/<key>/<size>.webp 를 만든다.
+
+파일 이름이 정해져 있으므로 원본 URL 만 있으면 크기별 URL 을 만들 수 있다. (sized_url)
+변환이 끝나기 전(Photo.status 가 ready 가 아님)이나 외부 URL 은 원본 URL 을 그대로 쓴다.
+
+Pillow 는 사진을 받거나 변환할 때만 import 한다. (worker 부팅 시간 단축)
+"""
+
+import math
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.dispatch import Signal
+
+from .jobs import enqueue
+from .models import Photo, photo_variant_name
+
+# 업로드로 받는 format -> 원본 확장자
+UPLOAD_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+# 변환 결과 format -> (Pillow format, 확장자)
+OUTPUT_FORMATS = {"jpeg": ("JPEG", "jpg"), "webp": ("WEBP", "webp")}
+
+_ORIGINAL_URL = re.compile(r"/photos/([0-9a-f]{32})/original\.(?:jpg|png|webp)$")
+
+# 변환이 끝난 사진 (sender=Photo, photo=Photo). 사진을 쓰는 app 이 대표 사진 등을 갱신한다.
+photo_ready = Signal()
+
+
+def photo_key(url):
+    """업로드로 저장된 원본 URL 이면 key(hex), 아니면 None"""
+    if not isinstance(url, str):
+        return None
+    match = _ORIGINAL_URL.search(url.split("?", 1)[0])
+    return match.group(1) if match else None
+
+
+def sized_url(url, size, fmt="jpeg"):
+    """원본 URL 과 같은 위치의 size 크기 변환 URL"""
+    path = url.split("?", 1)[0]
+    head = path[:path.rindex("/") + 1]
+    return f"{head}{size}.{OUTPUT_FORMATS[fmt][1]}"
+
+
+def sizes(url, variants):
+    """API 에 내려줄 크기별 URL. 변환 전이면 None
+
+    {"thumb": {"width": 160, "height": 120, "jpeg": ".../thumb.jpg", "webp": ".../thumb.webp"}, ...}
+    """
+    if not variants:
+        return None
+    return {
+        size: {
+            "width": width,
+            "height": height,
+            **{fmt: sized_url(url, size, fmt) for fmt in OUTPUT_FORMATS},
+        }
+        for size, (width, height) in variants.items()
+    }
+
+
+def ready_photo_keys(urls):
+    """urls 중 변환이 끝난 업로드 사진의 key 집합 (한 번의 쿼리, 업로드 사진이 없으면 쿼리 없음)"""
+    keys = {key for key in map(photo_key, urls) if key}
+    if not keys:
+        return set()
+    return {
+        key.hex for key in Photo.objects.filter(key__in=keys, status=Photo.StatusChoices.READY)
+        .values_list("key", flat=True)
+    }
+
+
+def photo_list(value):
+    """review_photo 같은 JSON 사진 목록에서 URL 문자열만 꺼낸다."""
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list):
+        return []
+    return [url for url in value if isinstance(url, str)]
+
+
+def small_urls(urls, ready, size="thumb"):
+    """변환이 끝난 업로드 사진은 size 크기 URL 로, 나머지는 그대로"""
+    return [sized_url(url, size) if photo_key(url) in ready else url for url in urls]
+
+
+def read_image(fp):
+    """업로드 파일을 검사하고 (format, width, height) 를 반환한다. 받을 수 없는 파일이면 ValueError"""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(fp) as image:
+            fmt, (width, height) = image.format, image.size
+            if fmt not in UPLOAD_FORMATS:
+                raise ValueError(f"지원하지 않는 이미지 형식입니다: {fmt}")
+            if width * height > settings.PHOTO_MAX_PIXELS:
+                raise ValueError("이미지 해상도가 너무 큽니다.")
+            image.verify()
+        # verify 한 image 는 더 쓸 수 없으므로 header 만 다시 읽는다.
+        fp.seek(0)
+        with Image.open(fp) as image:
+            if image.getexif().get(0x0112) in (5, 6, 7, 8):
+                # EXIF orientation 이 90도 회전이면 보이는 크기는 가로/세로가 바뀐다.
+                width, height = height, width
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError, SyntaxError) as exc:
+        raise ValueError("이미지 파일이 아닙니다.") from exc
+    finally:
+        fp.seek(0)
+    return fmt, width, height
+
+
+def encode(image, fmt):
+    buffer = BytesIO()
+    if fmt == "jpeg":
+        image.save(buffer, "JPEG", quality=settings.PHOTO_JPEG_QUALITY, progressive=True)
+    else:
+        image.save(buffer, "WEBP", quality=settings.PHOTO_WEBP_QUALITY, method=settings.PHOTO_WEBP_METHOD)
+    return buffer.getvalue()
+
+
+def render_variants(fp, photo_sizes=None, draft=True):
+    """
+    원본을 photo_sizes(이름 -> 긴 변 px) 크기로 줄여 JPEG / WebP 로 encode 한다.
+    {size: (width, height, {"jpeg": bytes, "webp": bytes})} 를 반환한다. (EXIF 는 저장하지 않는다)
+
+    - JPEG 는 draft 로 가장 큰 변환 크기 이상인 1/2, 1/4, 1/8 크기로 decode 한다. (decode 시간, 메모리 감소)
+    - 큰 크기부터 만들고, 다음 크기는 원본이 아니라 바로 앞에서 줄인 이미지에서 줄인다.
+    - 원본보다 크게 늘리지는 않는다.
+    """
+    from PIL import Image, ImageOps
+
+    ordered = sorted((photo_sizes or settings.PHOTO_SIZES).items(), key=lambda item: -item[1])
+    with Image.open(fp) as image:
+        if draft and image.format == "JPEG":
+            scale = min(ordered[0][1] / max(image.size), 1)
+            image.draft("RGB", (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info):
+            # JPEG 에는 alpha 가 없으므로 투명한 부분은 흰 배경으로 채운다.
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        variants = {}
+        for size, edge in ordered:
+            if max(image.size) > edge:
+                image.thumbnail((edge, edge), Image.Resampling.LANCZOS, reducing_gap=2.0)
+            variants[size] = (image.width, image.height, {fmt: encode(image, fmt) for fmt in OUTPUT_FORMATS})
+    return variants
+
+
+def create_photo(upload, fmt, width, height, owner=None):
+    """read_image 로 검사한 업로드 파일을 원본으로 저장하고 변환 job 을 등록한다."""
+    photo = Photo(
+        owner=owner,
+        content_type=f"image/{fmt.lower()}",
+        file_size=upload.size,
+        width=width,
+        height=height,
+    )
+    photo.original.save(f"original.{UPLOAD_FORMATS[fmt]}", upload, save=False)
+    photo.save()
+    enqueue("common.process_photo", {"photo_pk": photo.pk})
+    return photo
+
+
+def process(photo):
+    """원본에서 크기별 JPEG / WebP 를 만들어 저장하고 photo 를 ready 로 바꾼다. 이미지를 읽을 수 없으면 failed"""
+    from PIL import Image
+
+    storage = photo.original.storage
+    with photo.original.open("rb") as fp:
+        try:
+            variants = render_variants(fp)
+        except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+            # 다시 시도해도 결과가 같으므로 job 을 실패시키지 않는다.
+            photo.status = Photo.StatusChoices.FAILED
+            photo.save(update_fields=["status", "updated_at"])
+            return photo
+
+    for size, (_, _, encoded) in variants.items():
+        for fmt, data in encoded.items():
+            name = photo_variant_name(photo.key, size, OUTPUT_FORMATS[fmt][1])
+            # 재시도로 다시 만들 때도 같은 이름을 써야 URL 이 맞는다. (storage 는 이름이 겹치면 바꿔서 저장한다)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(data))
+
+    photo.variants = {size: [width, height] for size, (width, height, _) in variants.items()}
+    photo.status = Photo.StatusChoices.READY
+    photo.save(update_fields=["variants", "status", "updated_at"])
+    photo_ready.send(sender=Photo, photo=photo)
+    return photo
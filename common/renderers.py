@@ -0,0 +1,66 @@
+"""
+orjson 을 쓰는 DRF JSON renderer / parser
+
+REST_FRAMEWORK 의 DEFAULT_RENDERER_CLASSES / DEFAULT_PARSER_CLASSES 에 넣어 쓴다.
+출력은 DRF JSONRenderer(stdlib json, compact, ensure_ascii=False)와 같다.
+
+- datetime 은 orjson 이 직접 ISO 8601 로 만들고 UTC 는 "Z" 로 끝낸다. (DRF encoder 와 같음)
+- Decimal, lazy string(gettext_lazy), timedelta, QuerySet 등 orjson 이 모르는 type은 DRF encoder 의 default 로 바꾼다.
+- orjson 이 설치되지 않았거나, indent 를 요청했거나(browsable API), orjson 이 못 다루는 값(64bit를 넘는 정수 등)이면 stdlib 로 처리한다.
+"""
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - requirements.txt 에 있지만 없으면 stdlib 로 동작
+    orjson = None
+
+# orjson 이 모르는 type은 DRF encoder 로 바꾼다.
+_default = encoders.JSONEncoder().default
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # orjson.JSONEncodeError (TypeError) - 64bit를 넘는 정수 등
+            return super().render(data, accepted_media_type, renderer_context)
+        # DRF JSONRenderer 처럼 javascript 안에 넣어도 안전하도록 U+2028, U+2029 를 escape 한다.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if encoding.lower().replace("-", "") != "utf8":
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:
+            # orjson.JSONDecodeError, UnicodeDecodeError 는 ValueError
+            raise ParseError("JSON parse error - %s" % str(exc))
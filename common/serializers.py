@@ -0,0 +1,253 @@
+"""
+목록 API 용 읽기 전용 serializer (.values() row -> dict)
+
+ModelSerializer 는 row 마다 model instance 를 만들고 field 마다 get_attribute / to_representation 을 호출한다.
+ValuesSerializer 는 필요한 column 만 .values() 로 읽고, field 마다 미리 만들어 둔 mapper(row -> 값, itemgetter 등)로 바로 dict 를 만든다.
+timezone, request.user 처럼 요청마다 달라지는 값은 mapper 를 만들 때(data 호출마다 한 번) 정한다.
+
+    class ReviewValuesSerializer(ValuesSerializer):
+        fields = {
+            "pk": "pk",
+            "user": Nested("user__", {"pk": "pk", "date_joined": DateTimeColumn("date_joined")}),
+            "total_rating": Method(*RATING_FIELDS),   # get_total_rating(row)
+        }
+
+    ReviewValuesSerializer.from_queryset(queryset[start:end]).data
+
+출력은 대응하는 ModelSerializer 와 JSON 이 byte 단위로 같아야 한다. (각 app tests 의 parity test)
+
+sparse fieldset (?fields=name,store_photo / ?exclude=description)
+view 는 requested_fields() 로 고른 field 집합을 context["fields"] 로 넘기고, prepare_queryset(queryset, fields) 로
+그 field 에 필요한 annotate / select_related / prefetch 만 붙인다. ValuesSerializer 는 필요한 column 만 읽는다.
+"""
+
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from . import photos
+from .models import Photo
+
+
+def _split(value):
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def requested_fields(request, available):
+    """
+    ?fields= / ?exclude= 로 고른 field 이름 집합. 둘 다 없으면 None (전부)
+    available 에 없는 이름이 있으면 400
+    """
+    fields = _split(request.query_params.get("fields"))
+    exclude = _split(request.query_params.get("exclude"))
+    if fields is None and exclude is None:
+        return None
+    unknown = ((fields or set()) | (exclude or set())) - set(available)
+    if unknown:
+        raise ParseError(detail=f"Invalid field name: {', '.join(sorted(unknown))}")
+    if fields is None:
+        fields = set(available)
+    return frozenset(fields - (exclude or set()))
+
+
+def wants(fields, *names):
+    """fields(None 이면 전부) 에 names 중 하나라도 있는지"""
+    return fields is None or not fields.isdisjoint(names)
+
+
+class SparseFieldsMixin:
+    """ModelSerializer 용. context["fields"] 에 없는 field 는 출력에서 뺀다. (SerializerMethodField 도 호출하지 않는다)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get("fields")
+        if fields is not None:
+            for name in list(self.fields):
+                if name not in fields:
+                    self.fields.pop(name)
+
+    @classmethod
+    def field_names(cls):
+        # serializer 를 만들어야 알 수 있으므로 class 마다 한 번만 계산한다.
+        if "_field_names" not in cls.__dict__:
+            cls._field_names = tuple(cls().fields)
+        return cls._field_names
+
+    @classmethod
+    def prepare_queryset(cls, queryset, fields):
+        """fields 를 출력하는 데 필요한 annotate / select_related / prefetch 를 붙인다."""
+        return queryset
+
+
+def datetime_representation(value, tz=None):
+    """DRF DateTimeField.to_representation 과 같은 값 (현재 timezone 의 ISO 8601)"""
+    tz = tz or timezone.get_current_timezone()
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, tz)
+    value = value.astimezone(tz).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+class Column:
+    """row[source] 를 그대로, convert 가 있으면 변환해서 쓴다. None 은 DRF 처럼 변환하지 않는다."""
+
+    def __init__(self, source, convert=None):
+        self.source = source
+        self.convert = convert
+        self.columns = (source,)
+        self.get = itemgetter(source)
+
+    def prefixed(self, prefix):
+        return type(self)(prefix + self.source, self.convert)
+
+    def bind(self, serializer, name):
+        """serializer.data 를 만들 때 한 번 호출해 row -> 값 함수를 만든다."""
+        get, convert = self.get, self.convert
+        if convert is None:
+            return get
+
+        def map(row):
+            value = get(row)
+            return None if value is None else convert(value)
+
+        return map
+
+
+class DateTimeColumn(Column):
+
+    def __init__(self, source, convert=None):
+        super().__init__(source)
+
+    def bind(self, serializer, name):
+        # 현재 timezone 조회(thread/async local)는 row 마다 하지 않고 한 번만 한다.
+        get, tz = self.get, timezone.get_current_timezone()
+
+        def map(row):
+            value = get(row)
+            return None if value is None else datetime_representation(value, tz)
+
+        return map
+
+
+class Method:
+    """SerializerMethodField 처럼 serializer 의 get_<이름>(row) 가 값을 만든다. columns 는 그 method 가 읽는 column"""
+
+    def __init__(self, *columns):
+        self.columns = columns
+
+    def bind(self, serializer, name):
+        return getattr(serializer, f"get_{name}")
+
+
+class Nested:
+    """FK 로 연결된 model 을 prefix 가 붙은 column 들로 dict 로 만든다. (nested ModelSerializer)"""
+
+    def __init__(self, prefix, fields):
+        self.fields = tuple(
+            (name, (Column(spec) if isinstance(spec, str) else spec).prefixed(prefix))
+            for name, spec in fields.items()
+        )
+        self.columns = tuple(column for _, spec in self.fields for column in spec.columns)
+
+    def bind(self, serializer, name):
+        mappers = tuple((name, spec.bind(serializer, name)) for name, spec in self.fields)
+        return lambda row: {name: map(row) for name, map in mappers}
+
+
+class ValuesSerializer:
+    # 출력 이름 -> column 이름 | Column | Nested | Method (dict 순서가 출력 순서)
+    fields = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(
+            (name, Column(spec) if isinstance(spec, str) else spec)
+            for name, spec in cls.fields.items()
+        )
+        cls.columns = tuple(dict.fromkeys(column for _, spec in cls._fields for column in spec.columns))
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = context or {}
+
+    @classmethod
+    def field_names(cls):
+        return tuple(cls.fields)
+
+    @classmethod
+    def columns_for(cls, fields):
+        if fields is None:
+            return cls.columns
+        return tuple(dict.fromkeys(
+            column for name, spec in cls._fields if name in fields for column in spec.columns
+        ))
+
+    @classmethod
+    def prepare_queryset(cls, queryset, fields):
+        """fields 를 출력하는 데 필요한 annotate 를 붙인다. (join 은 .values() column 이 알아서 한다)"""
+        return queryset
+
+    @classmethod
+    def from_queryset(cls, queryset, context=None):
+        fields = (context or {}).get("fields")
+        return cls(queryset.values(*cls.columns_for(fields)), context=context)
+
+    @property
+    def data(self):
+        fields = self.context.get("fields")
+        mappers = [
+            (name, spec.bind(self, name))
+            for name, spec in self._fields
+            if fields is None or name in fields
+        ]
+        return ReturnList(
+            [{name: map(row) for name, map in mappers} for row in self.rows],
+            serializer=self,
+        )
+
+
+class PhotoUploadSerializer(serializers.Serializer):
+    """multipart 로 받은 사진 파일 하나. 저장하면 원본을 storage 에 올리고 변환 job 을 등록한다."""
+
+    image = serializers.FileField()
+
+    def validate_image(self, image):
+        if image.size > settings.PHOTO_MAX_UPLOAD_BYTES:
+            raise serializers.ValidationError(
+                f"사진은 {settings.PHOTO_MAX_UPLOAD_BYTES // (1024 * 1024)}MB 까지 올릴 수 있습니다."
+            )
+        try:
+            self.image_info = photos.read_image(image)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+        return image
+
+    def create(self, validated_data):
+        return photos.create_photo(validated_data["image"], *self.image_info, owner=validated_data.get("owner"))
+
+
+class PhotoSerializer(serializers.ModelSerializer):
+    # store_photo / review_photo 에 그대로 넣을 수 있는 원본 URL
+    url = serializers.SerializerMethodField()
+    sizes = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Photo
+        fields = ("pk", "url", "width", "height", "status", "sizes", "created_at")
+
+    def get_url(self, photo):
+        request = self.context.get("request")
+        return request.build_absolute_uri(photo.url) if request else photo.url
+
+    def get_sizes(self, photo):
+        if photo.status != Photo.StatusChoices.READY:
+            return None
+        return photos.sizes(self.get_url(photo), photo.variants)
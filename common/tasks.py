@@ -0,0 +1,13 @@
+from .jobs import task
+from .models import Photo
+from . import photos
+
+
+@task("common.process_photo")
+def process_photo(job, photo_pk):
+    """업로드된 원본으로 크기별 thumbnail / WebP 를 만든다."""
+    photo = Photo.objects.filter(pk=photo_pk).first()
+    if photo is None:
+        return
+    photos.process(photo)
+    job.update_progress(status=photo.status)
@@ -1,3 +1,577 @@
-from django.test import TestCase
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone as django_timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+from rest_framework.views import APIView
+from rest_framework.utils.serializer_helpers import ReturnDict
+from PIL import Image
+import sentry_sdk
+
+from config import db_router, log, schema, sentry, startup
+
+from users.models import User
+
+from . import jobs, photos, renderers
+from .db.pool import ConnectionPool, PoolTimeout
+from .models import Job, Photo
+
+
+calls = []
+
+
+@jobs.task("common.tests.record")
+def record(job, value):
+    calls.append(value)
+
+
+@jobs.task("common.tests.explode")
+def explode(job):
+    raise RuntimeError("boom")
+
+
+class TestJobs(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        job = jobs.enqueue(record, {"value": 3})
+        self.assertEqual(jobs.run_pending(), 1)
+        self.assertEqual(calls, [3])
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.StatusChoices.DONE)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.duration_ms)
+
+    def test_claimed_job_is_not_claimed_twice(self):
+        jobs.enqueue("common.tests.record", {"value": 1})
+        self.assertEqual(len(jobs.claim("a", batch=10)), 1)
+        self.assertEqual(jobs.claim("b", batch=10), [])
+
+    def test_failed_job_is_retried_with_backoff_then_fails(self):
+        job = jobs.enqueue("common.tests.explode", max_attempts=2)
+        jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.StatusChoices.QUEUED)
+        self.assertGreater(job.run_at, job.finished_at)
+        self.assertIn("boom", job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=job.finished_at)
+        jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.StatusChoices.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def stale(self, job):
+        Job.objects.filter(pk=job.pk).update(locked_at=django_timezone.now() - timedelta(seconds=601))
+
+    @override_settings(JOB_LOCK_TIMEOUT=600)
+    def test_heartbeat_keeps_running_job_locked(self):
+        job = jobs.enqueue(record, {"value": 1})
+        jobs.claim("a")
+        self.stale(job)
+        self.assertEqual(jobs.heartbeat("b", [job.pk]), 0)
+        self.assertEqual(jobs.heartbeat("a", [job.pk]), 1)
+        self.assertEqual(jobs.requeue_stale(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.StatusChoices.RUNNING)
+
+        self.stale(job)
+        job.update_progress(step=1)
+        self.assertEqual(jobs.requeue_stale(), 0)
+
+    @override_settings(JOB_LOCK_TIMEOUT=600)
+    def test_stale_job_counts_as_attempt_then_fails(self):
+        job = jobs.enqueue(record, {"value": 1}, max_attempts=2)
+        jobs.claim("a")
+        self.stale(job)
+        self.assertEqual(jobs.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.StatusChoices.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at, django_timezone.now())
+        self.assertIn("heartbeat", job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=django_timezone.now())
+        jobs.claim("a")
+        self.stale(job)
+        self.assertEqual(jobs.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.StatusChoices.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(calls, [])
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], REPLICA_LAG_CHECK_SECONDS=10, REPLICA_MAX_LAG_SECONDS=2)
+class TestReplicaRouter(SimpleTestCase):
+
+    def setUp(self):
+        db_router._lag_checked.clear()
+        self.addCleanup(db_router._lag_checked.clear)
+        self.router = db_router.ReplicaRouter()
+
+    def test_reads_go_to_replica_only_inside_replica_reads(self):
+        with mock.patch.object(db_router, "replica_lag", return_value=0):
+            self.assertIsNone(self.router.db_for_read(Job))
+            with db_router.replica_reads():
+                self.assertEqual(self.router.db_for_read(Job), "replica")
+                self.assertEqual(self.router.db_for_write(Job), "default")
+        self.assertFalse(self.router.allow_migrate("replica", "common"))
+
+    def test_lagging_or_broken_replica_falls_back_to_primary(self):
+        with mock.patch.object(db_router, "replica_lag", return_value=30), db_router.replica_reads():
+            self.assertIsNone(self.router.db_for_read(Job))
+
+        db_router._lag_checked.clear()
+        with mock.patch.object(db_router, "replica_lag", side_effect=DatabaseError), db_router.replica_reads():
+            self.assertIsNone(self.router.db_for_read(Job))
+
+    def test_write_pins_client_to_primary(self):
+        request = RequestFactory().post("/api/v1/stores")
+        response = db_router.ReplicaPinMiddleware(lambda request: HttpResponse(status=201))(request)
+        self.assertIn("primary_pin", response.cookies)
+
+        request = RequestFactory().get("/api/v1/stores")
+        request.COOKIES["primary_pin"] = "1"
+        self.assertTrue(db_router.is_pinned_to_primary(request))
+
+    def test_write_pins_authenticated_user_without_cookie(self):
+        class Read(db_router.ReplicaReadMixin, APIView):
+            def get(view, request):
+                return HttpResponse(self.router.db_for_read(Job) or "default")
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+        user = User(pk=7, username="spa")
+        factory = APIRequestFactory()
+
+        def read():
+            request = factory.get("/api/v1/stores")
+            force_authenticate(request, user)
+            return Read.as_view()(request).content
+
+        with mock.patch.object(db_router, "replica_lag", return_value=0):
+            self.assertEqual(read(), b"replica")
+
+            # cross-site client: 쓰기 응답의 cookie 는 다음 요청에 오지 않는다.
+            request = factory.post("/api/v1/stores")
+            request.user = user
+            db_router.ReplicaPinMiddleware(lambda request: HttpResponse(status=201))(request)
+            self.assertEqual(read(), b"default")
+
+            cache.delete(db_router.user_pin_key(user.pk))
+            self.assertEqual(read(), b"replica")
+
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+
+    def close(self):
+        self.closed = True
+
+
+def fake_ping(connection):
+    if connection.broken:
+        raise ConnectionError("server closed the connection")
+
+
+class FakePsycopgConnection(FakeConnection):
+    """psycopg2 처럼 autocommit 이 아니면 쿼리가 transaction 을 열고, transaction 안에서는 autocommit 을 못 바꾼다."""
+
+    def __init__(self, **params):
+        super().__init__()
+        self._autocommit = False
+        self.in_transaction = False
+
+    @property
+    def autocommit(self):
+        return self._autocommit
+
+    @autocommit.setter
+    def autocommit(self, value):
+        if self.in_transaction:
+            raise DatabaseError("set_session cannot be used inside a transaction")
+        self._autocommit = value
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql):
+                if not connection.autocommit:
+                    connection.in_transaction = True
+
+        return Cursor()
+
+    def rollback(self):
+        self.in_transaction = False
+
+
+class TestConnectionPool(SimpleTestCase):
+
+    def make_pool(self, **kwargs):
+        options = dict(connect=FakeConnection, min_size=1, max_size=2, timeout=0.05, ping=fake_ping, ping_after=0)
+        options.update(kwargs)
+        return ConnectionPool(**options)
+
+    def test_reuses_released_connection(self):
+        pool = self.make_pool()
+        connection = pool.acquire()
+        pool.release(connection)
+        self.assertIs(pool.acquire(), connection)
+        self.assertEqual(pool.stats()["created"], 1)
+
+    def test_waits_then_times_out_at_max_size(self):
+        pool = self.make_pool()
+        pool.acquire(), pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        stats = pool.stats()
+        self.assertEqual((stats["in_use"], stats["timeouts"]), (2, 1))
+
+    def test_replaces_broken_and_expired_connections(self):
+        pool = self.make_pool(max_lifetime=60)
+        connection = pool.acquire()
+        pool.release(connection)
+        connection.broken = True
+        fresh = pool.acquire()
+        self.assertIsNot(fresh, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()["ping_failures"], 1)
+
+        with mock.patch("common.db.pool.time.monotonic", return_value=time.monotonic() + 120):
+            pool.release(fresh)
+        self.assertTrue(fresh.closed)
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_warm_opens_min_size(self):
+        pool = self.make_pool(min_size=2)
+        pool.warm()
+        self.assertEqual(pool.stats()["idle"], 2)
+
+    def test_maintain_trims_idle_and_refills_min_size(self):
+        pool = self.make_pool(min_size=1, max_size=3, max_idle=60)
+        connections = [pool.acquire() for _ in range(3)]
+        for connection in connections:
+            pool.release(connection)
+        with mock.patch("common.db.pool.time.monotonic", return_value=time.monotonic() + 120):
+            self.assertEqual(pool.maintain(), 2)
+        self.assertEqual(pool.stats()["idle"], 1)
+        self.assertEqual(sum(connection.closed for connection in connections), 2)
+
+        pool.release(pool.acquire(), discard=True)
+        self.assertEqual(pool.stats()["size"], 0)
+        pool.maintain()
+        self.assertEqual((pool.stats()["idle"], pool.stats()["created"]), (1, 4))
+
+    def test_closed_pool_closes_connections_on_release(self):
+        pool = self.make_pool()
+        idle, in_use = pool.acquire(), pool.acquire()
+        pool.release(idle)
+        pool.close_all()
+        self.assertTrue(idle.closed)
+        pool.release(in_use)
+        self.assertTrue(in_use.closed)
+        pool.maintain()
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_warmed_postgres_connection_can_be_pinged_and_handed_to_django(self):
+        from common.db.pooled_postgresql import base as pooled
+
+        with mock.patch.object(pooled.base.Database, "connect", FakePsycopgConnection), \
+                mock.patch.object(pooled.base, "is_psycopg3", True):
+            pool = self.make_pool(connect=lambda: pooled.connect({}), ping=pooled.ping, min_size=2)
+            pool.warm()
+        connection = pool.acquire()
+        self.assertFalse(connection.in_transaction)
+        # Django 의 connect() 가 하는 것처럼 autocommit 을 바꿀 수 있다.
+        connection.autocommit = True
+
+    def test_warm_up_closes_pools_before_fork(self):
+        pooled = mock.Mock()
+        with mock.patch("config.startup.connections") as connections:
+            connections.all.return_value = [pooled]
+            startup.warm_up()
+        pooled.close.assert_called_once_with()
+        pooled.close_pool.assert_called_once_with()
+
+
+class TestQueueLogging(SimpleTestCase):
+
+    def test_writes_json_lines_with_request_id_and_rotates(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        filename = os.path.join(directory, "app.log")
+        handler = log.QueueFileHandler(filename, max_bytes=300, backup_count=2)
+        handler.setFormatter(log.JsonFormatter())
+        handler.addFilter(log.RequestIdFilter())
+        logger = logging.getLogger("common.tests.queue_logging")
+        logger.addHandler(handler)
+        logger.propagate = False
+        self.addCleanup(logger.removeHandler, handler)
+
+        token = log.request_id_var.set("req-1")
+        for i in range(10):
+            logger.warning("line %s", i)
+        log.request_id_var.reset(token)
+        handler.close()
+
+        # process 마다 pid를 붙인 파일에 쓴다.
+        filename = os.path.join(directory, f"app.{os.getpid()}.log")
+        with open(filename, encoding="utf-8") as f:
+            last = json.loads(f.read().splitlines()[-1])
+        self.assertEqual((last["message"], last["request_id"]), ("line 9", "req-1"))
+        self.assertTrue(os.path.exists(filename + ".1"))
+        self.assertFalse(os.path.exists(filename + ".3"))
+
+    def test_prunes_files_of_finished_processes_and_keeps_records_intact(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        # 끝난 process의 pid (waitpid 한 자식)
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0)
+        os.waitpid(pid, 0)
+        for name in (f"app.{pid}.log", f"app.{pid}.log.1", f"app.{os.getppid()}.log", "other.log"):
+            open(os.path.join(directory, name), "w").close()
+
+        handler = log.QueueFileHandler(os.path.join(directory, "app.log"))
+        self.addCleanup(handler.close)
+        self.assertEqual(sorted(os.listdir(directory)), sorted([f"app.{os.getppid()}.log", "other.log"]))
+
+        record = logging.LogRecord("x", logging.WARNING, __file__, 1, "line %s", (1,), None)
+        handler.prepare(record)
+        self.assertEqual((record.msg, record.args), ("line %s", (1,)))
+
+    def test_request_id_header(self):
+        response = self.client.get("/no-such-page", headers={"X-Request-ID": "abc"})
+        self.assertEqual(response["X-Request-ID"], "abc")
+        self.assertEqual(len(self.client.get("/no-such-page")["X-Request-ID"]), 32)
+
+
+class TestSentrySampling(SimpleTestCase):
+
+    def make_policy(self):
+        return sentry.SamplingPolicy(default_rate=0.5, rules=(("/api/v1/stores", 0.01),), slow_ms=500, boost_seconds=60)
+
+    def test_rates_by_path_method_and_feedback(self):
+        policy = self.make_policy()
+        get = lambda path, method="GET": policy({"wsgi_environ": {"PATH_INFO": path, "REQUEST_METHOD": method}})
+
+        self.assertEqual(get("/static/admin/base.css"), 0.0)
+        self.assertEqual(get("/api/v1/stores"), 0.01)
+        self.assertEqual(get("/api/v1/stores", "POST"), 0.5)
+        self.assertEqual(get("/api/v1/notices"), 0.5)
+        self.assertIs(policy({"parent_sampled": True}), True)
+
+        policy.record("/api/v1/stores/3", 900, 200)
+        policy.record("/api/v1/notices", 10, 500)
+        self.assertEqual(get("/api/v1/stores/7"), 1.0)
+        self.assertEqual(get("/api/v1/notices"), 1.0)
+        self.assertEqual(get("/api/v1/stores"), 0.01)
+
+        stats = policy.stats()
+        self.assertEqual((stats["ignored"], stats["boosted"], stats["slow"], stats["errors"]), (1, 2, 1, 1))
+
+    def test_boosted_endpoints_are_pruned_and_capped(self):
+        policy = self.make_policy()
+        policy.max_boosted = 3
+        policy.record("/api/v1/users/alice/reviews", 900, 200, now=0)
+        policy.record("/api/v1/users/bob/reviews", 900, 200, now=30)
+        policy.record("/api/v1/users/carol/reviews", 900, 200, now=70)
+        self.assertEqual(len(policy._boost_until), 2)
+
+        policy.record("/wp-login.php", 900, 404, now=71)
+        policy.record("/api/v1/users/bob/reviews", 900, 200, now=72)
+        policy.record("/.env", 900, 404, now=73)
+        self.assertEqual(list(policy._boost_until), ["/wp-login.php", "/api/v1/users/bob/reviews", "/.env"])
+        self.assertEqual(policy.rate_for("/api/v1/users/carol/reviews", now=74), (0.5, "default"))
+
+    def test_only_sampled_transactions_reach_transport(self):
+        policy = self.make_policy()
+        policy.record("/api/v1/stores/1", 900, 200)
+        transport = sentry.MemoryTransport()
+        sentry_sdk.init(dsn="http://public@localhost/1", transport=transport, traces_sampler=policy)
+        self.addCleanup(sentry_sdk.init)
+
+        for path in ("/static/app.js", "/api/v1/stores/1"):
+            context = {"wsgi_environ": {"PATH_INFO": path, "REQUEST_METHOD": "GET"}}
+            with sentry_sdk.start_transaction(name=path, op="http.server", custom_sampling_context=context):
+                pass
+        sentry_sdk.flush()
+
+        sent = [item.payload.json["transaction"] for item in transport.items("transaction")]
+        self.assertEqual(sent, ["/api/v1/stores/1"])
+
+
+class TestSchemaViews(SimpleTestCase):
+
+    def test_serves_prebuilt_schema_file(self):
+        with mock.patch.object(schema, "static_schema_url", return_value="/static/schema/openapi.json"):
+            page = self.client.get("/swagger/")
+            spec = self.client.get("/redoc/?format=openapi")
+        self.assertContains(page, 'url: "/static/schema/openapi.json"')
+        self.assertRedirects(spec, "/static/schema/openapi.json", fetch_redirect_response=False)
+
+    def test_falls_back_to_runtime_generation(self):
+        with mock.patch.object(schema, "static_schema_url", return_value=None):
+            response = self.client.get("/swagger/?format=openapi")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("/stores", json.loads(response.content)["paths"])
+
+
+class TestFastJSON(SimpleTestCase):
+
+    data = ReturnDict(
+        {
+            "pk": 1,
+            "name": "카페 \u2028 delight",
+            "created_at": datetime(2024, 5, 1, 12, 30, 5, 123456, tzinfo=timezone.utc),
+            "naive": datetime(2024, 5, 1, 12, 30),
+            "opened": date(2024, 5, 1),
+            "price": Decimal("12.50"),
+            "duration": timedelta(minutes=3),
+            "label": gettext_lazy("Korean"),
+            "uuid": uuid.UUID(int=7),
+            "ratings": [None, 4.5, 3],
+            "tags": ("a", "b"),
+            3: "int key",
+        },
+        serializer=None,
+    )
+
+    def test_matches_drf_json_renderer(self):
+        fast = renderers.FastJSONRenderer().render(self.data, "application/json")
+        self.assertEqual(fast, JSONRenderer().render(self.data, "application/json"))
+
+    def test_falls_back_to_stdlib(self):
+        expected = JSONRenderer().render(self.data, "application/json; indent=4")
+        self.assertEqual(renderers.FastJSONRenderer().render(self.data, "application/json; indent=4"), expected)
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(renderers.FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        # orjson 은 64bit를 넘는 정수를 못 다룬다.
+        self.assertEqual(renderers.FastJSONRenderer().render({"big": 2 ** 70}), b'{"big":1180591620717411303424}')
+
+    def test_parser(self):
+        parser = renderers.FastJSONParser()
+        body = '{"name": "맛집", "ratings": [1, 2.5, null]}'
+        self.assertEqual(parser.parse(BytesIO(body.encode())), {"name": "맛집", "ratings": [1, 2.5, None]})
+        context = {"encoding": "euc-kr"}
+        self.assertEqual(parser.parse(BytesIO(body.encode("euc-kr")), parser_context=context)["name"], "맛집")
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b'{"name": '))
+
+    def test_api_uses_fast_renderer(self):
+        response = self.client.post("/api/v1/users/log-in", "{bad json", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIsInstance(response.accepted_renderer, renderers.FastJSONRenderer)
+
+
+def make_image(fmt="JPEG", size=(2000, 1000), mode="RGB", orientation=None):
+    image = Image.new(mode, size, (200, 80, 40, 128)[:len(mode)])
+    buffer = BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    image.save(buffer, fmt, exif=exif)
+    return buffer.getvalue()
+
+
+class TestPhotos(APITestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create(username="uploader")
+        self.client.force_authenticate(self.user)
+
+    def upload(self, data, name="photo.png"):
+        return self.client.post("/api/v1/photos", {"image": SimpleUploadedFile(name, data)}, format="multipart")
+
+    def test_upload_then_background_sizes(self):
+        response = self.upload(make_image("PNG", mode="RGBA"))
+        self.assertEqual(response.status_code, 201)
+        photo = response.json()
+        self.assertEqual(photo["status"], "pending")
+        self.assertIsNone(photo["sizes"])
+        self.assertEqual((photo["width"], photo["height"]), (2000, 1000))
+        self.assertRegex(photo["url"], r"^http://testserver/media/photos/[0-9a-f]{32}/original\.png$")
+        self.assertTrue(Job.objects.filter(name="common.process_photo").exists())
+
+        self.assertEqual(jobs.run_pending(), 1)
+        photo = self.client.get(f"/api/v1/photos/{photo['pk']}").json()
+        self.assertEqual(photo["status"], "ready")
+        card = photo["sizes"]["card"]
+        self.assertEqual((card["width"], card["height"]), (480, 240))
+        self.assertEqual(card["webp"], photo["url"].replace("original.png", "card.webp"))
+        self.assertEqual(photo["sizes"]["thumb"]["jpeg"], photo["url"].replace("original.png", "thumb.jpg"))
+
+        key = photos.photo_key(photo["url"])
+        with default_storage.open(f"photos/{key}/card.webp") as fp, Image.open(fp) as image:
+            self.assertEqual((image.format, image.size), ("WEBP", (480, 240)))
+        with default_storage.open(f"photos/{key}/large.jpg") as fp, Image.open(fp) as image:
+            self.assertEqual((image.format, image.mode, image.size), ("JPEG", "RGB", (1280, 640)))
+
+    def test_rejects_invalid_uploads(self):
+        self.assertEqual(self.upload(b"not an image", name="a.png").status_code, 400)
+        self.assertEqual(self.upload(make_image("GIF", mode="P"), name="a.gif").status_code, 400)
+        with override_settings(PHOTO_MAX_UPLOAD_BYTES=10):
+            self.assertEqual(self.upload(make_image()).status_code, 400)
+        self.assertFalse(Photo.objects.exists())
+
+        self.client.force_authenticate(None)
+        self.assertIn(self.upload(make_image()).status_code, (401, 403))
+        other = Photo.objects.create(owner=None, original="photos/x/original.jpg")
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(f"/api/v1/photos/{other.pk}").status_code, 404)
+
+    def test_render_variants_uses_exif_orientation_and_never_upscales(self):
+        fmt, width, height = photos.read_image(BytesIO(make_image(size=(4000, 3000), orientation=6)))
+        self.assertEqual((fmt, width, height), ("JPEG", 3000, 4000))
+        variants = photos.render_variants(BytesIO(make_image(size=(4000, 3000), orientation=6)))
+        self.assertEqual({size: variant[:2] for size, variant in variants.items()}, {
+            "large": (960, 1280), "card": (360, 480), "thumb": (120, 160),
+        })
+        small = photos.render_variants(BytesIO(make_image(size=(300, 200))))
+        self.assertEqual(small["large"][:2], (300, 200))
+        self.assertEqual(small["thumb"][:2], (160, 107))
+
+    def test_unreadable_original_marks_photo_failed(self):
+        photo = photos.create_photo(SimpleUploadedFile("a.jpg", b"broken"), "JPEG", 10, 10, owner=self.user)
+        jobs.run_pending()
+        photo.refresh_from_db()
+        self.assertEqual(photo.status, Photo.StatusChoices.FAILED)
+        self.assertEqual(Job.objects.get().status, Job.StatusChoices.DONE)
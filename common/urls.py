@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("photos", views.Photos.as_view()),
+    path("photos/<int:pk>", views.PhotoDetail.as_view()),
+]
@@ -1,3 +1,53 @@
-from django.shortcuts import render
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST
+from rest_framework.views import APIView
 
-# Create your views here.
+from .models import Photo
+from .serializers import PhotoSerializer, PhotoUploadSerializer
+
+# swagger 추가
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+
+class Photos(APIView):
+    """사진 업로드. 응답의 url 을 store_photo / review_photo 에 넣으면 변환이 끝난 뒤 크기별 URL 로 내려간다."""
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    # swagger
+    @swagger_auto_schema(
+        operation_description="Upload a photo (JPEG, PNG, WebP). Thumbnails and WebP variants are generated in the background.",
+        manual_parameters=[
+            openapi.Parameter('image', openapi.IN_FORM, description="Image file", type=openapi.TYPE_FILE, required=True)
+        ],
+        responses={201: PhotoSerializer, 400: "Bad Request"}
+    )
+    def post(self, request):
+        serializer = PhotoUploadSerializer(data=request.data)
+        if serializer.is_valid():
+            photo = serializer.save(owner=request.user)
+            return Response(PhotoSerializer(photo, context={"request": request}).data, status=HTTP_201_CREATED)
+        return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
+
+
+class PhotoDetail(APIView):
+    """업로드한 사진의 변환 상태 (status 가 ready 가 되면 sizes 에 크기별 URL 이 나온다)"""
+
+    permission_classes = [IsAuthenticated]
+
+    # swagger
+    @swagger_auto_schema(
+        operation_description="Retrieve an uploaded photo and its generated sizes",
+        responses={200: PhotoSerializer, 404: "Not Found"}
+    )
+    def get(self, request, pk):
+        try:
+            photo = Photo.objects.get(pk=pk, owner=request.user)
+        except Photo.DoesNotExist:
+            raise NotFound
+        return Response(PhotoSerializer(photo, context={"request": request}).data)
@@ -3,6 +3,10 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Kakao 로그인/회원가입 async view 전용 서비스 (render.yaml 의 delightspotbackend-auth).
+나머지 API는 sync view라서 ASGI에서는 thread 하나로 직렬화되므로 WSGI 서비스(config/wsgi.py)에서만 제공한다.
+middleware 도 async 를 지원하는 것만 쓴다. (settings.ASGI_MIDDLEWARE)
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -12,5 +16,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'config.urls_async')
 
 application = get_asgi_application()
@@ -3,13 +3,6 @@ from rest_framework.exceptions import AuthenticationFailed
 from users.models import User
 from django.conf import settings
 import jwt
-import os
-import environ
-from pathlib import Path
-
-env = environ.Env()
-BASE_DIR = Path(__file__).resolve().parent.parent
-environ.Env.read_env(os.path.join(BASE_DIR, ".env"))
 
 class JWTAuthentication(BaseAuthentication):
     def authenticate(self, request):
@@ -18,7 +11,7 @@ class JWTAuthentication(BaseAuthentication):
             return None
         decode = jwt.decode(
             token,
-            env("SECRET_KEY"),
+            settings.SECRET_KEY,
             algorithms=["HS256"],
         )
         pk = decode.get("pk")
@@ -26,6 +19,9 @@ class JWTAuthentication(BaseAuthentication):
             raise AuthenticationFailed("Invalid Token")
         try:
             user = User.objects.get(pk=pk)
-            return (user, None)
         except User.DoesNotExist:
-            raise AuthenticationFailed("User Not Found")
\ No newline at end of file
+            raise AuthenticationFailed("User Not Found")
+        if not user.is_active:
+            # 탈퇴(soft delete) 후 users.purge_user job 이 지우기 전까지는 row 가 남아 있다.
+            raise AuthenticationFailed("Account Is Being Deleted")
+        return (user, None)
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""
+read replica database router
+
+ReplicaReadMixin을 붙인 APIView의 GET/HEAD/OPTIONS 요청만 settings.DATABASE_REPLICAS 로 읽고,
+나머지(쓰기, 다른 view, transaction 안의 조회)는 모두 primary(default)를 사용한다.
+
+- read-your-writes: API 요청이 데이터를 쓰면 ReplicaPinMiddleware가 REPLICA_PIN_SECONDS 동안
+  그 user(cache key)와 client(pin cookie)의 조회를 primary로 보낸다.
+  SPA 처럼 다른 site 에서 Authorization header(JWT)로 호출하는 client 에는 SameSite cookie가 오지 않으므로
+  로그인한 user는 cache 의 user pk key로 고정한다. 여러 process가 같이 보도록 CACHE_URL 은 공유 cache 여야 한다. (아니면 settings 에서 ImproperlyConfigured)
+- replica lag: REPLICA_LAG_CHECK_SECONDS 마다 replica 지연을 확인하고
+  REPLICA_MAX_LAG_SECONDS 보다 늦거나 연결이 안 되는 replica는 빼고, 남은 게 없으면 primary를 쓴다.
+
+로컬에서는 REPLICA_DATABASE_URLS=sqlite:///replica.sqlite3 처럼 두 번째 SQLite 파일(또는 로컬 Postgres)을 붙여 확인할 수 있다.
+"""
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+_lag_checked = {}  # alias -> (확인 시각, 사용 가능 여부)
+_lag_lock = threading.Lock()
+
+
+@contextmanager
+def replica_reads():
+    """이 block 안의 조회는 replica로 보낸다."""
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def replica_lag(alias):
+    """
+    replica가 primary보다 늦은 시간(초). 복제 상태를 알 수 없는 backend는 0
+
+    primary에 쓰기가 없으면 마지막 replay 시각이 멈춰 있으므로, 받은 WAL을 모두 replay 했으면 0이다.
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT CASE "
+            "WHEN NOT pg_is_in_recovery() THEN 0 "
+            "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+        )
+        return float(cursor.fetchone()[0])
+
+
+def replica_is_fresh(alias, now=None):
+    now = now or time.monotonic()
+    checked = _lag_checked.get(alias)
+    if checked and now - checked[0] < settings.REPLICA_LAG_CHECK_SECONDS:
+        return checked[1]
+    with _lag_lock:
+        checked = _lag_checked.get(alias)
+        if checked and now - checked[0] < settings.REPLICA_LAG_CHECK_SECONDS:
+            return checked[1]
+        try:
+            lag = replica_lag(alias)
+            fresh = lag <= settings.REPLICA_MAX_LAG_SECONDS
+            if not fresh:
+                logger.warning("replica %s is %.1fs behind, reading from primary", alias, lag)
+        except DatabaseError:
+            logger.exception("replica %s is unavailable, reading from primary", alias)
+            fresh = False
+        _lag_checked[alias] = (now, fresh)
+    return fresh
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get():
+            return None
+        # 같은 transaction 안에서는 방금 쓴 데이터를 봐야 한다.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        replicas = [alias for alias in settings.DATABASE_REPLICAS if replica_is_fresh(alias)]
+        if not replicas:
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica는 primary의 복사본이므로 같은 DB로 본다.
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+def user_pin_key(user_pk):
+    return f"{settings.REPLICA_PIN_COOKIE}:user:{user_pk}"
+
+
+def is_pinned_to_primary(request):
+    return settings.REPLICA_PIN_COOKIE in request.COOKIES
+
+
+def is_user_pinned(user):
+    return bool(user and user.is_authenticated and cache.get(user_pin_key(user.pk)))
+
+
+class ReplicaReadMixin:
+    """APIView에 붙이면 안전한 method 요청의 조회를 replica로 보낸다."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS or is_pinned_to_primary(request):
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        # JWT 인증은 DRF 가 여기서 하므로 user 별 pin 도 여기서 확인한다.
+        # 인증(user 조회)과 pin 확인은 primary 에서 한다. (방금 가입한 user, dbcache 의 pin)
+        replica = _read_from_replica.get()
+        _read_from_replica.set(False)
+        super().initial(request, *args, **kwargs)
+        if replica and not is_user_pinned(request.user):
+            _read_from_replica.set(True)
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    """API 쓰기 요청이 성공하면 잠시 동안 같은 user/client의 조회를 primary로 고정한다."""
+
+    def process_response(self, request, response):
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in SAFE_METHODS
+            and request.path_info.startswith(settings.API_PREFIX)
+            and response.status_code < 400
+        ):
+            # DRF 가 인증한 user 는 request(HttpRequest).user 에도 들어 있다.
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                cache.set(user_pin_key(user.pk), 1, settings.REPLICA_PIN_SECONDS)
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
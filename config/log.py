@@ -0,0 +1,198 @@
+"""
+queue 기반 비동기 logging
+
+요청 thread는 record를 queue에 넣기만 하고, listener thread가 JSON line으로 만들어 크기 기준으로 rotate 되는 파일에 쓴다.
+모든 record에는 RequestIdMiddleware가 정한 request_id가 붙는다.
+
+gunicorn worker, run_workers 처럼 여러 process가 같은 파일을 각자 rotate 하면 record가 사라지거나
+이미 rotate 된 파일에 쓰이므로, process 마다 pid를 붙인 파일에 쓴다. (LOG_FILE=logs/app.log -> logs/app.<pid>.log)
+파일을 열 때 이미 끝난 process의 파일(backup 포함)은 지우므로, 디스크 사용량은 살아 있는 process 수만큼으로 제한된다.
+
+logger 별 level은 LOG_LEVELS 환경변수로 바꾼다.
+
+    LOG_LEVELS="django.db.backends=DEBUG,common.jobs=INFO"
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import re
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+
+request_id_var = ContextVar("request_id", default="-")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """record 하나를 JSON 한 줄로 만든다."""
+
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            record.exc_text = record.exc_text or self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class QueueFileHandler(QueueHandler):
+    """queue에 넣기만 하는 handler. 실제 파일 쓰기는 listener thread의 RotatingFileHandler가 한다."""
+
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=5, queue_size=10000):
+        # SimpleQueue(C 구현)는 queue.Queue 보다 lock 비용이 작다. 크기 제한은 enqueue에서 한다.
+        super().__init__(queue.SimpleQueue())
+        self.queue_size = queue_size
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.target = self._open_target()
+        self.dropped = 0
+        self._start_listener()
+        atexit.register(self.close)
+        # gunicorn preload_app 처럼 fork 된 worker에는 listener thread가 없으므로 새로 띄운다.
+        os.register_at_fork(after_in_child=self._restart_after_fork)
+
+    def _open_target(self):
+        root, ext = os.path.splitext(self.filename)
+        prune_dead_process_logs(root, ext)
+        return RotatingFileHandler(
+            f"{root}.{os.getpid()}{ext}",
+            maxBytes=self.max_bytes,
+            backupCount=self.backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+
+    def _start_listener(self):
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def _restart_after_fork(self):
+        if self.listener is None:
+            return
+        # 부모의 파일 대신 자기 pid의 파일에 쓴다.
+        formatter = self.target.formatter
+        self.target.close()
+        self.target = self._open_target()
+        self.target.setFormatter(formatter)
+        self.queue = queue.SimpleQueue()
+        self._start_listener()
+
+    def setFormatter(self, fmt):
+        # dictConfig의 formatter는 파일에 쓰는 listener 쪽에서 적용한다.
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # 호출한 thread에서는 message만 확정하고(args가 나중에 바뀔 수 있으므로)
+        # traceback/JSON 변환은 listener thread에 맡긴다. 다른 handler도 같은 record를 쓰므로 복사해서 바꾼다.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.queue.qsize() >= self.queue_size:
+            # 디스크가 느려서 밀리면 요청을 막지 않고 버린다.
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            self.target.close()
+        super().close()
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 다른 user의 process (pid가 재사용됨)
+        return True
+    return True
+
+
+def prune_dead_process_logs(root, ext):
+    """root.<pid>ext (와 .1, .2 ... backup) 중 pid가 끝난 process의 파일을 지운다."""
+    directory, prefix = os.path.split(root)
+    pattern = re.compile(rf"{re.escape(prefix)}\.(\d+){re.escape(ext)}(\.\d+)?$")
+    for name in os.listdir(directory or "."):
+        match = pattern.match(name)
+        if match is None or _process_alive(int(match.group(1))):
+            continue
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            # 다른 process가 먼저 지웠다.
+            pass
+
+
+def logger_levels(value, default=None):
+    """"name=LEVEL,name=LEVEL" 를 dictConfig loggers 로 바꾼다."""
+    loggers = dict(default or {})
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, level = item.partition("=")
+        loggers[name.strip()] = {"level": level.strip().upper()}
+    return {
+        name: {"handlers": ["file"], "propagate": False, **config}
+        for name, config in loggers.items()
+    }
+
+
+def _start_request(request):
+    request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+    request.request_id = request_id[:64]
+    return request_id_var.set(request.request_id)
+
+
+def _finish_request(request, response, token):
+    request_id_var.reset(token)
+    response[REQUEST_ID_HEADER] = request.request_id
+    return response
+
+
+@sync_and_async_middleware
+def RequestIdMiddleware(get_response):
+    """요청마다 request_id를 정해 log record와 응답 header(X-Request-ID)에 붙인다."""
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            token = _start_request(request)
+            return _finish_request(request, await get_response(request), token)
+
+    else:
+
+        def middleware(request):
+            token = _start_request(request)
+            return _finish_request(request, get_response(request), token)
+
+    return middleware
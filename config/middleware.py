@@ -0,0 +1,76 @@
+"""
+token 인증 API 요청용 middleware fast path
+
+/api/v1/ client는 JWT(Authorization / Jwt header)로 인증하므로 session, CSRF, messages 처리가 필요 없다.
+아래 middleware는 Django 기본 middleware를 그대로 상속하되, token 인증 API 요청이면 건너뛴다.
+admin, swagger, session login을 쓰는 API(API_SESSION_PATHS)는 기존과 똑같이 전체 stack을 탄다.
+"""
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+TOKEN_HEADERS = ("HTTP_AUTHORIZATION", "HTTP_JWT")
+
+
+def is_token_api_request(request):
+    """session 없이 처리해도 되는 요청인지 (결과는 request에 캐시)"""
+    try:
+        return request._token_api
+    except AttributeError:
+        pass
+    path = request.path_info
+    request._token_api = (
+        path.startswith(settings.API_PREFIX)
+        and path not in settings.API_SESSION_PATHS
+        and any(request.META.get(header) for header in TOKEN_HEADERS)
+    )
+    return request._token_api
+
+
+class TokenAPIBypassMixin:
+    """token 인증 API 요청이면 원래 middleware의 hook을 실행하지 않는다."""
+
+    def process_request(self, request):
+        if is_token_api_request(request):
+            return self.bypass_request(request)
+        return super().process_request(request)
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        hook = getattr(super(), "process_view", None)
+        if hook is None or is_token_api_request(request):
+            return None
+        return hook(request, callback, callback_args, callback_kwargs)
+
+    def process_response(self, request, response):
+        hook = getattr(super(), "process_response", None)
+        if hook is None or is_token_api_request(request):
+            return response
+        return hook(request, response)
+
+    def bypass_request(self, request):
+        return None
+
+
+class APISessionMiddleware(TokenAPIBypassMixin, SessionMiddleware):
+    # session row를 읽거나 저장하지 않는다.
+    pass
+
+
+class APICsrfViewMiddleware(TokenAPIBypassMixin, CsrfViewMiddleware):
+    # cookie로 인증하지 않으므로 CSRF 검사/cookie 설정이 필요 없다.
+    pass
+
+
+class APIAuthenticationMiddleware(TokenAPIBypassMixin, AuthenticationMiddleware):
+
+    def bypass_request(self, request):
+        # 실제 유저는 DRF authentication class가 token으로 채운다.
+        request.user = AnonymousUser()
+
+
+class APIMessageMiddleware(TokenAPIBypassMixin, MessageMiddleware):
+    pass
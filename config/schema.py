@@ -0,0 +1,116 @@
+"""
+API 문서 (swagger / redoc)
+
+schema는 배포할 때 build.sh 에서 한 번 만든다.
+
+    python manage.py generate_swagger -f json -o generated_static/schema/openapi.json --overwrite
+
+만들어진 파일은 collectstatic 으로 whitenoise가 (압축/캐시해서) 서빙하고, /swagger/, /redoc/ 페이지는 그 파일을 읽는다.
+파일이 없을 때(로컬 개발 등)만 drf_yasg 런타임 생성기(drf_yasg.views, generators, inspectors)를 import 해서 요청마다 만든다.
+"""
+
+from functools import lru_cache
+
+from django.contrib.staticfiles import finders
+from django.http import HttpResponse
+from django.shortcuts import redirect
+from django.templatetags.static import static
+from drf_yasg import openapi
+from rest_framework import permissions
+
+SCHEMA_PATH = "schema/openapi.json"
+
+api_info = openapi.Info(
+    title="Delight Spot",
+    default_version='v1',
+    description="사용자들이 맛집(음식점, 카페) 또는 기타 즐거운 장소를 공유",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="jangth0056@gmail.com"),
+    license=openapi.License(name="mit"),
+)
+
+SWAGGER_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<link rel="stylesheet" href="{css}">
+</head>
+<body>
+<div id="swagger-ui"></div>
+<script src="{bundle}"></script>
+<script src="{preset}"></script>
+<script>
+window.ui = SwaggerUIBundle({{
+  url: "{schema}",
+  dom_id: "#swagger-ui",
+  presets: [SwaggerUIBundle.presets.apis, SwaggerUIStandalonePreset],
+  layout: "StandaloneLayout",
+  deepLinking: true
+}});
+</script>
+</body>
+</html>
+"""
+
+REDOC_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+</head>
+<body>
+<redoc spec-url="{schema}"></redoc>
+<script src="{redoc}"></script>
+</body>
+</html>
+"""
+
+
+# sparse fieldset 을 지원하는 조회 API 의 swagger 파라미터 (common.serializers.requested_fields)
+FIELDS_PARAMETERS = [
+    openapi.Parameter('fields', openapi.IN_QUERY, description="Comma separated fields to include", type=openapi.TYPE_STRING),
+    openapi.Parameter('exclude', openapi.IN_QUERY, description="Comma separated fields to leave out", type=openapi.TYPE_STRING),
+]
+
+
+@lru_cache
+def static_schema_url():
+    """build 때 만든 schema 파일의 static URL. 없으면 None"""
+    if finders.find(SCHEMA_PATH) is None:
+        return None
+    return static(SCHEMA_PATH)
+
+
+@lru_cache
+def runtime_view(renderer):
+    from drf_yasg.views import get_schema_view
+
+    schema_view = get_schema_view(api_info, public=True, permission_classes=(permissions.AllowAny,))
+    return schema_view.with_ui(renderer, cache_timeout=0)
+
+
+def _static_page(request, html, **assets):
+    schema_url = static_schema_url()
+    if request.GET.get("format") == "openapi":
+        return redirect(schema_url)
+    assets = {name: static(path) for name, path in assets.items()}
+    return HttpResponse(html.format(title=api_info.title, schema=schema_url, **assets))
+
+
+def swagger_ui(request):
+    if static_schema_url() is None:
+        return runtime_view("swagger")(request)
+    return _static_page(
+        request,
+        SWAGGER_HTML,
+        css="drf-yasg/swagger-ui-dist/swagger-ui.css",
+        bundle="drf-yasg/swagger-ui-dist/swagger-ui-bundle.js",
+        preset="drf-yasg/swagger-ui-dist/swagger-ui-standalone-preset.js",
+    )
+
+
+def redoc(request):
+    if static_schema_url() is None:
+        return runtime_view("redoc")(request)
+    return _static_page(request, REDOC_HTML, redoc="drf-yasg/redoc/redoc.min.js")
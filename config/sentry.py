@@ -0,0 +1,183 @@
+"""
+Sentry 초기화와 trace sampling 정책
+
+모든 요청을 trace/profile 하지 않고 SamplingPolicy(traces_sampler)가 요청마다 sampling 여부를 정한다.
+
+- health check, static 파일 요청은 sampling 하지 않는다.
+- /api/v1/stores 처럼 자주 호출되는 조회 API는 낮은 비율(SENTRY_HOT_TRACES_RATE)로, 나머지는 SENTRY_TRACES_RATE로 sampling 한다.
+- SamplingFeedbackMiddleware가 요청 결과를 알려주면, 5xx가 나거나 SENTRY_SLOW_REQUEST_MS 보다 느렸던 endpoint는
+  SENTRY_BOOST_SECONDS 동안 전부 sampling 한다. (sampling은 요청 시작 전에 정해야 하므로 같은 endpoint의 다음 요청부터 적용)
+- error event 자체는 trace sampling과 상관없이 항상 전송된다.
+
+테스트에서는 MemoryTransport를 넘겨 실제 전송 없이 envelope를 확인할 수 있다.
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+
+import sentry_sdk
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+from sentry_sdk.integrations.django import DjangoIntegration
+from sentry_sdk.transport import Transport
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_key(path):
+    """/api/v1/stores/12/reviews -> /api/v1/stores/{id}/reviews"""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+def request_info(sampling_context):
+    """(method, path). 요청이 아닌 transaction이면 (None, None)"""
+    environ = sampling_context.get("wsgi_environ")
+    if environ is not None:
+        return environ.get("REQUEST_METHOD", "GET"), environ.get("PATH_INFO", "")
+    scope = sampling_context.get("asgi_scope")
+    if scope is not None and scope.get("type") == "http":
+        return scope.get("method", "GET"), scope.get("path", "")
+    return None, None
+
+
+class SamplingPolicy:
+
+    def __init__(
+        self,
+        default_rate=0.1,
+        rules=(),
+        ignore_prefixes=("/static/", "/health", "/favicon.ico"),
+        slow_ms=1000,
+        boost_seconds=60,
+        max_boosted=1000,
+    ):
+        self.default_rate = default_rate
+        # 조회(GET/HEAD) 요청에 적용할 (path prefix, rate) 목록. 앞에 있는 규칙이 우선한다.
+        self.rules = tuple(rules)
+        self.ignore_prefixes = tuple(ignore_prefixes)
+        self.slow_ms = slow_ms
+        self.boost_seconds = boost_seconds
+        # path 마다(username 이 들어간 path, 404 probe 등) key가 생기므로 boost 중인 endpoint 수를 제한한다.
+        self.max_boosted = max_boosted
+        self.counters = Counter()
+        self._boost_until = {}
+        self._lock = threading.Lock()
+
+    def rate_for(self, path, method="GET", now=None):
+        if path.startswith(self.ignore_prefixes):
+            return 0.0, "ignored"
+        boost_until = self._boost_until.get(endpoint_key(path))
+        if boost_until is not None and (now or time.monotonic()) < boost_until:
+            return 1.0, "boosted"
+        if method in ("GET", "HEAD"):
+            for prefix, rate in self.rules:
+                if path.startswith(prefix):
+                    return rate, "rule"
+        return self.default_rate, "default"
+
+    def __call__(self, sampling_context):
+        # upstream 서비스가 이미 sampling을 정했으면 따른다.
+        parent_sampled = sampling_context.get("parent_sampled")
+        if parent_sampled is not None:
+            self._count("parent")
+            return parent_sampled
+
+        method, path = request_info(sampling_context)
+        if path is None:
+            # 요청이 아닌 transaction (management command 등)
+            self._count("default")
+            return self.default_rate
+        rate, reason = self.rate_for(path, method)
+        self._count(reason)
+        return rate
+
+    def record(self, path, duration_ms, status_code, now=None):
+        """요청이 끝난 뒤 호출한다. 느리거나 5xx 였던 endpoint는 한동안 모두 sampling 한다."""
+        if path.startswith(self.ignore_prefixes):
+            return
+        if duration_ms < self.slow_ms and status_code < 500:
+            return
+        now = time.monotonic() if now is None else now
+        key = endpoint_key(path)
+        with self._lock:
+            # 다시 넣어서 dict 순서 = boost 가 끝나는 순서로 유지한다.
+            self._boost_until.pop(key, None)
+            # 앞에서부터 끝난 boost 를 지우고, 그래도 많으면 가장 먼저 끝날 endpoint 를 지운다.
+            while self._boost_until:
+                first = next(iter(self._boost_until))
+                if self._boost_until[first] > now and len(self._boost_until) < self.max_boosted:
+                    break
+                del self._boost_until[first]
+            self._boost_until[key] = now + self.boost_seconds
+            self.counters["slow" if status_code < 500 else "errors"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["boosted_endpoints"] = sum(1 for until in self._boost_until.values() if until > time.monotonic())
+        return stats
+
+    def _count(self, reason):
+        with self._lock:
+            self.counters[reason] += 1
+
+
+policy = SamplingPolicy()
+
+
+@sync_and_async_middleware
+def SamplingFeedbackMiddleware(get_response):
+    """요청 시간과 status를 SamplingPolicy에 알려준다."""
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            start = time.perf_counter()
+            response = await get_response(request)
+            policy.record(request.path_info, (time.perf_counter() - start) * 1000, response.status_code)
+            return response
+
+    else:
+
+        def middleware(request):
+            start = time.perf_counter()
+            response = get_response(request)
+            policy.record(request.path_info, (time.perf_counter() - start) * 1000, response.status_code)
+            return response
+
+    return middleware
+
+
+class MemoryTransport(Transport):
+    """전송하지 않고 envelope를 모아두는 transport (테스트/로컬 확인용)"""
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.envelopes = []
+
+    def capture_envelope(self, envelope):
+        self.envelopes.append(envelope)
+
+    def items(self, item_type):
+        return [
+            item
+            for envelope in self.envelopes
+            for item in envelope.items
+            if item.type == item_type
+        ]
+
+
+def init(dsn, default_rate, hot_rate, slow_ms, boost_seconds, profiles_rate, **options):
+    policy.default_rate = default_rate
+    policy.rules = (("/api/v1/stores", hot_rate), ("/api/v1/notices", hot_rate))
+    policy.slow_ms = slow_ms
+    policy.boost_seconds = boost_seconds
+    sentry_sdk.init(
+        dsn=dsn,
+        integrations=[DjangoIntegration()],
+        traces_sampler=policy,
+        # sampling 된 transaction 중에서 profiling 할 비율
+        profiles_sample_rate=profiles_rate,
+        **options,
+    )
@@ -15,7 +15,10 @@ import os
 import environ
 from datetime import timedelta
 import dj_database_url
-import sentry_sdk
+from django.core.exceptions import ImproperlyConfigured
+
+from config import sentry
+from config.log import logger_levels
 
 
 env = environ.Env()
@@ -57,6 +60,7 @@ CUSTOM_APPS = [
     "bookings.apps.BookingsConfig",
     "userGroup.apps.UsergroupConfig",
     "notice.apps.NoticeConfig",
+    "regions.apps.RegionsConfig",
 ]
 
 SYSTEM_APPS = [
@@ -76,15 +80,43 @@ MIDDLEWARE = [
     "whitenoise.middleware.WhiteNoiseMiddleware",
     # 'django.middleware.security.SecurityMiddleware',
 
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'config.log.RequestIdMiddleware',
+    'config.sentry.SamplingFeedbackMiddleware',
+    # token 인증 /api/v1/ 요청은 session, CSRF, auth, messages 처리를 건너뛴다 (config/middleware.py)
+    'config.middleware.APISessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'config.middleware.APICsrfViewMiddleware',
+    'config.middleware.APIAuthenticationMiddleware',
+    'config.middleware.APIMessageMiddleware',
+    'config.db_router.ReplicaPinMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'config.urls'
+API_PREFIX = "/api/v1/"
+# token header가 있어도 session(login/logout)을 쓰는 API
+API_SESSION_PATHS = (
+    "/api/v1/users/log-in",
+    "/api/v1/users/kakao",
+    "/api/v1/users/kakao-signup",
+)
+
+# ASGI 서비스(config/asgi.py)는 Kakao async view만 있는 config.urls_async 를 쓴다.
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'config.urls')
+
+# ASGI 서비스의 middleware. 모두 async 를 지원해야 요청이 Kakao 응답을 기다리는 동안 thread 를 잡지 않는다.
+# (sync 전용 middleware 가 하나라도 있으면 Django 가 chain 을 sync_to_async / async_to_sync 로 감싼다)
+# static 파일(whitenoise), CSRF(csrf_exempt view), messages, admin 용 auth / X-Frame-Options 는 필요 없다.
+# session 은 alogin 이 쓴다.
+ASGI_MIDDLEWARE = [
+    "corsheaders.middleware.CorsMiddleware",
+    'config.log.RequestIdMiddleware',
+    'config.sentry.SamplingFeedbackMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'config.db_router.ReplicaPinMiddleware',
+]
+if ROOT_URLCONF == 'config.urls_async':
+    MIDDLEWARE = ASGI_MIDDLEWARE
 
 TEMPLATES = [
     {
@@ -118,8 +150,16 @@ if DEBUG:
     }
 else:
 
+    # 요청이 끝나면 connection을 process 공용 pool(common.db.pooled_postgresql)에 돌려준다.
     DATABASES = {
-        'default': dj_database_url.config(conn_max_age=600)
+        'default': dj_database_url.config(conn_max_age=0, engine="common.db.pooled_postgresql")
+    }
+    DATABASES['default']['POOL'] = {
+        "MIN_SIZE": env.int("DB_POOL_MIN_SIZE", default=2),
+        "MAX_SIZE": env.int("DB_POOL_MAX_SIZE", default=10),
+        "TIMEOUT": env.float("DB_POOL_TIMEOUT", default=10),
+        "MAX_LIFETIME": env.int("DB_POOL_MAX_LIFETIME", default=30 * 60),
+        "PING_AFTER": env.float("DB_POOL_PING_AFTER", default=1),
     }
 
     # DATABASES = {
@@ -133,6 +173,28 @@ else:
     #     }
     # }
 
+# read replica (config/db_router.py). 쉼표로 구분한 URL 마다 replica, replica_1, ... alias가 생긴다.
+# 로컬: REPLICA_DATABASE_URLS=sqlite:///replica.sqlite3 CACHE_URL=filecache:///tmp/delight-spot-cache
+# 쓰기 후 user pin 을 모든 worker 가 봐야 하므로 replica 를 쓰면 공유 cache(CACHE_URL)가 필요하다. (아래 CACHES)
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list("REPLICA_DATABASE_URLS", default=[])):
+    alias = "replica" if index == 0 else f"replica_{index}"
+    if DEBUG:
+        DATABASES[alias] = dj_database_url.parse(url, conn_max_age=0)
+    else:
+        # primary 와 같은 pooled backend / POOL 옵션 (replica 마다 pool 이 따로 생긴다)
+        DATABASES[alias] = dj_database_url.parse(url, conn_max_age=0, engine="common.db.pooled_postgresql")
+        DATABASES[alias]["POOL"] = dict(DATABASES["default"]["POOL"])
+    # 테스트에서는 별도 DB를 만들지 않고 default를 그대로 본다.
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["config.db_router.ReplicaRouter"]
+REPLICA_PIN_COOKIE = "primary_pin"
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=5)  # 쓰기 후 primary에서 읽는 시간 (user pin 은 CACHES 에 저장)
+REPLICA_MAX_LAG_SECONDS = env.float("REPLICA_MAX_LAG_SECONDS", default=2)
+REPLICA_LAG_CHECK_SECONDS = env.float("REPLICA_LAG_CHECK_SECONDS", default=10)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -172,9 +234,72 @@ STATIC_URL = 'static/'
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')  # DEBUG 모드에서도 STATIC_ROOT 설정
 
+# build.sh 가 generate_swagger 로 만든 schema(schema/openapi.json)를 collectstatic 에 포함한다.
+GENERATED_STATIC_DIR = os.path.join(BASE_DIR, 'generated_static')
+STATICFILES_DIRS = [GENERATED_STATIC_DIR] if os.path.isdir(GENERATED_STATIC_DIR) else []
+
+SWAGGER_SETTINGS = {
+    'DEFAULT_INFO': 'config.schema.api_info',
+}
+
 if not DEBUG:
     STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-    STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# 업로드 사진(common.photos)은 default storage 에 저장한다. 로컬(DEBUG)의 기본은 MEDIA_ROOT 아래 파일이다.
+# 운영에서는 원본을 web 서비스가 저장하고 썸네일은 별도 process(run_workers)가 만들므로 두 서비스가 같은
+# storage 를 봐야 하고, 재배포에도 파일이 남아야 한다. Render 의 disk 는 서비스마다 따로이고 배포 때 지워지므로
+# FILE_STORAGE_BACKEND=storages.backends.s3.S3Storage (S3 호환 bucket) 로 설정한다. (render.yaml 의 storage group)
+# 이때 URL 은 storage 가 만든다. (AWS_S3_CUSTOM_DOMAIN 이 있으면 그 주소)
+MEDIA_URL = env("MEDIA_URL", default="/media/")
+MEDIA_ROOT = env("MEDIA_ROOT", default=os.path.join(BASE_DIR, "media"))
+
+FILE_STORAGE_BACKEND = env(
+    "FILE_STORAGE_BACKEND",
+    default="django.core.files.storage.FileSystemStorage" if DEBUG else None,
+)
+if not FILE_STORAGE_BACKEND:
+    raise ImproperlyConfigured(
+        "운영 환경에서는 FILE_STORAGE_BACKEND 를 설정해야 합니다. "
+        "web 과 run_workers 가 같이 쓰는 storage(예: storages.backends.s3.S3Storage)가 필요합니다."
+    )
+
+FILE_STORAGE_OPTIONS = {}
+if FILE_STORAGE_BACKEND == "storages.backends.s3.S3Storage":
+    # access key 는 AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY 환경 변수에서 boto3 가 읽는다.
+    FILE_STORAGE_OPTIONS = {
+        "bucket_name": env("AWS_STORAGE_BUCKET_NAME"),
+        "endpoint_url": env("AWS_S3_ENDPOINT_URL", default=None),  # R2, MinIO 등 S3 호환 storage
+        "region_name": env("AWS_S3_REGION_NAME", default=None),
+        "custom_domain": env("AWS_S3_CUSTOM_DOMAIN", default=None),  # CDN / public bucket 주소
+        "querystring_auth": False,  # 사진 URL 은 공개 URL 로 내려준다.
+        "file_overwrite": False,
+    }
+
+STORAGES = {
+    "default": {
+        "BACKEND": FILE_STORAGE_BACKEND,
+        "OPTIONS": FILE_STORAGE_OPTIONS,
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
+
+# 사진 변환 (common.photos): 이름 -> 긴 변 px. 크기마다 JPEG 와 WebP 를 만든다.
+PHOTO_SIZES = {
+    "thumb": 160,  # 리뷰 목록, 작은 썸네일
+    "card": 480,  # store 카드 (cover_photo)
+    "large": 1280,  # 상세 화면 / 전체 화면
+}
+PHOTO_JPEG_QUALITY = 82
+PHOTO_WEBP_QUALITY = 80
+PHOTO_WEBP_METHOD = 4  # 0(빠름) ~ 6(작음). 6은 4보다 2배 이상 느리고 파일은 몇 % 작아진다.
+PHOTO_MAX_UPLOAD_BYTES = 15 * 1024 * 1024
+PHOTO_MAX_PIXELS = 50_000_000  # decompression bomb 방지
 
 
 
@@ -192,6 +317,30 @@ AUTH_USER_MODEL = "users.User"
 
 PAGE_SIZE = 10
 
+# stores/nearby 반경(m)
+NEARBY_DEFAULT_RADIUS = 1000
+NEARBY_MAX_RADIUS = 20000
+
+# cache (common.cache, replica user pin). 기본은 process 마다 따로인 메모리 cache, 예: CACHE_URL=dbcache://django_cache
+CACHES = {"default": env.cache_url("CACHE_URL", default="locmemcache://")}
+if DATABASE_REPLICAS and CACHES["default"]["BACKEND"] in (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+):
+    raise ImproperlyConfigured(
+        "REPLICA_DATABASE_URLS 를 쓰려면 CACHE_URL 에 worker 들이 같이 쓰는 cache(예: dbcache://django_cache)를 설정해야 합니다. "
+        "쓰기 후 primary 에서 읽도록 하는 user pin 이 cache 에 저장됩니다."
+    )
+FACETS_CACHE_SECONDS = 60 * 5  # stores/facets (store 가 바뀌면 version 이 올라가므로 바로 반영된다)
+
+# background job queue (common.jobs)
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_SECONDS = 5
+JOB_RETRY_MAX_SECONDS = 60 * 60
+JOB_LOCK_TIMEOUT = 60 * 10  # 이 시간 이상 heartbeat 가 없는 RUNNING job은 worker가 죽은 것으로 보고 다시 실행
+JOB_HEARTBEAT_SECONDS = 30  # run_workers 가 실행 중인 job의 locked_at 을 갱신하는 간격
+PURGE_BATCH_SIZE = 500  # soft delete 된 store/user의 cascade 삭제 batch 크기
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         "rest_framework.authentication.SessionAuthentication",
@@ -199,6 +348,16 @@ REST_FRAMEWORK = {
         "config.authentication.JWTAuthentication",
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
+    # orjson 으로 JSON 응답/요청 처리 (common.renderers, 없으면 stdlib json)
+    'DEFAULT_RENDERER_CLASSES': [
+        'common.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'common.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 REST_USE_JWT = True
@@ -213,6 +372,22 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# Kakao OAuth (users.kakao.KakaoClient)
+# KAKAO_AUTH_URL / KAKAO_API_URL 을 바꾸면 로컬 stub 서버(python manage.py kakao_stub)로 테스트할 수 있다.
+KAKAO_CLIENT_ID = env("KAKAO_CLIENT_ID", default="583f1ebb47209c90313ca9808363f605")
+# KAKAO_REDIRECT_URI = "http://127.0.0.1:3000/social/kakao"
+KAKAO_REDIRECT_URI = env("KAKAO_REDIRECT_URI", default="https://delight-spot-web.vercel.app/social/kakao")
+KAKAO_AUTH_URL = env("KAKAO_AUTH_URL", default="https://kauth.kakao.com")
+KAKAO_API_URL = env("KAKAO_API_URL", default="https://kapi.kakao.com")
+KAKAO_CONNECT_TIMEOUT = env.float("KAKAO_CONNECT_TIMEOUT", default=3.05)
+KAKAO_READ_TIMEOUT = env.float("KAKAO_READ_TIMEOUT", default=5.0)
+KAKAO_MAX_RETRIES = env.int("KAKAO_MAX_RETRIES", default=2)
+KAKAO_POOL_SIZE = env.int("KAKAO_POOL_SIZE", default=10)
+KAKAO_ASYNC_POOL_SIZE = env.int("KAKAO_ASYNC_POOL_SIZE", default=100)  # ASGI worker 하나가 동시에 기다리는 로그인 수
+KAKAO_BREAKER_FAILURES = env.int("KAKAO_BREAKER_FAILURES", default=5)  # 연속 실패 횟수
+KAKAO_BREAKER_RESET_SECONDS = env.float("KAKAO_BREAKER_RESET_SECONDS", default=30)
+KAKAO_SIGNUP_TOKEN_MAX_AGE = env.int("KAKAO_SIGNUP_TOKEN_MAX_AGE", default=600)  # 로그인 후 회원가입까지 허용 시간(초)
+
 # CORS_ALLOWED_ORIGINS = [
 #     "http://localhost:3000",
 #     "http://127.0.0.1:3000",
@@ -227,28 +402,49 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 
+# request thread는 queue에 넣기만 하고 listener thread가 JSON line으로 rotate 되는 파일에 쓴다. (config/log.py)
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'config.log.RequestIdFilter'},
+    },
+    'formatters': {
+        'json': {'()': 'config.log.JsonFormatter'},
+    },
     'handlers': {
         'file': {
             'level': 'DEBUG',
-            'class': 'logging.FileHandler',
-            'filename': os.path.join(BASE_DIR, 'debug.log'),
+            '()': 'config.log.QueueFileHandler',
+            'filename': env("LOG_FILE", default=os.path.join(BASE_DIR, 'logs', 'app.log')),
+            'max_bytes': env.int("LOG_MAX_BYTES", default=10 * 1024 * 1024),
+            'backup_count': env.int("LOG_BACKUP_COUNT", default=5),
+            'formatter': 'json',
+            'filters': ['request_id'],
         },
     },
-    'loggers': {
-        'django': {
-            'handlers': ['file'],
-            'level': 'DEBUG',
-            'propagate': True,
-        },
+    'root': {
+        'handlers': ['file'],
+        'level': 'WARNING',
     },
+    # logger 별 level: LOG_LEVELS="django.db.backends=DEBUG,common.jobs=INFO"
+    'loggers': logger_levels(
+        env("LOG_LEVELS", default=""),
+        default={
+            'django': {'level': 'INFO'},
+            'common': {'level': 'INFO'},
+            'config': {'level': 'INFO'},
+        },
+    ),
 }
 
 if not DEBUG:
-    sentry_sdk.init(
-    dsn="https://203c9333b857d37c32e703024ef63b2a@o4507617701003264.ingest.us.sentry.io/4507617709522944",
-    traces_sample_rate=1.0,
-    profiles_sample_rate=1.0,
-)
\ No newline at end of file
+    # trace sampling 정책은 config/sentry.py
+    sentry.init(
+        dsn=env("SENTRY_DSN", default="https://203c9333b857d37c32e703024ef63b2a@o4507617701003264.ingest.us.sentry.io/4507617709522944"),
+        default_rate=env.float("SENTRY_TRACES_RATE", default=0.1),
+        hot_rate=env.float("SENTRY_HOT_TRACES_RATE", default=0.01),  # /api/v1/stores, /api/v1/notices 조회
+        slow_ms=env.float("SENTRY_SLOW_REQUEST_MS", default=1000),
+        boost_seconds=env.float("SENTRY_BOOST_SECONDS", default=60),
+        profiles_rate=env.float("SENTRY_PROFILES_RATE", default=0.1),
+    )
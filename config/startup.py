@@ -0,0 +1,37 @@
+"""
+worker를 fork 하기 전에 부모 process에서 미리 해둘 작업 (gunicorn.conf.py 의 preload_app)
+
+URLconf를 풀어서 모든 view/serializer module을 import 해두면 fork 된 worker는 첫 요청에서 import 비용을 치르지 않는다.
+DB connection은 worker끼리 공유하면 안 되므로 마지막에 모두 닫는다. (connection pool 포함)
+"""
+
+import logging
+import time
+
+from django.db import connections
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def _walk(patterns):
+    for pattern in patterns:
+        yield pattern
+        yield from _walk(getattr(pattern, "url_patterns", ()))
+
+
+def warm_up():
+    start = time.perf_counter()
+    resolver = get_resolver()
+    count = sum(1 for _ in _walk(resolver.url_patterns))
+    # reverse() 에 쓰는 lookup table도 미리 만든다.
+    resolver.reverse_dict
+    from config import schema
+
+    schema.static_schema_url()
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        # pooled backend 는 close() 해도 pool 에 돌려줄 뿐이므로 pool 의 socket 까지 닫아야 worker 에 넘어가지 않는다.
+        if hasattr(connection, "close_pool"):
+            connection.close_pool()
+    logger.info("warmed up %s url patterns in %.0fms", count, (time.perf_counter() - start) * 1000)
@@ -1,26 +1,14 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg       import openapi
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title="Delight Spot",
-      default_version='v1',
-      description="사용자들이 맛집(음식점, 카페) 또는 기타 즐거운 장소를 공유",
-      terms_of_service="https://www.google.com/policies/terms/",
-      contact=openapi.Contact(email="jangth0056@gmail.com"),
-      license=openapi.License(name="mit"),
-   ),
-   public=True,
-   permission_classes=(permissions.AllowAny,),
-)
+from config import schema
 
 urlpatterns = [
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    # build 때 만든 static schema를 보여준다. 없으면 drf_yasg로 생성 (config/schema.py)
+    path('swagger/', schema.swagger_ui, name='schema-swagger-ui'),
+    path('redoc/', schema.redoc, name='schema-redoc'),
     
     path('admin/', admin.site.urls),
     # path('stores/', include('stores.urls')),
@@ -29,4 +17,10 @@ urlpatterns = [
     path('api/v1/', include("users.urls")),
     path('api/v1/', include("userGroup.urls")),
     path('api/v1/', include("notice.urls")),
-] 
+    path('api/v1/', include("common.urls")),
+    path('api/v1/', include("regions.urls")),
+]
+
+# 로컬 개발: 업로드 사진(MEDIA_ROOT)을 Django 가 직접 서빙한다. (DEBUG 가 아니면 아무것도 추가하지 않는다)
+# 운영에서는 FILE_STORAGE_BACKEND 의 storage(S3 호환 bucket / CDN)가 사진 URL 을 서빙한다. (config/settings.py)
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
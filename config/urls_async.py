@@ -0,0 +1,15 @@
+"""
+ASGI 서비스(config/asgi.py)의 URLconf: Kakao OAuth async view만 제공한다.
+
+나머지 API는 sync DRF view라서 ASGI에서는 sync_to_async(thread_sensitive=True)로 한 번에 하나씩 실행되므로
+이 서비스에 두지 않는다. 같은 path의 sync view는 WSGI 서비스(config/urls.py)에 있다.
+"""
+
+from django.urls import path
+
+from users.async_views import kakao_login, kakao_signup
+
+urlpatterns = [
+    path("api/v1/users/kakao", kakao_login),
+    path("api/v1/users/kakao-signup", kakao_signup),
+]
@@ -0,0 +1,25 @@
+# gunicorn 설정 (render.yaml startCommand 에서 사용)
+#
+# 기본 API 서비스는 sync worker + config.wsgi 로 실행한다.
+# Kakao async view 서비스는 같은 설정에 `-k uvicorn.workers.UvicornWorker` 와 config.asgi 로 실행한다. (명령행 옵션이 우선)
+#
+# preload_app: 부모 process에서 Django와 모든 view를 한 번 import/초기화한 뒤 worker를 fork 한다.
+# worker마다 import를 반복하지 않고 copy-on-write로 메모리를 공유하므로 부팅이 빠르다.
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+worker_class = "sync"
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+timeout = 30
+graceful_timeout = 20
+
+
+def when_ready(server):
+    # preload 된 app으로 URLconf 등을 미리 풀어둔다 (worker를 띄우기 직전, 부모 process)
+    # warm_up 이 DB connection을 닫으므로 worker가 부모의 connection을 물려받지 않는다.
+    if preload_app:
+        from config.startup import warm_up
+
+        warm_up()
+
@@ -1,4 +1,5 @@
 from rest_framework.views import APIView
+from config.db_router import ReplicaReadMixin
 from rest_framework.response import Response
 
 from django.conf import settings
@@ -12,7 +13,7 @@ from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_2
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-class NoticeViews(APIView):
+class NoticeViews(ReplicaReadMixin, APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
 
@@ -72,7 +73,7 @@ class NoticeViews(APIView):
             return Response(status=HTTP_201_CREATED)
         return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
     
-class NoticeDetail(APIView):
+class NoticeDetail(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
     
     def get_object(self, pk):
@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .models import Region, RegionAlias
+
+
+class RegionAliasInline(admin.TabularInline):
+    model = RegionAlias
+    fields = ("name",)
+    extra = 0
+
+
+@admin.register(Region)
+class RegionAdmin(admin.ModelAdmin):
+
+    inlines = (RegionAliasInline,)
+
+    list_display = (
+        "full_name",
+        "level",
+        "parent",
+    )
+    list_filter = ("level",)
+    list_select_related = ("parent",)
+    search_fields = ("full_name",)  # Store admin 의 autocomplete
+    raw_id_fields = ("parent",)
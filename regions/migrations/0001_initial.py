@@ -0,0 +1,47 @@
+# Generated by Django 5.0.5 on 2026-10-19 14:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Region',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('full_name', models.CharField(editable=False, max_length=200)),
+                ('level', models.CharField(choices=[('province', '시/도'), ('city', '시/군/구'), ('district', '구')], max_length=20)),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='regions.region')),
+            ],
+            options={
+                'ordering': ('pk',),
+            },
+        ),
+        migrations.CreateModel(
+            name='RegionAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('region', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='regions.region')),
+            ],
+            options={
+                'verbose_name_plural': 'Region aliases',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='region',
+            constraint=models.UniqueConstraint(fields=('parent', 'name'), name='regions_region_unique_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='regionalias',
+            constraint=models.UniqueConstraint(fields=('name', 'region'), name='regions_alias_unique'),
+        ),
+    ]
@@ -0,0 +1,144 @@
+import unicodedata
+from collections import defaultdict
+
+from django.db import models
+from django.db.models import Q
+
+
+def normalize_region_name(name):
+    """지역 이름 비교용 key: 전각/반각 통일(NFKC), 공백 정리, 대소문자 무시"""
+    return " ".join(unicodedata.normalize("NFKC", name or "").split()).casefold()
+
+
+def default_aliases(name):
+    """region 이름으로 찾을 수 있는 alias: 이름 그대로와 '시/군/구' 를 뗀 이름 (수원시 -> 수원, 중구는 그대로)"""
+    name = normalize_region_name(name)
+    aliases = {name}
+    if len(name) > 2 and name[-1] in "시군구":
+        aliases.add(name[:-1])
+    return aliases
+
+
+def child_under(parents, parent, pk):
+    """parents({region pk: parent pk}) 에서 pk 또는 그 조상 중 parent 바로 아래 단계 region. 없으면 None"""
+    while pk is not None and parents.get(pk) != parent:
+        pk = parents.get(pk)
+    return pk
+
+
+class RegionQuerySet(models.QuerySet):
+
+    def subtree(self, pk):
+        """pk 와 그 아래 모든 region (시/도 -> 시/군/구 -> 구, 최대 3단계)"""
+        return self.filter(Q(pk=pk) | Q(parent_id=pk) | Q(parent__parent_id=pk))
+
+    def resolve(self, text):
+        """
+        자유 입력 지역 이름 ("서울", "서울특별시 강남구", "경기 수원시 장안구") -> 가장 구체적인 Region. 없으면 None
+        앞 단어로 찾은 region 아래에서 다음 단어를 찾는다. ("부산 중구" 는 부산광역시 중구)
+        한 단어가 여러 region 에 맞으면 가장 위 단계 하나만 고르고 ("광주" 는 광주광역시), 그래도 여러 개면 건너뛴다. ("중구")
+        """
+        name = normalize_region_name(text)
+        if not name:
+            return None
+        tokens = name.split()
+        candidates = defaultdict(set)
+        for alias, region_pk in RegionAlias.objects.filter(name__in={name, *tokens}).values_list("name", "region_id"):
+            candidates[alias].add(region_pk)
+        if not candidates:
+            return None
+
+        tree = dict(self.values_list("pk", "parent_id"))
+
+        def depth(pk):
+            return 0 if tree.get(pk) is None else depth(tree[pk]) + 1
+
+        def under(pk, ancestor):
+            while pk is not None:
+                if pk == ancestor:
+                    return True
+                pk = tree.get(pk)
+            return False
+
+        found = None
+        for token in [name] if len(candidates[name]) == 1 else tokens:
+            matches = [pk for pk in candidates[token] if found is None or (pk != found and under(pk, found))]
+            if matches:
+                top = min(map(depth, matches))
+                matches = [pk for pk in matches if depth(pk) == top]
+            if len(matches) == 1:
+                found = matches[0]
+        return self.filter(pk=found).first() if found else None
+
+
+class Region(models.Model):
+    """
+    행정구역 (시/도 -> 시/군/구 -> 구)
+    특별시/광역시의 자치구는 시/군과 같은 단계(city), 일반구(수원시 장안구)는 그 아래 단계(district)다.
+    """
+
+    class LevelChoices(models.TextChoices):
+        PROVINCE = ("province", "시/도")
+        CITY = ("city", "시/군/구")
+        DISTRICT = ("district", "구")
+
+    name = models.CharField(max_length=50)
+    # 상위 region 이름을 포함한 이름 ("서울특별시 강남구", save 할 때 갱신)
+    full_name = models.CharField(max_length=200, editable=False)
+    level = models.CharField(max_length=20, choices=LevelChoices)
+    parent = models.ForeignKey(
+        "self",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="children",
+    )
+
+    objects = RegionQuerySet.as_manager()
+
+    def __str__(self):
+        return self.full_name
+
+    def save(self, *args, **kwargs):
+        full_name = f"{self.parent.full_name} {self.name}" if self.parent_id else self.name
+        renamed = self.pk is not None and self.full_name != full_name
+        self.full_name = full_name
+        super().save(*args, **kwargs)
+        RegionAlias.objects.bulk_create(
+            (RegionAlias(name=alias, region=self) for alias in default_aliases(self.name)),
+            ignore_conflicts=True,
+        )
+        if renamed:
+            for child in self.children.all():
+                child.save()
+
+    class Meta:
+        ordering = ("pk",)
+        constraints = [
+            models.UniqueConstraint(fields=["parent", "name"], name="regions_region_unique_name"),
+        ]
+
+
+class RegionAlias(models.Model):
+    """Region 을 찾을 때 쓰는 이름 ("서울", "서울시", "서울특별시"). 정규화(normalize_region_name)해서 저장한다."""
+
+    name = models.CharField(max_length=100)
+    region = models.ForeignKey(
+        "regions.Region",
+        on_delete=models.CASCADE,
+        related_name="aliases",
+    )
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        self.name = normalize_region_name(self.name)
+        super().save(*args, **kwargs)
+
+    class Meta:
+        verbose_name_plural = "Region aliases"
+        constraints = [
+            # 같은 이름이 여러 region 에 있을 수 있다. ("중구") name 으로 시작하는 index 로 찾는다.
+            models.UniqueConstraint(fields=["name", "region"], name="regions_alias_unique"),
+        ]
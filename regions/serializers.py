@@ -0,0 +1,21 @@
+from rest_framework import serializers
+from .models import Region
+
+
+class RegionSerializer(serializers.ModelSerializer):
+
+    # 아래 단계 region 의 store 까지 합한 수 (view 에서 한 번의 GROUP BY 로 센 값)
+    store_count = serializers.SerializerMethodField()
+
+    def get_store_count(self, region):
+        return self.context["store_counts"].get(region.pk, 0)
+
+    class Meta:
+        model = Region
+        fields = (
+            "pk",
+            "name",
+            "full_name",
+            "level",
+            "store_count",
+        )
@@ -0,0 +1,84 @@
+from rest_framework.test import APITestCase
+
+from stores.models import Store
+from users.models import User
+from .models import Region, RegionAlias
+
+
+def region(full_name):
+    return Region.objects.get(full_name=full_name)
+
+
+class TestResolve(APITestCase):
+    # 0002_korea_regions 의 행정구역을 쓴다.
+
+    def test_free_text_city_names(self):
+        cases = {
+            "서울": "서울특별시",
+            "서울시": "서울특별시",
+            " 서울특별시 ": "서울특별시",
+            "서울특별시 강남구 역삼동": "서울특별시 강남구",
+            "부산 중구": "부산광역시 중구",
+            "광주": "광주광역시",
+            "경기도 광주": "경기도 광주시",
+            "수원 장안구": "경기도 수원시 장안구",
+            "강원 고성": "강원특별자치도 고성군",
+            "전라북도 전주시": "전북특별자치도 전주시",
+        }
+        for text, full_name in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(Region.objects.resolve(text), region(full_name))
+
+    def test_ambiguous_or_unknown_names(self):
+        # 여러 시/도에 있는 구, 군 이름만으로는 정할 수 없다.
+        for text in ("중구", "고성", "", "어딘가"):
+            with self.subTest(text=text):
+                self.assertIsNone(Region.objects.resolve(text))
+
+    def test_saving_region_keeps_aliases_and_full_names(self):
+        city = Region.objects.create(name="새도시", level=Region.LevelChoices.CITY, parent=region("경기도"))
+        district = Region.objects.create(name="새구", level=Region.LevelChoices.DISTRICT, parent=city)
+        RegionAlias.objects.create(name=" 뉴 시티 ", region=city)
+        self.assertEqual(Region.objects.resolve("뉴   시티"), city)
+        self.assertEqual(Region.objects.resolve("새도시 새구"), district)
+
+        city.name = "새시"
+        city.save()
+        district.refresh_from_db()
+        self.assertEqual(district.full_name, "경기도 새시 새구")
+
+
+class TestRegions(APITestCase):
+    URL = "/api/v1/regions"
+
+    def setUp(self):
+        owner = User.objects.create(username="owner")
+        for i, name in enumerate(["서울특별시 강남구", "서울특별시 강남구", "서울특별시 마포구", "서울특별시", "부산광역시 중구"]):
+            Store.objects.create(
+                name=f"s{i}", description="d", kind_menu="food", city=name, owner=owner, region=region(name),
+            )
+        Store.objects.create(name="deleted", description="d", kind_menu="food", city="", owner=owner, is_deleted=True,
+                             region=region("부산광역시 중구"))
+
+    def test_province_counts_include_sub_regions(self):
+        with self.assertNumQueries(2):
+            provinces = self.client.get(self.URL).json()
+        counts = {province["name"]: province["store_count"] for province in provinces}
+        self.assertEqual(len(provinces), 17)
+        self.assertEqual((counts["서울특별시"], counts["부산광역시"], counts["경기도"]), (4, 1, 0))
+
+    def test_children_of_parent(self):
+        seoul = region("서울특별시")
+        with self.assertNumQueries(2):
+            districts = self.client.get(f"{self.URL}?parent={seoul.pk}").json()
+        self.assertEqual(len(districts), 25)
+        gangnam = next(district for district in districts if district["name"] == "강남구")
+        self.assertEqual(gangnam, {
+            "pk": region("서울특별시 강남구").pk, "name": "강남구", "full_name": "서울특별시 강남구",
+            "level": "city", "store_count": 2,
+        })
+        # 시/도에만 연결된 store 는 어느 구에도 세지 않는다.
+        self.assertEqual(sum(district["store_count"] for district in districts), 3)
+
+        self.assertEqual(self.client.get(f"{self.URL}?parent=x").status_code, 400)
+        self.assertEqual(self.client.get(f"{self.URL}?parent=999999").status_code, 404)
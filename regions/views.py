@@ -0,0 +1,63 @@
+from collections import Counter
+
+from django.db.models import Count
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from config.db_router import ReplicaReadMixin
+from stores.models import Store
+from .models import Region, child_under
+from .serializers import RegionSerializer
+
+# swagger 추가
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+
+def store_counts(regions, parent=None):
+    """
+    regions(parent 아래 region 전부, parent 포함)의 store 를 region_id 로 한 번 GROUP BY 하고,
+    아래 단계의 수를 parent 바로 아래 단계 region 으로 합친다. {region pk: store 수}
+    """
+    parents = {region.pk: region.parent_id for region in regions}
+    stores = Store.objects.all()
+    if parent is not None:
+        stores = stores.filter(region__in=parents)
+    counts = Counter()
+    for region_pk, count in stores.values_list("region").annotate(count=Count("pk")).order_by():
+        region_pk = child_under(parents, parent, region_pk)
+        if region_pk is not None:
+            counts[region_pk] += count
+    return counts
+
+
+class Regions(ReplicaReadMixin, APIView):
+    """시/도 목록 (parent 를 주면 그 아래 단계 목록)과 각 region 의 store 수"""
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    # swagger 추가
+    @swagger_auto_schema(
+        operation_description="Retrieve regions (provinces, or the children of `parent`) with store counts",
+        responses={200: RegionSerializer(many=True), 400: "Bad Request", 404: "Not Found"},
+        manual_parameters=[
+            openapi.Parameter('parent', openapi.IN_QUERY, description="Parent region pk", type=openapi.TYPE_INTEGER),
+        ]
+    )
+    def get(self, request):
+        parent = request.query_params.get("parent")
+        if parent is None:
+            regions = list(Region.objects.all())
+        else:
+            try:
+                parent = int(parent)
+            except ValueError:
+                raise ParseError(detail="Invalid 'parent' parameter value.")
+            regions = list(Region.objects.subtree(parent))
+            if not regions:
+                raise NotFound
+        children = [region for region in regions if region.parent_id == parent]
+        serializer = RegionSerializer(children, many=True, context={"store_counts": store_counts(regions, parent)})
+        return Response(serializer.data)
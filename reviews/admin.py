@@ -1,7 +1,5 @@
 from django.contrib import admin
-from .models import Reviews
-from django.db.models import Avg
-from django.db import models
+from .models import Reviews, total_rating_expression
 
 @admin.register(Reviews)
 class ReviewAdmin(admin.ModelAdmin):
@@ -16,7 +14,22 @@ class ReviewAdmin(admin.ModelAdmin):
         "restroom_rating",
         "store",
     )
+    # __str__ 과 store 컬럼이 row마다 user, store를 조회하지 않도록 join
+    list_select_related = ("user", "store")
+    # store 이름 prefix / username 일치 검색. Postgres 에서는 UPPER(...) index 를 탄다.
+    # (stores migration 0021, users migration 0006)
     search_fields = (
-        "store",
+        "^store__name",
+        "=user__username",
     )
-    
\ No newline at end of file
+    raw_id_fields = ("user", "store")
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(total_score=total_rating_expression())
+
+    @admin.display(description="Total rating", ordering="total_score")
+    def total_rating(self, review):
+        if review.total_score is None:
+            return None
+        return round(review.total_score, 1)
@@ -1,9 +1,31 @@
 from django.db import models
+from django.db.models import Case, F, FloatField, When
+from django.db.models.functions import Cast, Coalesce, NullIf
 from common.models import CommonModel
 from django.conf import settings
 from django.core.validators import MaxValueValidator
 
 
+RATING_FIELDS = (
+    "taste_rating",
+    "atmosphere_rating",
+    "kindness_rating",
+    "clean_rating",
+    "parking_rating",
+    "restroom_rating",
+)
+
+
+def total_rating_expression(prefix=""):
+    """Reviews.total_rating property와 같은 값(입력된 평점들의 평균)을 DB에서 계산하는 expression"""
+    score = sum(Coalesce(F(f"{prefix}{field}"), 0) for field in RATING_FIELDS)
+    rated = sum(
+        Case(When(**{f"{prefix}{field}__isnull": False}, then=1), default=0)
+        for field in RATING_FIELDS
+    )
+    return Cast(score, FloatField()) / NullIf(rated, 0)
+
+
 class Reviews(CommonModel):
 
     user = models.ForeignKey(
@@ -1,13 +1,37 @@
+from django.utils.functional import cached_property
+from django.db.models import QuerySet
 from rest_framework import serializers
-from .models import Reviews
-from users.serializer import TinyUserSerializer
+from .models import RATING_FIELDS, Reviews
+from users.serializer import TinyUserSerializer, TinyUserValuesFields
 from stores.models import Store
+from common.serializers import Method, Nested, ValuesSerializer
+from common.photos import photo_list, ready_photo_keys, small_urls
 
 
+class ReviewThumbnailsMixin:
+    """
+    review_thumbnails: review_photo 와 같은 순서의 작은(thumb) 사진 URL 목록
+    변환이 끝난 업로드 사진만 thumb URL 이고 나머지는 review_photo 의 URL 그대로다.
+    many=True 이면 목록 전체의 사진을 한 번의 쿼리로 확인한다.
+    """
 
-class ReviewSerializer(serializers.ModelSerializer):
+    @cached_property
+    def ready_photo_keys(self):
+        parent = self.parent
+        if parent is not None and isinstance(parent.instance, (list, QuerySet)):
+            reviews = parent.instance
+        else:
+            reviews = [self.instance]
+        return ready_photo_keys(url for review in reviews for url in photo_list(review.review_photo))
+
+    def get_review_thumbnails(self, review):
+        return small_urls(photo_list(review.review_photo), self.ready_photo_keys)
+
+
+class ReviewSerializer(ReviewThumbnailsMixin, serializers.ModelSerializer):
     user = TinyUserSerializer(read_only=True)
     review_photo = serializers.JSONField(required=False)
+    review_thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Reviews
@@ -23,14 +47,43 @@ class ReviewSerializer(serializers.ModelSerializer):
             "restroom_rating",
             "description",
             "review_photo",
+            "review_thumbnails",
         )
 
 
+class ReviewValuesSerializer(ValuesSerializer):
+    """ReviewSerializer 와 같은 출력을 .values() row로 만든다 (목록 API용)"""
+
+    fields = {
+        "pk": "pk",
+        "user": Nested("user__", TinyUserValuesFields),
+        "total_rating": Method(*RATING_FIELDS),
+        **{field: field for field in RATING_FIELDS},
+        "description": "description",
+        "review_photo": "review_photo",
+        "review_thumbnails": Method("review_photo"),
+    }
+
+    @cached_property
+    def ready_photo_keys(self):
+        return ready_photo_keys(url for row in self.rows for url in photo_list(row["review_photo"]))
 
-class ReviewDetailSerializer(serializers.ModelSerializer):
+    def get_review_thumbnails(self, row):
+        return small_urls(photo_list(row["review_photo"]), self.ready_photo_keys)
+
+    def get_total_rating(self, row):
+        # Reviews.total_rating property
+        ratings = [row[field] for field in RATING_FIELDS if row[field] is not None]
+        if ratings:
+            return sum(ratings) / len(ratings)
+        return None
+
+
+class ReviewDetailSerializer(ReviewThumbnailsMixin, serializers.ModelSerializer):
 
     user = TinyUserSerializer(read_only=True)
     review_photo = serializers.JSONField(required=False)
+    review_thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Reviews
@@ -45,5 +98,6 @@ class ReviewDetailSerializer(serializers.ModelSerializer):
             "parking_rating",
             "restroom_rating",
             "description",
-            "review_photo"
+            "review_photo",
+            "review_thumbnails",
             )
\ No newline at end of file
@@ -1,15 +1,26 @@
 from django.contrib import admin
-from .models import Store, SellList
+from .models import Store, SellList, StorePhoto
+
+
+class StorePhotoInline(admin.TabularInline):
+    model = StorePhoto
+    fields = ("position", "url", "width", "height")
+    extra = 0
 
 
 @admin.register(Store)
 class RoomAdmin(admin.ModelAdmin):
 
+    inlines = (StorePhotoInline,)
+    readonly_fields = ("cover_photo", "legacy_store_photo")
+
     # actions = (reset_prices,)
 
     list_display = (
         "name",
         "kind_menu",
+        "owner",
+        "reviews_len",
         "total_rate",
         "taste_rate",
         "atmosphere_rate",
@@ -17,16 +28,62 @@ class RoomAdmin(admin.ModelAdmin):
         "clean_rate",
         "parking_rate",
         "restroom_rate",
-        "city",
+        "region",
         "created_at",
     )
     list_filter = (
-        "city",
+        "region",
         "pet_friendly",
         "kind_menu",
         "created_at",
         "updated_at",
     )
+    list_select_related = ("owner", "region")
+    search_fields = ("^name",)  # prefix 검색: Postgres 에서는 UPPER(name) pattern index (migration 0021)
+    raw_id_fields = ("owner",)
+    autocomplete_fields = ("region",)
+    show_full_result_count = False
+
+    # 평점은 row마다 계산하지 않고 queryset에서 한 번에 annotate 한다.
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_ratings()
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # inline 에서 사진 순서/목록이 바뀌었을 수 있다.
+        form.instance.refresh_cover_photo()
+
+    @admin.display(description="Reviews", ordering="reviews_count")
+    def reviews_len(self, store):
+        return store.reviews_len()
+
+    @admin.display(description="Total rate", ordering="total_avg")
+    def total_rate(self, store):
+        return store.total_rate()
+
+    @admin.display(description="Taste rate", ordering="taste_avg")
+    def taste_rate(self, store):
+        return store.taste_rate()
+
+    @admin.display(description="Atmosphere rate", ordering="atmosphere_avg")
+    def atmosphere_rate(self, store):
+        return store.atmosphere_rate()
+
+    @admin.display(description="Kindness rate", ordering="kindness_avg")
+    def kindness_rate(self, store):
+        return store.kindness_rate()
+
+    @admin.display(description="Clean rate", ordering="clean_avg")
+    def clean_rate(self, store):
+        return store.clean_rate()
+
+    @admin.display(description="Parking rate", ordering="parking_avg")
+    def parking_rate(self, store):
+        return store.parking_rate()
+
+    @admin.display(description="Restroom rate", ordering="restroom_avg")
+    def restroom_rate(self, store):
+        return store.restroom_rate()
 
 
 
@@ -39,6 +96,8 @@ class SellistAdmin(admin.ModelAdmin):
         "updated_at",
     )
     readonly_fields = (
+        "normalized_name",
         "created_at",
         "updated_at",
     )
+    search_fields = ("^normalized_name",)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class StoresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'stores'
+
+    def ready(self):
+        # 업로드 사진 변환이 끝나면 cover_photo 를, store 가 바뀌면 지도 clustering 집계와 facet 수를 갱신한다.
+        from . import signals  # noqa: F401
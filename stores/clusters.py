@@ -0,0 +1,165 @@
+"""
+지도 marker clustering (stores/clusters)
+
+zoom 마다 지도를 격자(stores.geo.grid_cell)로 나눠 격자 안의 store 수, 좌표 합, 대표 store 를
+StoreCell 에 미리 모아 둔다. 지도를 움직일 때는 화면(bbox)에 걸친 StoreCell 만 GROUP BY 한다.
+
+store 를 만들거나 옮기거나 지울 때 stores.signals 가 바뀐 store 의 cell 들만 고친다. (move)
+bulk_create, queryset.update() 처럼 signal 이 없는 변경 뒤에는 rebuild() 로 다시 만든다.
+(python manage.py rebuild_store_cells)
+"""
+
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from . import geo
+from .models import Store, StoreCell
+
+# zoom 이 이보다 작거나 크면 가장 가까운 단계의 cell 을 쓴다. (14: 격자 한 칸이 약 0.005도, 500m)
+CLUSTER_ZOOMS = range(2, 15)
+# 한 번에 GROUP BY 할 수 있는 최대 cell 수 (bbox 가 zoom 에 비해 너무 크면 400)
+MAX_CELLS = 10_000
+
+# cell 집계에 영향을 주는 Store field
+CELL_FIELDS = ("latitude", "longitude", "kind_menu", "pet_friendly", "is_deleted")
+
+
+def cell_key(latitude, longitude, kind_menu, pet_friendly, is_deleted):
+    """store 가 집계되는 위치와 filter 값. 위치가 없거나 삭제된 store 는 None (집계하지 않음)"""
+    if is_deleted or latitude is None or longitude is None:
+        return None
+    return latitude, longitude, kind_menu, pet_friendly
+
+
+def _cells(key, zoom):
+    latitude, longitude, kind_menu, pet_friendly = key
+    x, y = geo.grid_cell(latitude, longitude, zoom)
+    return StoreCell.objects.filter(zoom=zoom, x=x, y=y, kind_menu=kind_menu, pet_friendly=pet_friendly)
+
+
+def _add(store_pk, key):
+    latitude, longitude, kind_menu, pet_friendly = key
+    for zoom in CLUSTER_ZOOMS:
+        cells = _cells(key, zoom)
+        changes = dict(
+            count=F("count") + 1,
+            latitude_sum=F("latitude_sum") + latitude,
+            longitude_sum=F("longitude_sum") + longitude,
+            top_store_id=Greatest(Coalesce("top_store_id", Value(0)), Value(store_pk)),
+        )
+        if cells.update(**changes):
+            continue
+        x, y = geo.grid_cell(latitude, longitude, zoom)
+        try:
+            with transaction.atomic():
+                StoreCell.objects.create(
+                    zoom=zoom, x=x, y=y, kind_menu=kind_menu, pet_friendly=pet_friendly,
+                    count=1, latitude_sum=latitude, longitude_sum=longitude, top_store_id=store_pk,
+                )
+        except IntegrityError:
+            # 다른 요청이 먼저 cell 을 만들었다.
+            cells.update(**changes)
+
+
+def _remove(store_pk, key):
+    latitude, longitude, kind_menu, pet_friendly = key
+    for zoom in CLUSTER_ZOOMS:
+        cells = _cells(key, zoom)
+        cells.update(
+            count=F("count") - 1,
+            latitude_sum=F("latitude_sum") - latitude,
+            longitude_sum=F("longitude_sum") - longitude,
+        )
+        cells.filter(count__lte=0).delete()
+        for cell in cells.filter(top_store_id=store_pk):
+            # 대표 store 가 빠지면 cell(geocell 범위) 안에서 다음으로 최근 store 를 찾는다.
+            start, end = geo.grid_cell_range(cell.x, cell.y, zoom)
+            cell.top_store_id = (
+                Store.objects.filter(
+                    geocell__gte=start, geocell__lt=end, kind_menu=kind_menu, pet_friendly=pet_friendly,
+                ).exclude(pk=store_pk).aggregate(top=Max("pk"))["top"]
+            )
+            cell.save(update_fields=["top_store"])
+
+
+def move(store_pk, old_key, new_key):
+    """store 의 집계 위치/filter 값이 old_key 에서 new_key 로 바뀌었다. (None 이면 집계하지 않음)"""
+    if old_key == new_key:
+        return
+    with transaction.atomic():
+        if old_key is not None:
+            _remove(store_pk, old_key)
+        if new_key is not None:
+            _add(store_pk, new_key)
+
+
+def rebuild(batch_size=5000):
+    """모든 store 로 StoreCell 을 다시 만든다."""
+    totals = defaultdict(lambda: [0, 0.0, 0.0, 0])
+    stores = Store.objects.filter(latitude__isnull=False, longitude__isnull=False).values_list(
+        "pk", "latitude", "longitude", "kind_menu", "pet_friendly",
+    )
+    for pk, latitude, longitude, kind_menu, pet_friendly in stores.iterator(chunk_size=batch_size):
+        for zoom in CLUSTER_ZOOMS:
+            total = totals[(zoom, *geo.grid_cell(latitude, longitude, zoom), kind_menu, pet_friendly)]
+            total[0] += 1
+            total[1] += latitude
+            total[2] += longitude
+            total[3] = max(total[3], pk)
+    with transaction.atomic():
+        StoreCell.objects.all().delete()
+        StoreCell.objects.bulk_create(
+            (
+                StoreCell(
+                    zoom=zoom, x=x, y=y, kind_menu=kind_menu, pet_friendly=pet_friendly,
+                    count=count, latitude_sum=latitude_sum, longitude_sum=longitude_sum, top_store_id=top,
+                )
+                for (zoom, x, y, kind_menu, pet_friendly), (count, latitude_sum, longitude_sum, top) in totals.items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(totals)
+
+
+def level(zoom):
+    return min(max(zoom, CLUSTER_ZOOMS.start), CLUSTER_ZOOMS.stop - 1)
+
+
+def clusters(box, zoom, kind_menu=None, pet_friendly=None):
+    """
+    box(min_lat, max_lat, min_lng, max_lng) 안의 cluster 목록 (GROUP BY 한 번 + 대표 store 한 번)
+    [{"count", "latitude", "longitude", "top_store": {"pk", "name", "kind_menu", "cover_photo"}}, ...]
+    """
+    zoom = level(zoom)
+    min_x, max_x, min_y, max_y = geo.grid_range(box, zoom)
+    if (max_x - min_x + 1) * (max_y - min_y + 1) > MAX_CELLS:
+        raise ValueError("bbox is too large for this zoom level.")
+
+    cells = StoreCell.objects.filter(zoom=zoom, x__range=(min_x, max_x), y__range=(min_y, max_y))
+    if kind_menu is not None:
+        cells = cells.filter(kind_menu=kind_menu)
+    if pet_friendly is not None:
+        cells = cells.filter(pet_friendly=pet_friendly)
+    rows = list(
+        cells.values("x", "y")
+        .annotate(total=Sum("count"), latitude_sum=Sum("latitude_sum"), longitude_sum=Sum("longitude_sum"), top=Max("top_store"))
+        .order_by("-total", "x", "y")
+    )
+    top_stores = {
+        store["pk"]: store
+        for store in Store.objects.filter(pk__in=[row["top"] for row in rows if row["top"]])
+        .values("pk", "name", "kind_menu", "cover_photo")
+    }
+    return [
+        {
+            "count": row["total"],
+            "latitude": row["latitude_sum"] / row["total"],
+            "longitude": row["longitude_sum"] / row["total"],
+            "top_store": top_stores.get(row["top"]),
+        }
+        for row in rows
+        if row["total"]
+    ]
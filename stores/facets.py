@@ -0,0 +1,136 @@
+"""
+목록 filter chip 별 store 수 (stores/facets)
+
+검색어가 있으면 조건에 맞는 store 를 (kind_menu, pet_friendly, region) 으로 한 번 GROUP BY 하고,
+검색어가 없으면 조합별로 미리 세어 둔 StoreFacetCount 를 읽는다. 두 경우 모두 같은 (조합, 수) row 로 계산한다.
+
+    - 각 facet 의 수는 그 facet 자신의 filter 는 빼고 나머지 filter 만 적용해서 센다.
+      (type=cafe 를 골라도 food / ect chip 에 몇 개인지 보여줄 수 있다)
+    - region 은 선택한 region 바로 아래 단계(선택하지 않았으면 시/도)별 수다.
+
+결과는 common.cache 로 cache 하고, store 를 만들거나 바꾸거나 지우면 stores.signals 가 version 을 올린다. (bump)
+bulk_create, queryset.update() 처럼 signal 이 없는 변경 뒤에는 rebuild() 로 다시 센다.
+(python manage.py rebuild_store_facets)
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from common.cache import bump, cached
+from regions.models import Region, child_under
+from .models import Store, StoreFacetCount
+
+CACHE_NAME = "stores.facets"
+
+# facet 수에 영향을 주는 Store field (name 은 검색어 결과에만 영향을 준다)
+FACET_FIELDS = ("kind_menu", "pet_friendly", "region", "is_deleted")
+
+
+def facet_key(kind_menu, pet_friendly, region_id, is_deleted):
+    """store 가 세어지는 조합. 삭제된 store 는 None (세지 않음)"""
+    if is_deleted:
+        return None
+    return kind_menu, pet_friendly, region_id
+
+
+def _counters(key):
+    kind_menu, pet_friendly, region_id = key
+    return StoreFacetCount.objects.filter(kind_menu=kind_menu, pet_friendly=pet_friendly, region_id=region_id)
+
+
+def _add(key):
+    kind_menu, pet_friendly, region_id = key
+    if _counters(key).update(count=F("count") + 1):
+        return
+    try:
+        with transaction.atomic():
+            StoreFacetCount.objects.create(kind_menu=kind_menu, pet_friendly=pet_friendly, region_id=region_id, count=1)
+    except IntegrityError:
+        # 다른 요청이 먼저 만들었다.
+        _counters(key).update(count=F("count") + 1)
+
+
+def _remove(key):
+    counters = _counters(key)
+    counters.update(count=F("count") - 1)
+    counters.filter(count__lte=0).delete()
+
+
+def move(old_key, new_key):
+    """store 의 조합이 old_key 에서 new_key 로 바뀌었다. (None 이면 세지 않음)"""
+    if old_key == new_key:
+        return
+    with transaction.atomic():
+        if old_key is not None:
+            _remove(old_key)
+        if new_key is not None:
+            _add(new_key)
+
+
+def rebuild():
+    """삭제되지 않은 모든 store 로 StoreFacetCount 를 다시 센다."""
+    rows = Store.objects.values_list("kind_menu", "pet_friendly", "region").annotate(count=Count("pk")).order_by()
+    counters = [
+        StoreFacetCount(kind_menu=kind_menu, pet_friendly=pet_friendly, region_id=region_id, count=count)
+        for kind_menu, pet_friendly, region_id, count in rows
+    ]
+    with transaction.atomic():
+        StoreFacetCount.objects.all().delete()
+        StoreFacetCount.objects.bulk_create(counters)
+    bump(CACHE_NAME)
+    return len(counters)
+
+
+def facets(keyword="", kinds=(), pet_friendly=None, region=None):
+    """
+    Stores 목록과 같은 조건(keyword, type, pet_friendly, region)의 facet 별 store 수
+    {"total": 12, "kind_menu": {"food": 7, "cafe": 4, "ect": 1}, "pet_friendly": {"true": 3, "false": 9},
+     "region": [{"pk": 1, "name": "서울특별시", "count": 5}, ...]}
+    """
+    params = (keyword or "", tuple(sorted(set(kinds))), pet_friendly, region)
+    return cached(CACHE_NAME, params, lambda: _facets(*params), timeout=settings.FACETS_CACHE_SECONDS)
+
+
+def _facets(keyword, kinds, pet_friendly, region):
+    regions = Region.objects.all() if region is None else Region.objects.subtree(region)
+    regions = list(regions.values_list("pk", "parent_id", "name"))
+    parents = {pk: parent_id for pk, parent_id, _ in regions}
+
+    if keyword:
+        stores = Store.objects.filter(name__icontains=keyword)
+        if region is not None:
+            stores = stores.filter(region__in=parents)
+        rows = stores.values_list("kind_menu", "pet_friendly", "region").annotate(count=Count("pk")).order_by()
+    else:
+        counters = StoreFacetCount.objects.filter(count__gt=0)
+        if region is not None:
+            counters = counters.filter(region__in=parents)
+        rows = counters.values_list("kind_menu", "pet_friendly", "region", "count")
+
+    total = 0
+    kind_counts, pet_counts, region_counts = Counter(), Counter(), Counter()
+    for kind_menu, pet, region_pk, count in rows:
+        # 목록의 type filter 처럼 모든 type 과 같아야 한다.
+        kind_matches = all(kind_menu == kind for kind in kinds)
+        pet_matches = pet_friendly is None or pet == pet_friendly
+        if pet_matches:
+            kind_counts[kind_menu] += count
+        if kind_matches:
+            pet_counts[pet] += count
+        if kind_matches and pet_matches:
+            total += count
+            region_counts[child_under(parents, region, region_pk)] += count
+
+    return {
+        "total": total,
+        "kind_menu": {kind: kind_counts[kind] for kind in Store.StoreMenuChoices.values},
+        "pet_friendly": {"true": pet_counts[True], "false": pet_counts[False]},
+        "region": [
+            {"pk": pk, "name": name, "count": region_counts[pk]}
+            for pk, parent_id, name in regions
+            if parent_id == region
+        ],
+    }
@@ -0,0 +1,142 @@
+"""
+위치 검색 (stores/nearby) 용 grid index
+
+Store.geocell 은 위도/경도를 geohash 와 같은 순서로 bit 를 섞은 52bit 정수다. (경도 26bit, 위도 26bit, 약 0.6m x 0.3m)
+앞쪽 n bit 가 같은 store 들은 같은 격자(cell) 안에 있고, 한 cell 은 geocell 의 연속된 범위 하나가 된다.
+그래서 PostGIS 없이 일반 B-tree index 의 범위 조건 몇 개로 반경 근처만 읽을 수 있다. (SQLite, Postgres 공통)
+
+    반경을 덮는 사각형(bounding_box) -> 그 사각형보다 큰 cell 최대 4개 (cell_ranges)
+    -> geocell 범위 + 위도/경도 범위로 후보를 줄이고 haversine 거리(distance_expression)로 정확히 거른 뒤 정렬
+
+지도 clustering(stores/clusters)의 zoom 별 격자(grid_cell)도 geocell prefix 라서, 격자 하나 안의 store 는
+geocell 범위 하나(grid_cell_range)로 찾을 수 있다.
+
+경도 ±180도(날짜 변경선)를 넘는 반경은 잘라서 찾는다.
+"""
+
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+AXIS_BITS = 26
+CELL_BITS = AXIS_BITS * 2
+
+
+def _spread(value):
+    # 26bit 정수의 bit 사이에 0 을 끼운다. (abc -> 0a0b0c)
+    value = (value | (value << 16)) & 0x0000FFFF0000FFFF
+    value = (value | (value << 8)) & 0x00FF00FF00FF00FF
+    value = (value | (value << 4)) & 0x0F0F0F0F0F0F0F0F
+    value = (value | (value << 2)) & 0x3333333333333333
+    value = (value | (value << 1)) & 0x5555555555555555
+    return value
+
+
+def _axis(value, low, high):
+    scale = 1 << AXIS_BITS
+    return min(max(int((value - low) / (high - low) * scale), 0), scale - 1)
+
+
+def encode(latitude, longitude):
+    """위도/경도 -> geocell (geohash 처럼 경도 bit 부터 번갈아 섞는다)"""
+    return (_spread(_axis(longitude, -180, 180)) << 1) | _spread(_axis(latitude, -90, 90))
+
+
+def grid_cell(latitude, longitude, zoom):
+    """
+    zoom 단계 지도 격자(cell)의 (x, y). 경도 zoom+2 bit, 위도 zoom+1 bit 이므로
+    지도 tile(256px) 하나를 가로 4칸으로 나눈 크기이고, 위도/경도로는 정사각형이다.
+    """
+    k = zoom + 1
+    return _axis(longitude, -180, 180) >> (AXIS_BITS - 1 - k), _axis(latitude, -90, 90) >> (AXIS_BITS - k)
+
+
+def grid_range(box, zoom):
+    """box(min_lat, max_lat, min_lng, max_lng) 와 겹치는 cell 의 (min_x, max_x, min_y, max_y)"""
+    min_lat, max_lat, min_lng, max_lng = box
+    min_x, min_y = grid_cell(min_lat, min_lng, zoom)
+    max_x, max_y = grid_cell(max_lat, max_lng, zoom)
+    return min_x, max_x, min_y, max_y
+
+
+def grid_cell_range(x, y, zoom):
+    """grid cell (x, y) 안의 geocell 범위 (start, end). 경도 bit 가 하나 더 많은 geohash prefix 와 같다."""
+    shift = CELL_BITS - (2 * zoom + 3)
+    prefix = _spread(x) | (_spread(y) << 1)
+    return prefix << shift, (prefix + 1) << shift
+
+
+def bounding_box(latitude, longitude, radius):
+    """중심에서 radius(m) 안의 점을 모두 포함하는 (min_lat, max_lat, min_lng, max_lng)"""
+    dlat = radius / METERS_PER_DEGREE
+    cos_lat = math.cos(math.radians(min(abs(latitude) + dlat, 90)))
+    dlng = 180 if cos_lat < 1e-9 else min(dlat / cos_lat, 180)
+    return (
+        max(latitude - dlat, -90),
+        min(latitude + dlat, 90),
+        max(longitude - dlng, -180),
+        min(longitude + dlng, 180),
+    )
+
+
+def cell_ranges(box):
+    """
+    box 를 덮는 geocell 범위 [(start, end), ...] (end 는 포함하지 않음)
+    box 보다 크면서 가장 작은 cell 크기를 골라, 가로/세로로 최대 2개씩 (최대 4개 cell) 덮는다.
+    """
+    min_lat, max_lat, min_lng, max_lng = box
+    bits = CELL_BITS
+    while bits > 0:
+        lng_bits, lat_bits = (bits + 1) // 2, bits // 2
+        if 360 / (1 << lng_bits) >= max_lng - min_lng and 180 / (1 << lat_bits) >= max_lat - min_lat:
+            break
+        bits -= 1
+    shift = CELL_BITS - bits
+    prefixes = sorted({
+        encode(lat, lng) >> shift for lat in (min_lat, max_lat) for lng in (min_lng, max_lng)
+    })
+    # 붙어 있는 cell 은 범위 하나로 합친다.
+    ranges = []
+    for prefix in prefixes:
+        start, end = prefix << shift, (prefix + 1) << shift
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def nearby_filter(latitude, longitude, radius, prefix=""):
+    """radius(m) 안의 store 후보를 고르는 조건 (geocell index 범위 + 위도/경도 사각형)"""
+    box = bounding_box(latitude, longitude, radius)
+    cells = Q()
+    for start, end in cell_ranges(box):
+        cells |= Q(**{f"{prefix}geocell__gte": start, f"{prefix}geocell__lt": end})
+    return cells & Q(**{
+        f"{prefix}latitude__range": box[:2],
+        f"{prefix}longitude__range": box[2:],
+    })
+
+
+def distance_expression(latitude, longitude, prefix=""):
+    """(latitude, longitude) 에서 store 까지의 haversine 거리(m) expression"""
+    lat, lng = F(f"{prefix}latitude"), F(f"{prefix}longitude")
+    half_dlat = Sin(Radians(lat - Value(latitude)) / 2)
+    half_dlng = Sin(Radians(lng - Value(longitude)) / 2)
+    a = Power(half_dlat, 2) + Value(math.cos(math.radians(latitude))) * Cos(Radians(lat)) * Power(half_dlng, 2)
+    # 부동소수점 오차로 1 을 넘으면 asin 이 실패한다.
+    return Value(2 * EARTH_RADIUS_M) * ASin(Least(Sqrt(a), Value(1.0)), output_field=FloatField())
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """두 점 사이의 거리(m)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(math.sqrt(a), 1))
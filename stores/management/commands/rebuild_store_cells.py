@@ -0,0 +1,14 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from stores import clusters
+
+
+class Command(BaseCommand):
+    help = "지도 clustering 집계(StoreCell)를 모든 store 로 다시 만듭니다. (bulk_create / update 로 store 를 바꾼 뒤)"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        cells = clusters.rebuild()
+        self.stdout.write(f"StoreCell {cells} rows, {time.perf_counter() - start:.1f}s")
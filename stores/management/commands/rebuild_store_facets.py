@@ -0,0 +1,14 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from stores import facets
+
+
+class Command(BaseCommand):
+    help = "facet 수(StoreFacetCount)를 모든 store 로 다시 세고 facet cache 를 버립니다. (bulk_create / update 로 store 를 바꾼 뒤)"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        counters = facets.rebuild()
+        self.stdout.write(f"StoreFacetCount {counters} rows, {time.perf_counter() - start:.1f}s")
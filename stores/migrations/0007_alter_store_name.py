@@ -0,0 +1,18 @@
+# Generated by Django 5.0.5 on 2026-10-19 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0006_alter_store_store_photo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='store',
+            name='name',
+            field=models.CharField(db_index=True, default='', max_length=200),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.5 on 2026-10-19 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0007_alter_store_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='store',
+            name='is_deleted',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
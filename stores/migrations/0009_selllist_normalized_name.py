@@ -0,0 +1,19 @@
+# Generated by Django 5.0.5 on 2026-10-19 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0008_store_deleted_at_store_is_deleted'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='selllist',
+            name='normalized_name',
+            field=models.CharField(default='', editable=False, max_length=150),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,39 @@
+import unicodedata
+
+from django.db import migrations
+
+
+def normalize_item_name(name):
+    return " ".join(unicodedata.normalize("NFKC", name or "").split()).casefold()
+
+
+def merge_duplicates(apps, schema_editor):
+    """정규화된 이름이 같은 SellList를 가장 먼저 만들어진 row 하나로 합친다."""
+    SellList = apps.get_model("stores", "SellList")
+    Through = apps.get_model("stores", "Store").sell_list.through
+
+    keep = {}
+    for item in SellList.objects.order_by("pk"):
+        item.normalized_name = normalize_item_name(item.name)
+        item.save(update_fields=["normalized_name"])
+        keep.setdefault(item.normalized_name, item.pk)
+
+        target = keep[item.normalized_name]
+        if target == item.pk:
+            continue
+        linked = set(Through.objects.filter(selllist_id=target).values_list("store_id", flat=True))
+        duplicated = Through.objects.filter(selllist_id=item.pk)
+        duplicated.filter(store_id__in=linked).delete()
+        duplicated.update(selllist_id=target)
+        item.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0009_selllist_normalized_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.5 on 2026-10-19 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0010_merge_duplicate_selllist'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='selllist',
+            name='normalized_name',
+            field=models.CharField(editable=False, max_length=150, unique=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.5 on 2026-10-19 13:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_grams(apps, schema_editor):
+    SellList = apps.get_model("stores", "SellList")
+    SellListGram = apps.get_model("stores", "SellListGram")
+    grams = []
+    for pk, name in SellList.objects.values_list("pk", "normalized_name").iterator(chunk_size=1000):
+        if len(name) <= 2:
+            parts = {name} if name else set()
+        else:
+            parts = {name[i:i + 2] for i in range(len(name) - 1)}
+        grams.extend(SellListGram(item_id=pk, gram=gram) for gram in parts)
+        if len(grams) >= 1000:
+            SellListGram.objects.bulk_create(grams)
+            grams = []
+    SellListGram.objects.bulk_create(grams)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0011_selllist_normalized_name_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SellListGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=2)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grams', to='stores.selllist')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['gram', 'item'], name='stores_selllist_gram_idx')],
+                'unique_together': {('item', 'gram')},
+            },
+        ),
+        migrations.RunPython(build_grams, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.5 on 2026-10-19 14:15
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def fill_excerpts(apps, schema_editor):
+    Store = apps.get_model("stores", "Store")
+    # description 은 길이 제한이 없으므로 BATCH_SIZE 개마다 저장하고 비운다. (메모리는 batch 크기만큼만)
+    stores = []
+    for store in Store.objects.only("pk", "description").iterator(chunk_size=BATCH_SIZE):
+        text = " ".join((store.description or "").split())
+        store.description_excerpt = text if len(text) <= 100 else text[:99].rstrip() + "…"
+        stores.append(store)
+        if len(stores) >= BATCH_SIZE:
+            Store.objects.bulk_update(stores, ["description_excerpt"])
+            stores = []
+    Store.objects.bulk_update(stores, ["description_excerpt"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0012_selllistgram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='description_excerpt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 5.0.5 on 2026-10-19 14:16
+
+import json
+import logging
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+logger = logging.getLogger("django.db.migrations")
+
+
+def photo_urls(value):
+    """store_photo JSON (URL 목록, URL 하나, {"url": ...} 목록 등)에서 URL 만 순서대로 꺼낸다.
+
+    (URL 목록, 옮기지 못한 항목 목록)을 반환한다. 500자가 넘는 URL, 문자열이 아닌 항목 등은
+    버리지 않고 두 번째 목록으로 돌려준다. (Store.legacy_store_photo 에 남긴다)
+    """
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return [], [value]
+    urls = []
+    dropped = []
+    for item in value:
+        url = item.get("url") if isinstance(item, dict) else item
+        if isinstance(url, str) and url.strip() and len(url.strip()) <= 500:
+            urls.append(url.strip())
+        elif not (isinstance(url, str) and not url.strip()):
+            dropped.append(item)
+    return urls, dropped
+
+
+def convert_store_photos(apps, schema_editor):
+    Store = apps.get_model("stores", "Store")
+    StorePhoto = apps.get_model("stores", "StorePhoto")
+    photos = []
+    stores = []
+    dropped_stores = dropped_items = 0
+    for store in Store.objects.filter(store_photo__isnull=False).only("pk", "store_photo").iterator(chunk_size=1000):
+        urls, dropped = photo_urls(store.store_photo)
+        photos.extend(StorePhoto(store_id=store.pk, url=url, position=i) for i, url in enumerate(urls))
+        if urls:
+            store.cover_photo = urls[0]
+        if dropped:
+            # store_photo 는 이 migration 에서 지워지므로 옮기지 못한 항목은 원래 JSON 그대로 남긴다.
+            store.legacy_store_photo = json.dumps(dropped, ensure_ascii=False)
+            dropped_stores += 1
+            dropped_items += len(dropped)
+        if urls or dropped:
+            stores.append(store)
+    StorePhoto.objects.bulk_create(photos, batch_size=1000)
+    Store.objects.bulk_update(stores, ["cover_photo", "legacy_store_photo"], batch_size=1000)
+    if dropped_stores:
+        logger.warning(
+            "stores.0014: %s store_photo entries of %s stores could not be converted to StorePhoto "
+            "and were kept in Store.legacy_store_photo",
+            dropped_items,
+            dropped_stores,
+        )
+
+
+def restore_store_photos(apps, schema_editor):
+    Store = apps.get_model("stores", "Store")
+    StorePhoto = apps.get_model("stores", "StorePhoto")
+    urls = {}
+    for store_id, url in StorePhoto.objects.order_by("position", "pk").values_list("store_id", "url"):
+        urls.setdefault(store_id, []).append(url)
+    stores = Store.objects.filter(models.Q(pk__in=urls) | ~models.Q(legacy_store_photo="")).only("pk", "legacy_store_photo")
+    for store in stores:
+        legacy = json.loads(store.legacy_store_photo) if store.legacy_store_photo else []
+        store.store_photo = urls.get(store.pk, []) + legacy
+    Store.objects.bulk_update(stores, ["store_photo"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0013_store_description_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='cover_photo',
+            field=models.URLField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='store',
+            name='legacy_store_photo',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.CreateModel(
+            name='StorePhoto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('url', models.URLField(max_length=500)),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='photos', to='stores.store')),
+            ],
+            options={
+                'ordering': ('position', 'pk'),
+                'indexes': [models.Index(fields=['store', 'position'], name='stores_photo_position_idx')],
+            },
+        ),
+        migrations.RunPython(convert_store_photos, restore_store_photos),
+        migrations.RemoveField(
+            model_name='store',
+            name='store_photo',
+        ),
+    ]
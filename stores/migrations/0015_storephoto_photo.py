@@ -0,0 +1,20 @@
+# Generated by Django 5.0.5 on 2026-10-19 14:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0003_photo'),
+        ('stores', '0014_store_photos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storephoto',
+            name='photo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='common.photo'),
+        ),
+    ]
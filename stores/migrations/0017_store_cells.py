@@ -0,0 +1,63 @@
+# Generated by Django 5.0.5 on 2026-10-19 14:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from stores.geo import grid_cell
+
+CLUSTER_ZOOMS = range(2, 15)
+
+
+def build_store_cells(apps, schema_editor):
+    """위치가 입력된 store 로 StoreCell 을 만든다. (이후에는 signal 이 갱신한다)"""
+    Store = apps.get_model("stores", "Store")
+    StoreCell = apps.get_model("stores", "StoreCell")
+    totals = {}
+    stores = Store.objects.filter(is_deleted=False, latitude__isnull=False, longitude__isnull=False).values_list(
+        "pk", "latitude", "longitude", "kind_menu", "pet_friendly",
+    )
+    for pk, latitude, longitude, kind_menu, pet_friendly in stores.iterator(chunk_size=5000):
+        for zoom in CLUSTER_ZOOMS:
+            key = (zoom, *grid_cell(latitude, longitude, zoom), kind_menu, pet_friendly)
+            count, latitude_sum, longitude_sum, top = totals.get(key, (0, 0.0, 0.0, 0))
+            totals[key] = (count + 1, latitude_sum + latitude, longitude_sum + longitude, max(top, pk))
+    StoreCell.objects.bulk_create(
+        (
+            StoreCell(
+                zoom=zoom, x=x, y=y, kind_menu=kind_menu, pet_friendly=pet_friendly,
+                count=count, latitude_sum=latitude_sum, longitude_sum=longitude_sum, top_store_id=top,
+            )
+            for (zoom, x, y, kind_menu, pet_friendly), (count, latitude_sum, longitude_sum, top) in totals.items()
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0016_store_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoreCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.PositiveSmallIntegerField()),
+                ('x', models.IntegerField()),
+                ('y', models.IntegerField()),
+                ('kind_menu', models.CharField(choices=[('food', '음식'), ('cafe', '카페'), ('ect', '기타')], max_length=20)),
+                ('pet_friendly', models.BooleanField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('latitude_sum', models.FloatField(default=0)),
+                ('longitude_sum', models.FloatField(default=0)),
+                ('top_store', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='stores.store')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='storecell',
+            constraint=models.UniqueConstraint(fields=('zoom', 'x', 'y', 'kind_menu', 'pet_friendly'), name='stores_cell_unique'),
+        ),
+        migrations.RunPython(build_store_cells, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.0.5 on 2026-10-19 14:45
+
+import unicodedata
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def normalize_region_name(name):
+    return " ".join(unicodedata.normalize("NFKC", name or "").split()).casefold()
+
+
+def map_store_regions(apps, schema_editor):
+    """
+    store 의 city 문자열마다 Region 을 찾아 region 을 채운다. (regions.models.RegionQuerySet.resolve 와 같은 규칙)
+    찾지 못한 city 는 region 이 None 으로 남는다.
+    """
+    Store = apps.get_model("stores", "Store")
+    RegionAlias = apps.get_model("regions", "RegionAlias")
+    Region = apps.get_model("regions", "Region")
+
+    tree = dict(Region.objects.values_list("pk", "parent_id"))
+    candidates = defaultdict(set)
+    for alias, region_pk in RegionAlias.objects.values_list("name", "region_id"):
+        candidates[alias].add(region_pk)
+
+    def depth(pk):
+        return 0 if tree.get(pk) is None else depth(tree[pk]) + 1
+
+    def under(pk, ancestor):
+        while pk is not None:
+            if pk == ancestor:
+                return True
+            pk = tree.get(pk)
+        return False
+
+    def resolve(text):
+        name = normalize_region_name(text)
+        found = None
+        for token in [name] if len(candidates[name]) == 1 else name.split():
+            matches = [pk for pk in candidates[token] if found is None or (pk != found and under(pk, found))]
+            if matches:
+                top = min(map(depth, matches))
+                matches = [pk for pk in matches if depth(pk) == top]
+            if len(matches) == 1:
+                found = matches[0]
+        return found
+
+    for city in Store.objects.order_by().values_list("city", flat=True).distinct():
+        region_pk = resolve(city)
+        if region_pk is not None:
+            Store.objects.filter(city=city).update(region_id=region_pk)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('regions', '0002_korea_regions'),
+        ('stores', '0017_store_cells'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='region',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stores', to='regions.region'),
+        ),
+        migrations.AddIndex(
+            model_name='store',
+            index=models.Index(fields=['region', 'is_deleted'], name='stores_store_region_idx'),
+        ),
+        migrations.RunPython(map_store_regions, migrations.RunPython.noop),
+    ]
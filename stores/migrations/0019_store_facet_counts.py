@@ -0,0 +1,49 @@
+# Generated by Django 5.0.5 on 2026-10-19 14:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_store_facets(apps, schema_editor):
+    """삭제되지 않은 store 를 (kind_menu, pet_friendly, region) 별로 센다. (이후에는 signal 이 갱신한다)"""
+    Store = apps.get_model("stores", "Store")
+    StoreFacetCount = apps.get_model("stores", "StoreFacetCount")
+    rows = (
+        Store.objects.filter(is_deleted=False)
+        .values_list("kind_menu", "pet_friendly", "region").annotate(count=Count("pk")).order_by()
+    )
+    StoreFacetCount.objects.bulk_create(
+        StoreFacetCount(kind_menu=kind_menu, pet_friendly=pet_friendly, region_id=region_id, count=count)
+        for kind_menu, pet_friendly, region_id, count in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('regions', '0002_korea_regions'),
+        ('stores', '0018_store_region'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoreFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind_menu', models.CharField(choices=[('food', '음식'), ('cafe', '카페'), ('ect', '기타')], max_length=20)),
+                ('pet_friendly', models.BooleanField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('region', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='regions.region')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='storefacetcount',
+            constraint=models.UniqueConstraint(condition=models.Q(('region__isnull', False)), fields=('kind_menu', 'pet_friendly', 'region'), name='stores_facet_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='storefacetcount',
+            constraint=models.UniqueConstraint(condition=models.Q(('region__isnull', True)), fields=('kind_menu', 'pet_friendly'), name='stores_facet_unique_no_region'),
+        ),
+        migrations.RunPython(count_store_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def add_unigrams(apps, schema_editor):
+    SellList = apps.get_model("stores", "SellList")
+    SellListGram = apps.get_model("stores", "SellListGram")
+    grams = []
+    for pk, name in SellList.objects.values_list("pk", "normalized_name").iterator(chunk_size=1000):
+        grams.extend(SellListGram(item_id=pk, gram=char) for char in set(name) if not char.isspace())
+        if len(grams) >= 1000:
+            SellListGram.objects.bulk_create(grams, ignore_conflicts=True)
+            grams = []
+    SellListGram.objects.bulk_create(grams, ignore_conflicts=True)
+
+
+def remove_unigrams(apps, schema_editor):
+    SellList = apps.get_model("stores", "SellList")
+    SellListGram = apps.get_model("stores", "SellListGram")
+    # 한 글자 이름은 원래도 자기 자신이 gram 이므로 남긴다.
+    single = SellList.objects.filter(normalized_name__regex=r"^.$").values("pk")
+    SellListGram.objects.filter(gram__regex=r"^.$").exclude(item__in=single).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0019_store_facet_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_unigrams, remove_unigrams),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+# admin 의 search_fields "^name" 은 istartswith, 즉 Postgres 에서 UPPER("name"::text) LIKE 'X%' 이다.
+# name 의 일반 B-tree index(0007)로는 이 조건을 처리할 수 없으므로 같은 식에 pattern_ops index를 만든다.
+# (UPPER 결과는 text 이므로 text_pattern_ops) 로컬 SQLite 에서는 만들지 않는다.
+INDEX = "stores_store_name_upper_idx"
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {INDEX} ON stores_store (UPPER("name"::text) text_pattern_ops)'
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0020_selllistgram_unigrams'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
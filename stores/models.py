@@ -1,6 +1,90 @@
-from django.db import models
-from common.models import CommonModel
+import unicodedata
+
+from django.db import models, transaction
+from django.db.models import Avg, Count, Sum
+from django.db.models.functions import NullIf
+from django.utils import timezone
+from common.models import CommonModel, Photo
+from common.jobs import enqueue
+from common.photos import photo_key, sized_url
 from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from reviews.models import RATING_FIELDS, total_rating_expression
+from . import geo
+
+
+def normalize_item_name(name):
+    """판매 목록 이름 비교용 key: 전각/반각 통일(NFKC), 공백 정리, 대소문자 무시"""
+    return " ".join(unicodedata.normalize("NFKC", name or "").split()).casefold()
+
+
+# SellList.normalized_name 의 길이. NFKC 는 글자 수를 늘릴 수 있어서(예: "㈜" -> "(주)") name 과 따로 검사한다.
+ITEM_NAME_MAX_LENGTH = 150
+
+
+DESCRIPTION_EXCERPT_LENGTH = 100
+
+
+def description_excerpt(description, length=DESCRIPTION_EXCERPT_LENGTH):
+    """목록 API 에 내려줄 설명 앞부분 (공백 정리, 길면 말줄임표)"""
+    text = " ".join((description or "").split())
+    if len(text) <= length:
+        return text
+    return text[:length - 1].rstrip() + "…"
+
+
+def item_ngrams(normalized_name, n=2):
+    """부분 검색(n-gram index)용 조각. n 글자보다 짧으면 그대로 하나의 조각으로 쓴다."""
+    if len(normalized_name) <= n:
+        return {normalized_name} if normalized_name else set()
+    return {normalized_name[i:i + n] for i in range(len(normalized_name) - n + 1)}
+
+
+def item_grams(normalized_name):
+    """SellListGram 에 저장하는 조각: bigram + 한 글자(unigram). 한 글자 검색어도 index로 찾는다."""
+    return item_ngrams(normalized_name) | {char for char in normalized_name if not char.isspace()}
+
+
+class StoreQuerySet(models.QuerySet):
+
+    def nearby(self, latitude, longitude, radius):
+        """radius(m) 안의 store 를 가까운 순서로. distance(m) 를 annotate 한다. (stores.geo)"""
+        return (
+            self.filter(geo.nearby_filter(latitude, longitude, radius))
+            .annotate(distance=geo.distance_expression(latitude, longitude))
+            .filter(distance__lte=radius)
+            .order_by("distance", "pk")
+        )
+
+    def nearest(self, latitude, longitude, radius, start, end, first_radius=500):
+        """
+        radius(m) 안에서 가까운 순서로 start ~ end 번째 store 의 [(pk, distance), ...]
+        first_radius 부터 4배씩 넓혀 가며 찾고, end 개가 차면 멈춘다. (그 반경 밖의 store 는 모두 더 멀다)
+        도심처럼 반경 안에 store 가 많아도 거리 계산 / 정렬은 작은 반경 안의 store 만 한다.
+        """
+        search = min(first_radius, radius)
+        while True:
+            page = list(self.nearby(latitude, longitude, search).values_list("pk", "distance")[start:end])
+            if len(page) == end - start or search >= radius:
+                return page
+            search = min(search * 4, radius)
+
+    def with_ratings(self):
+        """리뷰 평점을 한 번의 GROUP BY 쿼리로 annotate 한다 (admin, 목록 API에서 N+1 방지)."""
+        annotations = {
+            "reviews_count": Count("reviews"),
+            "total_avg": Sum(total_rating_expression("reviews__")) / NullIf(Count("reviews"), 0),
+        }
+        for field in RATING_FIELDS:
+            annotations[f"{field.replace('_rating', '')}_avg"] = Avg(f"reviews__{field}")
+        return self.annotate(**annotations)
+
+
+class StoreManager(models.Manager.from_queryset(StoreQuerySet)):
+    # 삭제 요청된(soft delete) store는 모든 조회에서 제외한다. 실제 삭제는 stores.purge_store job이 한다.
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
 
 class Store(CommonModel):
 
@@ -9,11 +93,26 @@ class Store(CommonModel):
         CAFE = ("cafe", "카페")
         ECT = ("ect", "기타")
 
-    name = models.CharField(max_length=200, default="")
+    name = models.CharField(max_length=200, default="", db_index=True)
     description = models.TextField(null=False, blank=False)
+    # 목록 API 는 길이 제한이 없는 description 대신 이 column 만 읽는다. (save 할 때 갱신)
+    description_excerpt = models.CharField(max_length=DESCRIPTION_EXCERPT_LENGTH, blank=True, default="", editable=False)
     kind_menu = models.CharField(max_length=20, choices=StoreMenuChoices)
     pet_friendly = models.BooleanField(default=False)
     city = models.CharField(max_length=100)
+    # city(자유 입력)를 정규화한 행정구역 (regions.Region.objects.resolve). 찾지 못하면 None
+    region = models.ForeignKey(
+        "regions.Region",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="stores",
+        db_index=False,  # stores_store_region_idx
+    )
+    latitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)])
+    # 위치 검색(stores/nearby)용 grid index (stores.geo.encode, save 할 때 갱신). 위치가 없으면 None
+    geocell = models.BigIntegerField(null=True, blank=True, editable=False)
      
     owner = models.ForeignKey(
             settings.AUTH_USER_MODEL,
@@ -25,18 +124,80 @@ class Store(CommonModel):
     "stores.SellList",
     related_name="foods",
     )
-    store_photo = models.JSONField(blank=True, null=True)
-    
+    # 목록 카드용 대표 사진 (StorePhoto 의 첫 번째 사진, set_photos / refresh_cover_photo 로 갱신)
+    cover_photo = models.URLField(max_length=500, blank=True, default="")
+    # 예전 store_photo JSON 중 StorePhoto 로 옮기지 못한 항목 (500자 넘는 URL 등, migration 0014). 확인 후 비운다.
+    legacy_store_photo = models.TextField(blank=True, default="", editable=False)
+
+    is_deleted = models.BooleanField(default=False, db_index=True)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = StoreManager()
+    all_objects = StoreQuerySet.as_manager()  # soft delete 된 store 포함
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.description_excerpt = description_excerpt(self.description)
+        self.geocell = self.compute_geocell()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if "description" in update_fields:
+                update_fields.add("description_excerpt")
+            if not update_fields.isdisjoint(("latitude", "longitude")):
+                update_fields.add("geocell")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
+    def compute_geocell(self):
+        if self.latitude is None or self.longitude is None:
+            return None
+        return geo.encode(self.latitude, self.longitude)
+
+    def set_photos(self, urls):
+        """
+        사진 목록을 주어진 순서로 통째로 바꾼다. 첫 번째 사진이 cover_photo 가 된다.
+        POST photos 로 올린 사진의 URL 이면 Photo 와 연결해서 크기와 변환된 URL 을 쓴다.
+        """
+        keys = {key for key in map(photo_key, urls) if key}
+        uploaded = {photo.key.hex: photo for photo in Photo.objects.filter(key__in=keys)} if keys else {}
+        with transaction.atomic():
+            self.photos.all().delete()
+            StorePhoto.objects.bulk_create(
+                StorePhoto.from_url(self, url, position, uploaded.get(photo_key(url)))
+                for position, url in enumerate(urls)
+            )
+            self.refresh_cover_photo()
+
+    def refresh_cover_photo(self):
+        """첫 번째 사진으로 cover_photo 를 맞춘다. 변환이 끝난 업로드 사진이면 카드 크기(card) URL"""
+        first = self.photos.select_related("photo").order_by("position", "pk").first()
+        self.cover_photo = first.card_url if first else ""
+        Store.all_objects.filter(pk=self.pk).update(cover_photo=self.cover_photo)
+
+    def soft_delete(self):
+        """바로 목록에서 숨기고, 리뷰/예약/공유목록 등의 cascade 삭제는 background job에 맡긴다."""
+        self.is_deleted = True
+        self.deleted_at = timezone.now()
+        self.save(update_fields=["is_deleted", "deleted_at", "updated_at"])
+        return enqueue("stores.purge_store", {"store_pk": self.pk})
+
     def reviews_len(store):
+        if hasattr(store, "reviews_count"):
+            return store.reviews_count
         count = store.reviews.count()
         if count == 0:
             return 0
         return count
 
     def total_rate(store):
+        # with_ratings()로 annotate된 queryset이면 추가 쿼리 없이 계산된 값을 사용
+        if hasattr(store, "total_avg"):
+            if not store.reviews_count:
+                return "No Ratings"
+            return round(store.total_avg or 0, 1)
         count = store.reviews.count()
         if count == 0:
             return "No Ratings"
@@ -46,24 +207,17 @@ class Store(CommonModel):
                 if review.total_rating is not None:
                     total_rating += review.total_rating
             return round(total_rating / count, 1)
-    
-    def taste_rate(store):
-        count = store.reviews.count()  # reviews = related_name
-        if count == 0:
-            return "No Ratings"
-        else:
-            total_rating = 0
-            valid_ratings = 0
-            for review in store.reviews.all():
-                if review.taste_rating is not None:
-                    total_rating += review.taste_rating
-                    valid_ratings += 1
-            if valid_ratings > 0:
-                return round(total_rating / valid_ratings, 1)
-            else:
+
+    def _rate(store, field):
+        annotated = f"{field.replace('_rating', '')}_avg"
+        if hasattr(store, annotated):
+            if not store.reviews_count:
+                return "No Ratings"
+            value = getattr(store, annotated)
+            if value is None:
                 return "No Valid Ratings"
-        
-    def atmosphere_rate(store):
+            return round(value, 1)
+
         count = store.reviews.count()  # reviews = related_name
         if count == 0:
             return "No Ratings"
@@ -71,88 +225,247 @@ class Store(CommonModel):
             total_rating = 0
             valid_ratings = 0
             for review in store.reviews.all():
-                if review.atmosphere_rating is not None:
-                    total_rating += review.atmosphere_rating
+                rating = getattr(review, field)
+                if rating is not None:
+                    total_rating += rating
                     valid_ratings += 1
             if valid_ratings > 0:
                 return round(total_rating / valid_ratings, 1)
             else:
                 return "No Valid Ratings"
-        
+
+    def taste_rate(store):
+        return store._rate("taste_rating")
+
+    def atmosphere_rate(store):
+        return store._rate("atmosphere_rating")
+
     def kindness_rate(store):
-        count = store.reviews.count()  # reviews = related_name
-        if count == 0:
-            return "No Ratings"
-        else:
-            total_rating = 0
-            valid_ratings = 0
-            for review in store.reviews.all():
-                if review.kindness_rating is not None:
-                    total_rating += review.kindness_rating
-                    valid_ratings += 1
-            if valid_ratings > 0:
-                return round(total_rating / valid_ratings, 1)
-            else:
-                return "No Valid Ratings"
-        
+        return store._rate("kindness_rating")
+
     def clean_rate(store):
-        count = store.reviews.count()  # reviews = related_name
-        if count == 0:
-            return "No Ratings"
-        else:
-            total_rating = 0
-            valid_ratings = 0
-            for review in store.reviews.all():
-                if review.clean_rating is not None:
-                    total_rating += review.clean_rating
-                    valid_ratings += 1
-            if valid_ratings > 0:
-                return round(total_rating / valid_ratings, 1)
-            else:
-                return "No Valid Ratings"
-    
+        return store._rate("clean_rating")
+
     def parking_rate(store):
-        count = store.reviews.count()  # reviews = related_name
-        if count == 0:
-            return "No Ratings"
-        else:
-            total_rating = 0
-            valid_ratings = 0
-            for review in store.reviews.all():
-                if review.parking_rating is not None:
-                    total_rating += review.parking_rating
-                    valid_ratings += 1
-            if valid_ratings > 0:
-                return round(total_rating / valid_ratings, 1)
-            else:
-                return "No Valid Ratings"
-        
+        return store._rate("parking_rating")
+
     def restroom_rate(store):
-        count = store.reviews.count()  # reviews = related_name
-        if count == 0:
-            return "No Ratings"
-        else:
-            total_rating = 0
-            valid_ratings = 0
-            for review in store.reviews.all():
-                if review.restroom_rating is not None:
-                    total_rating += review.restroom_rating
-                    valid_ratings += 1
-            if valid_ratings > 0:
-                return round(total_rating / valid_ratings, 1)
-            else:
-                return "No Valid Ratings"
-        
+        return store._rate("restroom_rating")
+
     class Meta:
         verbose_name_plural = "Store"
+        indexes = [
+            # stores/nearby: geocell 범위로 찾고 위도/경도 사각형, 거리 계산까지 index 만 읽는다. (covering index)
+            models.Index(fields=["geocell", "latitude", "longitude", "is_deleted"], name="stores_store_geocell_idx"),
+            # region filter / region 별 store 수: region_id 와 is_deleted 만 읽는다.
+            models.Index(fields=["region", "is_deleted"], name="stores_store_region_idx"),
+        ]
+
+class StoreCell(models.Model):
+    """
+    지도 clustering 용 zoom 별 격자(stores.geo.grid_cell) 집계 (stores.clusters)
+    (kind_menu, pet_friendly) 마다 row 가 따로 있어서 filter 를 걸어도 이 table 만 읽는다.
+    """
+
+    zoom = models.PositiveSmallIntegerField()
+    x = models.IntegerField()
+    y = models.IntegerField()
+    kind_menu = models.CharField(max_length=20, choices=Store.StoreMenuChoices)
+    pet_friendly = models.BooleanField()
+
+    count = models.PositiveIntegerField(default=0)
+    # 중심 좌표 = 합 / count
+    latitude_sum = models.FloatField(default=0)
+    longitude_sum = models.FloatField(default=0)
+    # 대표 store: cell 에서 가장 최근에 등록된(pk 가 가장 큰) store
+    # store 가 지워지면 post_delete signal 이 다음 store 로 바꾸므로 DB 제약 / cascade 는 두지 않는다.
+    top_store = models.ForeignKey(
+        "stores.Store",
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+
+    def __str__(self):
+        return f"z{self.zoom} ({self.x}, {self.y}) {self.kind_menu}: {self.count}"
+
+    class Meta:
+        constraints = [
+            # bbox 조회: zoom, x 범위, y 범위 순서로 index 를 탄다.
+            models.UniqueConstraint(
+                fields=["zoom", "x", "y", "kind_menu", "pet_friendly"], name="stores_cell_unique"
+            ),
+        ]
+
+
+class StoreFacetCount(models.Model):
+    """
+    (kind_menu, pet_friendly, region) 조합별 store 수 (stores.facets, 검색어 없는 stores/facets)
+    삭제되지 않은 store 만 센다. store signal 이 바뀐 store 의 조합만 고친다.
+    """
+
+    kind_menu = models.CharField(max_length=20, choices=Store.StoreMenuChoices)
+    pet_friendly = models.BooleanField()
+    # region 이 지워져도 store.region 은 SET_NULL 로 바뀌므로 DB 제약 / cascade 는 두지 않는다. (rebuild_store_facets)
+    region = models.ForeignKey(
+        "regions.Region",
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.kind_menu} / {self.pet_friendly} / {self.region_id}: {self.count}"
+
+    class Meta:
+        constraints = [
+            # region 이 NULL 인 조합도 하나만 있도록 나눠서 건다.
+            models.UniqueConstraint(
+                fields=["kind_menu", "pet_friendly", "region"],
+                condition=models.Q(region__isnull=False),
+                name="stores_facet_unique",
+            ),
+            models.UniqueConstraint(
+                fields=["kind_menu", "pet_friendly"],
+                condition=models.Q(region__isnull=True),
+                name="stores_facet_unique_no_region",
+            ),
+        ]
+
+
+class StorePhoto(CommonModel):
+    """store 사진 (상세 화면 갤러리, stores/<pk>/photos 로 page 단위 조회)"""
+
+    store = models.ForeignKey(
+        "stores.Store",
+        on_delete=models.CASCADE,
+        related_name="photos",
+    )
+    url = models.URLField(max_length=500)
+    # POST photos 로 올린 사진이면 연결된 Photo (크기별 변환 URL), 외부 URL 이면 None
+    photo = models.ForeignKey(
+        "common.Photo",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    position = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.url
+
+    @classmethod
+    def from_url(cls, store, url, position, photo=None):
+        if photo is None:
+            return cls(store=store, url=url, position=position)
+        return cls(store=store, url=url, position=position, photo=photo, width=photo.width, height=photo.height)
+
+    @property
+    def variants(self):
+        """변환이 끝난 업로드 사진의 {size: [width, height]}, 아니면 {}"""
+        if self.photo is None or self.photo.status != Photo.StatusChoices.READY:
+            return {}
+        return self.photo.variants
+
+    @property
+    def card_url(self):
+        return sized_url(self.url, "card") if "card" in self.variants else self.url
+
+    class Meta:
+        ordering = ("position", "pk")
+        indexes = [
+            models.Index(fields=["store", "position"], name="stores_photo_position_idx"),
+        ]
+
+
+class SellListManager(models.Manager):
+
+    def get_or_create_item(self, name, description=None):
+        """정규화된 이름이 같은 항목이 있으면 재사용하고, 없으면 새로 만든다."""
+        normalized_name = normalize_item_name(name)
+        if len(normalized_name) > ITEM_NAME_MAX_LENGTH:
+            raise ValueError(f"normalized item name is longer than {ITEM_NAME_MAX_LENGTH} characters")
+        item, created = self.get_or_create(
+            normalized_name=normalized_name,
+            defaults={"name": name, "description": description},
+        )
+        return item
+
+    def search(self, keyword):
+        """이름 prefix(normalized_name pattern_ops index) 또는 n-gram index로 판매 목록을 찾는다.
+
+        검색어가 한 글자면 unigram, 그보다 길면 bigram 이 모두 들어 있는 항목을 찾는다.
+        """
+        keyword = normalize_item_name(keyword)
+        if not keyword:
+            return self.none()
+        # LIKE 'x%'. Postgres 에서는 unique field 에 Django 가 같이 만든 varchar_pattern_ops("_like") index 를 쓰므로
+        # collation 과 상관없이 정확하다. (범위 비교 >= / < 는 non-C collation 에서 순서가 달라진다)
+        prefix = models.Q(normalized_name__startswith=keyword)
+        grams = item_ngrams(keyword)
+        matched = (
+            SellListGram.objects.filter(gram__in=grams)
+            .values("item_id")
+            .annotate(matched=Count("gram", distinct=True))
+            .filter(matched=len(grams))
+            .values("item_id")
+        )
+        contains = models.Q(pk__in=matched, normalized_name__contains=keyword)
+        return self.filter(prefix | contains)
+
 
 class SellList(CommonModel):
     
     name = models.CharField(max_length=150)
     description = models.CharField(max_length=150, null=True, blank=True)
+    # 같은 메뉴가 여러 row로 쌓이지 않도록 정규화된 이름에 unique index (가게 역검색에도 사용)
+    normalized_name = models.CharField(max_length=ITEM_NAME_MAX_LENGTH, unique=True, editable=False)
+
+    objects = SellListManager()
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        previous = self.normalized_name
+        self.normalized_name = normalize_item_name(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "normalized_name"}
+        super().save(*args, **kwargs)
+        if previous != self.normalized_name:
+            self.update_grams()
+
+    def update_grams(self):
+        self.grams.all().delete()
+        SellListGram.objects.bulk_create(
+            SellListGram(item=self, gram=gram) for gram in item_grams(self.normalized_name)
+        )
+
+    class Meta:
+        verbose_name_plural = "Selling List"
+
+
+class SellListGram(models.Model):
+    """SellList.normalized_name 의 unigram/bigram index ("which stores sell X" 부분 검색용)"""
+
+    item = models.ForeignKey(
+        "stores.SellList",
+        on_delete=models.CASCADE,
+        related_name="grams",
+    )
+    gram = models.CharField(max_length=2)
+
     class Meta:
-        verbose_name_plural = "Selling List"
\ No newline at end of file
+        indexes = [
+            models.Index(fields=["gram", "item"], name="stores_selllist_gram_idx"),
+        ]
+        unique_together = ("item", "gram")
@@ -1,8 +1,24 @@
+from django.utils.functional import cached_property
 from rest_framework.serializers import ModelSerializer
 from rest_framework import serializers
-from .models import Store, SellList
+from .models import ITEM_NAME_MAX_LENGTH, Store, SellList, StorePhoto, normalize_item_name
 from users.serializer import TinyUserSerializer
 from bookings.models import Booking
+from common.serializers import DateTimeColumn, Method, SparseFieldsMixin, ValuesSerializer, wants
+from common import photos
+from regions.models import Region
+
+
+def liked_store_pks(request, store_pks):
+    """로그인한 유저가 찜한 store pk 집합 (StoreListSerializer의 is_liked를 한 번의 쿼리로 처리)"""
+    if not request.user.is_authenticated:
+        return set()
+    return set(
+        Booking.store.through.objects.filter(
+            booking__user=request.user,
+            store_id__in=store_pks,
+        ).values_list("store_id", flat=True)
+    )
 
 class SellingListSerializer(ModelSerializer):
     class Meta:
@@ -14,6 +30,22 @@ class SellingListSerializer(ModelSerializer):
             # "created_at"
         )
 
+    def validate_name(self, name):
+        # 정규화(NFKC)하면 길어지는 이름은 normalized_name column 에 들어가지 않는다.
+        if len(normalize_item_name(name)) > ITEM_NAME_MAX_LENGTH:
+            raise serializers.ValidationError(f"정규화한 이름이 {ITEM_NAME_MAX_LENGTH}자를 넘습니다.")
+        return name
+
+class SellingListSearchSerializer(SellingListSerializer):
+    stores = serializers.SerializerMethodField()
+
+    def get_stores(self, sell_list):
+        stores = self.context["stores_by_item"].get(sell_list.pk, [])
+        return StoreListSerializer(stores, many=True, context=self.context).data
+
+    class Meta(SellingListSerializer.Meta):
+        fields = SellingListSerializer.Meta.fields + ("stores",)
+
 # bookings 전체 조회
 class StoreSerializer(ModelSerializer):
     
@@ -89,7 +121,6 @@ class ListSerializer(ModelSerializer):
     reviews_len = serializers.SerializerMethodField()
     sell_list = SellingListSerializer(read_only=True, many=True)
     # 역접근자는 위험하다 -> 방 하나에 수 천, 수 만개의 특성을 가지고 있을 수 있기 때문이다. -> pagination이 있어야 한다.
-    store_photo = serializers.JSONField(required=False)
     is_owner = serializers.SerializerMethodField()
 
     def get_total_rating(self, store):
@@ -139,7 +170,7 @@ class ListSerializer(ModelSerializer):
             "parking_rating",
             "restroom_rating",
 
-            "store_photo",
+            "cover_photo",
             "is_owner",
             "created_at"
         )
@@ -147,28 +178,18 @@ class ListSerializer(ModelSerializer):
 class StoreListSerializer(ModelSerializer):
 
     total_rating = serializers.SerializerMethodField()
+    # 목록에는 description 앞부분만 내려준다. (description 은 길이 제한이 없어 읽지 않는다)
+    description = serializers.CharField(source="description_excerpt", read_only=True)
 
     reviews_len = serializers.SerializerMethodField()
     is_owner = serializers.SerializerMethodField()
     
-    # 역접근자는 위험하다 -> 방 하나에 수 천, 수 만개의 특성을 가지고 있을 수 있기 때문이다. -> pagination이 있어야 한다.
-    # store_photo = serializers.JSONField(required=False)
-    # store_photo = serializers.SerializerMethodField()
-    store_photo = serializers.ListField(
-        child=serializers.URLField(),
-        required=False
-    )
+    # 카드에는 사진 목록 대신 대표 사진(cover_photo) 하나만 내려준다. 전체 사진은 stores/<pk>/photos
 
     is_liked = serializers.SerializerMethodField()
     user_name = serializers.SerializerMethodField()
 
 
-    def get_store_photo(self, store):
-        if store.store_photo:
-            return [store.store_photo]
-        return []
-
-
     def get_user_name(self, store):
         return store.owner.username
 
@@ -187,6 +208,9 @@ class StoreListSerializer(ModelSerializer):
         return False
 
     def get_is_liked(self, store):
+        # view에서 찜한 store pk 목록을 한 번에 조회해 넘겨주면 row마다 쿼리하지 않는다.
+        if "liked_store_pks" in self.context:
+            return store.pk in self.context["liked_store_pks"]
         request = self.context.get('request')
         if request and hasattr(request, "user") and request.user.is_authenticated:
             return Booking.objects.filter(user=request.user, store__pk=store.pk).exists()
@@ -200,21 +224,143 @@ class StoreListSerializer(ModelSerializer):
             "description",
             "kind_menu",
             "city",
+            "region",
             "reviews_len",
             "total_rating",
             "is_owner",
             "user_name",
             "is_liked",
-            "store_photo",
+            "cover_photo",
             "created_at"
         )
         # depth = 1  # 모델의 모든 관계 확장 / 커스터마이즈 할 수 없다.
 
-class StorePostSerializer(ModelSerializer):
+
+class StoreListValuesSerializer(ValuesSerializer):
+    """StoreListSerializer 와 같은 출력을 .values() row로 만든다 (목록 API용). queryset은 with_ratings() 해야 한다."""
+
+    fields = {
+        "pk": "pk",
+        "name": "name",
+        "description": "description_excerpt",
+        "kind_menu": "kind_menu",
+        "city": "city",
+        "region": "region_id",
+        "reviews_len": "reviews_count",
+        "total_rating": Method("reviews_count", "total_avg"),
+        "is_owner": Method("owner_id"),
+        "user_name": "owner__username",
+        "is_liked": Method("pk"),
+        "cover_photo": "cover_photo",
+        "created_at": DateTimeColumn("created_at"),
+    }
+
+    def get_total_rating(self, row):
+        # Store.total_rate (with_ratings 로 annotate 된 경우)
+        if not row["reviews_count"]:
+            return "No Ratings"
+        return round(row["total_avg"] or 0, 1)
+
+    @classmethod
+    def prepare_queryset(cls, queryset, fields):
+        if wants(fields, "total_rating", "reviews_len"):
+            queryset = queryset.with_ratings()
+        return queryset
+
+    @cached_property
+    def user_pk(self):
+        request = self.context.get("request")
+        if request and hasattr(request, "user") and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+    def get_is_owner(self, row):
+        return row["owner_id"] == self.user_pk
+
+    @cached_property
+    def liked_pks(self):
+        if "liked_store_pks" in self.context:
+            return self.context["liked_store_pks"]
+        request = self.context.get("request")
+        if not (request and hasattr(request, "user")):
+            return set()
+        # 목록 전체의 찜 여부를 한 번의 쿼리로 조회한다.
+        return liked_store_pks(request, [row["pk"] for row in self.rows])
+
+    def get_is_liked(self, row):
+        return row["pk"] in self.liked_pks
+
+class NearbyStoreValuesSerializer(StoreListValuesSerializer):
+    """stores/nearby: 카드 + 위치와 거리(m)"""
+
+    fields = {
+        **StoreListValuesSerializer.fields,
+        "latitude": "latitude",
+        "longitude": "longitude",
+        "distance": Method("pk"),
+    }
+
+    @classmethod
+    def from_nearby(cls, page, context=None):
+        """
+        page 는 Store.objects.nearest() 의 [(pk, distance), ...]
+        거리 정렬은 covering index(stores_store_geocell_idx)만 읽고, 카드 column 과 평점(GROUP BY)은 이 page 의 pk 만 읽는다.
+        """
+        context = dict(context or {})
+        fields = context.get("fields")
+        context["distances"] = distances = dict(page)
+        stores = cls.prepare_queryset(Store.objects.filter(pk__in=distances), fields)
+        rows = {row["pk"]: row for row in stores.values(*dict.fromkeys(("pk", *cls.columns_for(fields))))}
+        return cls([rows[pk] for pk in distances if pk in rows], context=context)
+
+    def get_distance(self, row):
+        return round(self.context["distances"][row["pk"]])
+
+
+class StorePhotosWriteMixin:
+    """요청의 store_photo (URL 목록)를 StorePhoto row로 저장한다. 응답에는 cover_photo 만 나간다."""
+
+    def create(self, validated_data):
+        urls = validated_data.pop("store_photo", None)
+        store = super().create(validated_data)
+        if urls is not None:
+            store.set_photos(urls)
+        return store
+
+    def update(self, instance, validated_data):
+        urls = validated_data.pop("store_photo", None)
+        store = super().update(instance, validated_data)
+        if urls is not None:
+            store.set_photos(urls)
+        return store
+
+class StoreLocationMixin:
+    """latitude / longitude 는 함께 입력해야 한다. (둘 다 있어야 geocell 을 만든다)"""
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        latitude = attrs.get("latitude", getattr(self.instance, "latitude", None))
+        longitude = attrs.get("longitude", getattr(self.instance, "longitude", None))
+        if (latitude is None) != (longitude is None):
+            raise serializers.ValidationError({"location": "latitude 와 longitude 는 함께 입력해야 합니다."})
+        return attrs
+
+
+class StoreRegionMixin:
+    """region 을 주지 않고 city 를 바꾸면 city 로 region 을 찾는다. (못 찾으면 None)"""
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if "city" in attrs and "region" not in attrs:
+            attrs["region"] = Region.objects.resolve(attrs["city"])
+        return attrs
+
+
+class StorePostSerializer(StoreRegionMixin, StoreLocationMixin, StorePhotosWriteMixin, ModelSerializer):
     
     owner = TinyUserSerializer(read_only=True)
     is_owner = serializers.SerializerMethodField()
-    store_photo = serializers.JSONField(required=False)
+    store_photo = serializers.ListField(child=serializers.URLField(max_length=500), required=False, write_only=True)
 
     class Meta:
         model = Store
@@ -226,9 +372,14 @@ class StorePostSerializer(ModelSerializer):
             "kind_menu",
             "pet_friendly",
             "city",
+            "region",
+            "latitude",
+            "longitude",
             "is_owner",
             "store_photo",
+            "cover_photo",
         )
+        read_only_fields = ("cover_photo",)
 
     def get_is_owner(self, store):
         request = self.context.get("request")
@@ -236,7 +387,18 @@ class StorePostSerializer(ModelSerializer):
             return store.owner == request.user
         return False
 
-class StoreDetailSerializer(ModelSerializer):
+RATING_METHOD_FIELDS = (
+    "total_rating",
+    "taste_rating",
+    "atmosphere_rating",
+    "kindness_rating",
+    "clean_rating",
+    "parking_rating",
+    "restroom_rating",
+)
+
+
+class StoreDetailSerializer(SparseFieldsMixin, StoreRegionMixin, StoreLocationMixin, StorePhotosWriteMixin, ModelSerializer):
     
     owner = TinyUserSerializer(read_only=True)
     sell_list = SellingListSerializer(many=True)
@@ -251,17 +413,27 @@ class StoreDetailSerializer(ModelSerializer):
 
     is_owner = serializers.SerializerMethodField()
 
-    # store_photo = serializers.JSONField(required=False)
-    store_photo = serializers.ListField(
-        child=serializers.URLField(),
-        required=False
-    )
+    # 사진은 cover_photo 만 내려주고 전체 목록은 stores/<pk>/photos 에서 page 단위로 읽는다. (수정할 때는 URL 목록을 받는다)
+    store_photo = serializers.ListField(child=serializers.URLField(max_length=500), required=False, write_only=True)
 
     is_liked = serializers.SerializerMethodField()
 
     class Meta:
         model = Store
-        fields = "__all__"
+        # is_deleted / deleted_at 은 Store.soft_delete() 로만 바꾼다. (purge job 과 집계 갱신)
+        exclude = ("description_excerpt", "geocell", "legacy_store_photo", "is_deleted", "deleted_at")
+        read_only_fields = ("cover_photo",)
+
+    @classmethod
+    def prepare_queryset(cls, queryset, fields):
+        # 평점 7개는 with_ratings() 한 번으로, owner / sell_list 는 요청한 경우에만 읽는다.
+        if wants(fields, *RATING_METHOD_FIELDS):
+            queryset = queryset.with_ratings()
+        if wants(fields, "owner"):
+            queryset = queryset.select_related("owner")
+        if wants(fields, "sell_list"):
+            queryset = queryset.prefetch_related("sell_list")
+        return queryset
 
     def get_total_rating(self, store):
         return store.total_rate()
@@ -287,7 +459,8 @@ class StoreDetailSerializer(ModelSerializer):
     def get_is_owner(self, store):
         request = self.context.get("request")
         if request and hasattr(request, "user") and request.user.is_authenticated:
-            return store.owner == request.user
+            # owner 를 읽지 않도록 pk 로 비교
+            return store.owner_id == request.user.pk
         return False
 
     def get_is_liked(self, store):
@@ -299,11 +472,10 @@ class StoreDetailSerializer(ModelSerializer):
 
     
 class BookingStoreList(ModelSerializer):
-    store_photo = serializers.JSONField(required=False)
     is_liked = serializers.SerializerMethodField()
     class Meta:
         model = Store
-        fields = ("pk", "name", "total_rate", "store_photo", "is_liked", "created_at")
+        fields = ("pk", "name", "total_rate", "cover_photo", "is_liked", "created_at")
 
     def get_is_liked(self, store):
         request = self.context.get('request')
@@ -312,8 +484,19 @@ class BookingStoreList(ModelSerializer):
         return False
     
 class GroupStoreList(ModelSerializer):
-    store_photo = serializers.JSONField(required=False)
     class Meta:
         model = Store
-        fields = ("pk", "name", "store_photo", "created_at", "updated_at")
-        
\ No newline at end of file
+        fields = ("pk", "name", "cover_photo", "created_at", "updated_at")
+        
+
+
+class StorePhotoSerializer(ModelSerializer):
+    # 업로드 사진이면 크기별 JPEG / WebP URL (common.photos.sizes), 외부 URL 이거나 변환 전이면 null
+    sizes = serializers.SerializerMethodField()
+
+    class Meta:
+        model = StorePhoto
+        fields = ("pk", "url", "width", "height", "position", "sizes")
+
+    def get_sizes(self, photo):
+        return photos.sizes(photo.url, photo.variants)
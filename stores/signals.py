@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from common.cache import bump_on_commit
+from common.photos import photo_ready
+from . import clusters, facets
+from .models import Store, StorePhoto
+
+
+@receiver(photo_ready)
+def refresh_cover_photos(sender, photo, **kwargs):
+    """업로드 사진 변환이 끝나면 그 사진을 쓰는 store 의 cover_photo 를 카드 크기 URL 로 바꾼다."""
+    store_pks = StorePhoto.objects.filter(photo=photo).values_list("store_id", flat=True).distinct()
+    for store in Store.all_objects.filter(pk__in=store_pks).only("pk", "cover_photo"):
+        store.refresh_cover_photo()
+
+
+def store_cell_key(store):
+    return clusters.cell_key(*(getattr(store, field) for field in clusters.CELL_FIELDS))
+
+
+def store_facet_key(store):
+    return facets.facet_key(store.kind_menu, store.pet_friendly, store.region_id, store.is_deleted)
+
+
+# 지도 clustering(StoreCell), facet 수(StoreFacetCount)와 facet cache(검색어 결과)에 영향을 주는 field
+TRACKED_FIELDS = tuple(dict.fromkeys(("name", *clusters.CELL_FIELDS, *facets.FACET_FIELDS)))
+
+
+@receiver(pre_save, sender=Store)
+def remember_store_counts(sender, instance, update_fields=None, raw=False, **kwargs):
+    """저장하기 전의 값을 기억해 둔다. (TRACKED_FIELDS 를 바꾸지 않는 저장은 건너뛴다)"""
+    if raw or (update_fields is not None and set(TRACKED_FIELDS).isdisjoint(update_fields)):
+        return
+    old = None
+    if instance.pk is not None:
+        old = Store.all_objects.filter(pk=instance.pk).values(*TRACKED_FIELDS).first()
+    instance._old_counts = old
+
+
+@receiver(post_save, sender=Store)
+def update_store_counts(sender, instance, **kwargs):
+    """지도 clustering 집계와 facet 수에서 store 를 옛 값에서 빼고 새 값에 더한다."""
+    if "_old_counts" not in instance.__dict__:
+        return
+    old = instance.__dict__.pop("_old_counts")
+    old_cell = clusters.cell_key(*(old[field] for field in clusters.CELL_FIELDS)) if old else None
+    clusters.move(instance.pk, old_cell, store_cell_key(instance))
+
+    old_facet = facets.facet_key(old["kind_menu"], old["pet_friendly"], old["region"], old["is_deleted"]) if old else None
+    new_facet = store_facet_key(instance)
+    facets.move(old_facet, new_facet)
+    if (old_facet or new_facet) and (old_facet != new_facet or old["name"] != instance.name):
+        bump_on_commit(facets.CACHE_NAME)
+
+
+@receiver(post_delete, sender=Store)
+def remove_store_counts(sender, instance, **kwargs):
+    clusters.move(instance.pk, store_cell_key(instance), None)
+    old_facet = store_facet_key(instance)
+    if old_facet is not None:
+        facets.move(old_facet, None)
+        bump_on_commit(facets.CACHE_NAME)
@@ -0,0 +1,22 @@
+from common.jobs import task, delete_in_batches
+from reviews.models import Reviews
+from bookings.models import Booking
+from userGroup.models import SharedList
+from .models import Store
+
+
+@task("stores.purge_store")
+def purge_store(job, store_pk):
+    """soft delete 된 store의 리뷰와 M2M row를 batch 단위로 지운 뒤 store를 삭제한다."""
+    delete_in_batches(Reviews.objects.filter(store_id=store_pk), job=job, label="reviews")
+    delete_in_batches(
+        Booking.store.through.objects.filter(store_id=store_pk), job=job, label="bookings"
+    )
+    delete_in_batches(
+        SharedList.store.through.objects.filter(store_id=store_pk), job=job, label="shared_lists"
+    )
+    delete_in_batches(
+        Store.sell_list.through.objects.filter(store_id=store_pk), job=job, label="sell_list"
+    )
+    Store.all_objects.filter(pk=store_pk, is_deleted=True).delete()
+    job.update_progress(store=True)
@@ -1,6 +1,31 @@
+from types import SimpleNamespace
+
+import math
+import random
+import shutil
+import tempfile
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Prefetch
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
-from . import models
+from . import clusters, facets, geo, models
+from .serializer import StoreDetailSerializer, StoreListSerializer, StoreListValuesSerializer, StorePostSerializer
 from users.models import User
+from regions.models import Region
+from reviews.models import Reviews
+from reviews.serializers import ReviewSerializer, ReviewValuesSerializer
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer, BookingValuesSerializer
+from common import photos
+from common.jobs import run_pending
+from common.models import Job
+from common.tests import make_image
 
 class TestRooms(APITestCase):
     URL = "/api/v1/stores/"
@@ -22,3 +47,761 @@ class TestRooms(APITestCase):
         )
         response = self.client.post(self.URL)
         print(response.json())
+
+
+class TestStoreRatings(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="rater")
+        self.store = models.Store.objects.create(
+            name="store",
+            description="desc",
+            kind_menu="food",
+            city="서울",
+            owner=self.user,
+        )
+        self.empty_store = models.Store.objects.create(
+            name="empty",
+            description="desc",
+            kind_menu="cafe",
+            city="서울",
+            owner=self.user,
+        )
+        Reviews.objects.create(user=self.user, store=self.store, description="a", taste_rating=5, clean_rating=2)
+        Reviews.objects.create(user=self.user, store=self.store, description="b", taste_rating=3)
+        Reviews.objects.create(user=self.user, store=self.store, description="c")
+
+    def test_annotated_ratings_match_model_methods(self):
+        methods = (
+            "reviews_len",
+            "total_rate",
+            "taste_rate",
+            "atmosphere_rate",
+            "kindness_rate",
+            "clean_rate",
+            "parking_rate",
+            "restroom_rate",
+        )
+        for store in (self.store, self.empty_store):
+            annotated = models.Store.objects.with_ratings().get(pk=store.pk)
+            for method in methods:
+                self.assertEqual(
+                    getattr(annotated, method)(),
+                    getattr(models.Store.objects.get(pk=store.pk), method)(),
+                    method,
+                )
+
+    def test_admin_changelist_queries_do_not_grow_with_rows(self):
+        admin = User.objects.create(username="admin", is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get("/admin/stores/store/")
+        for i in range(5):
+            store = models.Store.objects.create(
+                name=f"store{i}", description="desc", kind_menu="food", city="서울", owner=self.user
+            )
+            Reviews.objects.create(user=self.user, store=store, description="d", taste_rating=4)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get("/admin/stores/store/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(small), len(large))
+
+        response = self.client.get("/admin/reviews/reviews/", {"q": "store", "o": "2"})
+        self.assertEqual(response.status_code, 200)
+
+
+class TestStoreSoftDelete(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="owner")
+        self.store = models.Store.objects.create(
+            name="store", description="desc", kind_menu="food", city="서울", owner=self.user
+        )
+        for i in range(3):
+            Reviews.objects.create(user=self.user, store=self.store, description=str(i))
+
+    @override_settings(PURGE_BATCH_SIZE=2)
+    def test_soft_delete_hides_store_then_job_purges_cascade(self):
+        job = self.store.soft_delete()
+
+        self.assertFalse(models.Store.objects.filter(pk=self.store.pk).exists())
+        self.assertEqual(self.client.get("/api/v1/stores").json(), [])
+        self.assertEqual(self.client.get(f"/api/v1/stores/{self.store.pk}").status_code, 404)
+        self.assertEqual(Reviews.objects.filter(store_id=self.store.pk).count(), 3)
+
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.StatusChoices.DONE)
+        self.assertEqual(job.progress["reviews"], 3)
+        self.assertFalse(models.Store.all_objects.filter(pk=self.store.pk).exists())
+        self.assertFalse(Reviews.objects.filter(store_id=self.store.pk).exists())
+
+    def test_detail_serializer_cannot_soft_delete(self):
+        self.assertTrue({"is_deleted", "deleted_at"}.isdisjoint(self.client.get(f"/api/v1/stores/{self.store.pk}").json()))
+
+        serializer = StoreDetailSerializer(self.store, data={"is_deleted": True}, partial=True)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.assertTrue(models.Store.objects.filter(pk=self.store.pk).exists())
+
+
+class TestSellList(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="seller")
+        self.client.force_authenticate(self.user)
+
+    def test_create_store_validates_sell_list_before_saving(self):
+        item = models.SellList.objects.create(name="아메리카노")
+        data = {"name": "cafe", "description": "d", "kind_menu": "cafe", "city": "서울"}
+
+        response = self.client.post("/api/v1/stores", {**data, "sell_list": [item.pk, 999]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(models.Store.objects.exists())
+
+        response = self.client.post("/api/v1/stores", {**data, "sell_list": [item.pk, item.pk]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(models.Store.objects.get().sell_list.all()), [item])
+
+    def test_sell_list_items_are_deduplicated(self):
+        store = models.Store.objects.create(
+            name="s", description="d", kind_menu="cafe", city="서울", owner=self.user
+        )
+        for name in ("아메리카노", " 아메리카노 ", "ＡＭＥＲＩＣＡＮＯ", "americano"):
+            response = self.client.post(f"/api/v1/stores/{store.pk}/sellinglists", {"name": name})
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(models.SellList.objects.count(), 2)
+        self.assertEqual(store.sell_list.count(), 2)
+
+    def test_rejects_names_that_grow_past_the_column_when_normalized(self):
+        store = models.Store.objects.create(name="s", description="d", kind_menu="cafe", city="서울", owner=self.user)
+        # "㈜" 는 NFKC 로 "(주)" 세 글자가 된다.
+        response = self.client.post(f"/api/v1/stores/{store.pk}/sellinglists", {"name": "㈜" * 100})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(models.SellList.objects.exists())
+        with self.assertRaises(ValueError):
+            models.SellList.objects.get_or_create_item("㈜" * 100)
+
+    def test_rename_and_delete_only_touch_own_stores(self):
+        item = models.SellList.objects.create(name="아메리카노")
+        mine = models.Store.objects.create(name="mine", description="d", kind_menu="cafe", city="서울", owner=self.user)
+        other = models.Store.objects.create(
+            name="other", description="d", kind_menu="cafe", city="서울", owner=User.objects.create(username="other")
+        )
+        mine.sell_list.add(item)
+        other.sell_list.add(item)
+        url = f"/api/v1/stores/sellinglists/{item.pk}"
+
+        response = self.client.put(url, {"name": "라떼"})
+        self.assertEqual(response.status_code, 200)
+        latte = models.SellList.objects.get(pk=response.json()["pk"])
+        item.refresh_from_db()
+        self.assertEqual((item.name, latte.name), ("아메리카노", "라떼"))
+        self.assertEqual(list(mine.sell_list.all()), [latte])
+        self.assertEqual(list(other.sell_list.all()), [item])
+
+        # 내 가게에 연결되지 않은 항목은 바꾸거나 지울 수 없다.
+        self.assertEqual(self.client.put(url, {"name": "녹차"}).status_code, 403)
+        self.assertEqual(self.client.delete(url).status_code, 403)
+
+        self.assertEqual(self.client.delete(f"/api/v1/stores/sellinglists/{latte.pk}").status_code, 204)
+        self.assertFalse(mine.sell_list.exists())
+        self.assertTrue(models.SellList.objects.filter(pk=latte.pk).exists())
+        self.assertEqual(list(other.sell_list.all()), [item])
+
+    def test_search_returns_items_with_their_stores(self):
+        latte = models.SellList.objects.create(name="카페 라떼")
+        americano = models.SellList.objects.create(name="아메리카노")
+        models.SellList.objects.create(name="녹차")
+        for i in range(3):
+            store = models.Store.objects.create(
+                name=f"s{i}", description="d", kind_menu="cafe", city="서울", owner=self.user
+            )
+            store.sell_list.add(latte, americano)
+
+        response = self.client.get("/api/v1/sellinglists/search", {"q": "라떼"})
+        self.assertEqual([item["pk"] for item in response.json()], [latte.pk])
+        self.assertEqual(len(response.json()[0]["stores"]), 3)
+
+        response = self.client.get("/api/v1/sellinglists/search", {"q": "아메"})
+        self.assertEqual([item["pk"] for item in response.json()], [americano.pk])
+
+        with CaptureQueriesContext(connection) as few:
+            self.client.get("/api/v1/sellinglists/search", {"q": "카"})
+        for i in range(5):
+            store = models.Store.objects.create(
+                name=f"more{i}", description="d", kind_menu="cafe", city="서울", owner=User.objects.create(username=f"u{i}")
+            )
+            store.sell_list.add(latte)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get("/api/v1/sellinglists/search", {"q": "카"})
+        self.assertEqual(len(few), len(many))
+
+    def test_single_character_search_matches_inside_names(self):
+        latte = models.SellList.objects.create(name="카페 라떼")
+        models.SellList.objects.create(name="녹차")
+
+        response = self.client.get("/api/v1/sellinglists/search", {"q": "떼"})
+        self.assertEqual([item["pk"] for item in response.json()], [latte.pk])
+
+        response = self.client.get("/api/v1/sellinglists/search", {"q": " "})
+        self.assertEqual(response.json(), [])
+
+    @override_settings(PAGE_SIZE=2)
+    def test_item_stores_are_limited_and_paginated(self):
+        coffee = models.SellList.objects.create(name="커피")
+        stores = []
+        for i in range(5):
+            store = models.Store.objects.create(
+                name=f"s{i}", description="d", kind_menu="cafe", city="서울", owner=self.user
+            )
+            store.sell_list.add(coffee)
+            stores.append(store)
+        stores[4].is_deleted = True
+        stores[4].save()
+
+        response = self.client.get("/api/v1/sellinglists/search", {"q": "커피"})
+        self.assertEqual([store["pk"] for store in response.json()[0]["stores"]], [stores[3].pk, stores[2].pk])
+
+        pages = [
+            [store["pk"] for store in self.client.get(f"/api/v1/sellinglists/{coffee.pk}/stores", {"page": page}).json()]
+            for page in (1, 2, 3)
+        ]
+        self.assertEqual(pages, [[stores[3].pk, stores[2].pk], [stores[1].pk, stores[0].pk], []])
+        self.assertEqual(self.client.get("/api/v1/sellinglists/999/stores").status_code, 404)
+
+
+class TestValuesSerializers(APITestCase):
+    """목록 API의 ValuesSerializer 가 ModelSerializer 와 같은 JSON을 만드는지 확인"""
+
+    def setUp(self):
+        self.owner = User.objects.create(username="owner", avatar="https://example.com/owner.png")
+        self.user = User.objects.create(username="리뷰어")
+        self.stores = [
+            models.Store.objects.create(
+                name=f"가게 {i}", description="desc", kind_menu="food", city="서울",
+                owner=self.owner if i else self.user,
+            )
+            for i in range(3)
+        ]
+        self.stores[0].set_photos(["https://example.com/1.png", "https://example.com/2.png"])
+        Reviews.objects.create(user=self.user, store=self.stores[0], description="a", taste_rating=5, clean_rating=2)
+        Reviews.objects.create(user=self.owner, store=self.stores[0], description="b", review_photo=["x.png"])
+        Reviews.objects.create(user=self.user, store=self.stores[1], description="c", taste_rating=4)
+        booking = Booking.objects.create(user=self.user)
+        booking.store.set([self.stores[2], self.stores[0]])
+        Booking.objects.create(user=self.user)
+        deleted = models.Store.objects.create(
+            name="deleted", description="desc", kind_menu="cafe", city="서울", owner=self.owner
+        )
+        booking.store.add(deleted)
+        deleted.soft_delete()
+
+    def assertSameJSON(self, expected, actual):
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_store_list(self):
+        stores = models.Store.objects.order_by("-pk")
+        for user in (AnonymousUser(), self.user):
+            context = {"request": SimpleNamespace(user=user)}
+            expected = StoreListSerializer(stores, many=True, context=context).data
+            actual = StoreListValuesSerializer.from_queryset(stores.with_ratings(), context=dict(context)).data
+            self.assertSameJSON(expected, actual)
+
+    def test_reviews(self):
+        reviews = Reviews.objects.order_by("pk")
+        self.assertSameJSON(
+            ReviewSerializer(reviews, many=True).data,
+            ReviewValuesSerializer.from_queryset(reviews).data,
+        )
+
+    def test_bookings(self):
+        bookings = Booking.objects.order_by("pk")
+        expected = BookingSerializer(
+            bookings.prefetch_related(Prefetch("store", queryset=models.Store.objects.order_by("pk"))), many=True
+        ).data
+        with self.assertNumQueries(2):
+            actual = BookingValuesSerializer.from_queryset(bookings).data
+        self.assertSameJSON(expected, actual)
+
+    def test_list_endpoints(self):
+        self.client.force_login(self.user)
+        # session, user + 목록 1번 + 찜 여부 1번 (store 수와 상관없음)
+        with self.assertNumQueries(4):
+            response = self.client.get("/api/v1/stores")
+        self.assertEqual([store["is_liked"] for store in response.json()], [True, False, True])
+
+
+class TestSparseFields(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="owner")
+        self.item = models.SellList.objects.create(name="커피")
+        self.store = models.Store.objects.create(
+            name="store", description="desc", kind_menu="cafe", city="서울", owner=self.user,
+        )
+        self.store.set_photos(["https://example.com/1.png"])
+        self.store.sell_list.add(self.item)
+        Reviews.objects.create(user=self.user, store=self.store, description="a", taste_rating=4)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), [query["sql"] for query in queries]
+
+    def test_detail_fields_prune_queries(self):
+        full, full_queries = self.get(f"/api/v1/stores/{self.store.pk}")
+        data, queries = self.get(f"/api/v1/stores/{self.store.pk}?fields=name,cover_photo")
+        self.assertEqual(data, {"name": "store", "cover_photo": "https://example.com/1.png"})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("reviews_reviews", queries[0])
+        self.assertGreater(len(full_queries), len(queries))
+        self.assertEqual(full["total_rating"], 4.0)
+        self.assertEqual(full["sell_list"][0]["name"], "커피")
+
+        data, queries = self.get(f"/api/v1/stores/{self.store.pk}?exclude=sell_list,owner")
+        self.assertNotIn("sell_list", data)
+        self.assertNotIn("owner", data)
+        self.assertEqual(data["taste_rating"], 4.0)
+        self.assertEqual(len(queries), 1)
+
+    def test_list_fields(self):
+        data, queries = self.get("/api/v1/stores?fields=pk,name")
+        self.assertEqual(data, [{"pk": self.store.pk, "name": "store"}])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("reviews_reviews", queries[0])
+        self.assertNotIn("users_user", queries[0])
+
+        data, _ = self.get(f"/api/v1/stores/{self.store.pk}/reviews?exclude=user,description")
+        self.assertNotIn("user", data[0])
+        self.assertEqual(data[0]["total_rating"], 4.0)
+
+    def test_unknown_field(self):
+        response = self.client.get("/api/v1/stores?fields=name,password")
+        self.assertEqual(response.status_code, 400)
+
+
+class TestDescriptionExcerpt(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="owner")
+        self.store = models.Store.objects.create(
+            name="store", description="맛있는   집\n" * 40, kind_menu="food", city="서울", owner=self.user
+        )
+
+    def test_excerpt_is_kept_in_sync(self):
+        self.assertEqual(len(self.store.description_excerpt), models.DESCRIPTION_EXCERPT_LENGTH)
+        self.assertTrue(self.store.description_excerpt.startswith("맛있는 집 맛있는 집"))
+        self.assertTrue(self.store.description_excerpt.endswith("…"))
+
+        self.store.description = "짧은 설명"
+        self.store.save(update_fields=["description"])
+        self.store.refresh_from_db()
+        self.assertEqual(self.store.description_excerpt, "짧은 설명")
+
+    def test_list_reads_excerpt_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/v1/stores")
+        self.assertEqual(response.json()[0]["description"], self.store.description_excerpt)
+        # (SQLite 는 GROUP BY 에 모든 column을 나열하므로 SELECT 목록만 확인)
+        selected = queries[0]["sql"].split(" FROM ")[0]
+        self.assertNotIn('"stores_store"."description",', selected)
+        self.assertEqual(
+            self.client.get(f"/api/v1/stores/{self.store.pk}").json()["description"], self.store.description
+        )
+
+
+class TestStorePhotos(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="owner")
+        self.store = models.Store.objects.create(
+            name="store", description="desc", kind_menu="cafe", city="서울", owner=self.user
+        )
+
+    def test_cover_photo_follows_first_photo(self):
+        urls = [f"https://example.com/{i}.png" for i in range(12)]
+        self.store.set_photos(urls)
+        self.assertEqual(self.store.cover_photo, urls[0])
+        self.store.set_photos(urls[3:])
+        self.store.refresh_from_db()
+        self.assertEqual(self.store.cover_photo, urls[3])
+        self.store.set_photos([])
+        self.store.refresh_from_db()
+        self.assertEqual(self.store.cover_photo, "")
+
+    def test_cards_carry_cover_and_gallery_is_paginated(self):
+        urls = [f"https://example.com/{i}.png" for i in range(12)]
+        self.store.set_photos(urls)
+
+        card = self.client.get("/api/v1/stores").json()[0]
+        self.assertEqual(card["cover_photo"], urls[0])
+        self.assertNotIn("store_photo", card)
+        self.assertNotIn("store_photo", self.client.get(f"/api/v1/stores/{self.store.pk}").json())
+
+        first = self.client.get(f"/api/v1/stores/{self.store.pk}/photos").json()
+        second = self.client.get(f"/api/v1/stores/{self.store.pk}/photos?page=2").json()
+        self.assertEqual([photo["url"] for photo in first + second], urls)
+        self.assertEqual(first[0]["position"], 0)
+        self.assertEqual(self.client.get("/api/v1/stores/999/photos").status_code, 404)
+
+    def test_write_serializers_accept_url_list(self):
+        serializer = StorePostSerializer(data={
+            "name": "new", "description": "d", "kind_menu": "food", "city": "서울",
+            "store_photo": ["https://example.com/a.png", "https://example.com/b.png"],
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        store = serializer.save(owner=self.user)
+        self.assertEqual(list(store.photos.values_list("url", flat=True)), ["https://example.com/a.png", "https://example.com/b.png"])
+        self.assertEqual(serializer.data["cover_photo"], "https://example.com/a.png")
+
+        serializer = StoreDetailSerializer(store, data={"store_photo": ["https://example.com/c.png"]}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        store.refresh_from_db()
+        self.assertEqual(store.cover_photo, "https://example.com/c.png")
+        self.assertEqual(store.photos.count(), 1)
+
+    def test_uploaded_photos_use_sized_urls_once_processed(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        with self.settings(MEDIA_ROOT=media_root, MEDIA_URL="https://cdn.example.com/media/"):
+            photo = photos.create_photo(SimpleUploadedFile("a.jpg", make_image()), "JPEG", 2000, 1000, owner=self.user)
+        uploaded = photo.url
+        self.store.set_photos([uploaded, "https://example.com/b.png"])
+        Reviews.objects.create(
+            user=self.user, store=self.store, description="good", review_photo=["https://example.com/b.png", uploaded]
+        )
+
+        # 변환 전에는 원본 URL
+        self.assertEqual(self.store.cover_photo, uploaded)
+        gallery = self.client.get(f"/api/v1/stores/{self.store.pk}/photos").json()
+        self.assertEqual((gallery[0]["width"], gallery[0]["height"], gallery[0]["sizes"]), (2000, 1000, None))
+        review = self.client.get(f"/api/v1/stores/{self.store.pk}/reviews").json()[0]
+        self.assertEqual(review["review_thumbnails"], review["review_photo"])
+
+        with self.settings(MEDIA_ROOT=media_root):
+            run_pending()
+        self.store.refresh_from_db()
+        self.assertEqual(self.store.cover_photo, uploaded.replace("original.jpg", "card.jpg"))
+        self.assertEqual(self.client.get("/api/v1/stores").json()[0]["cover_photo"], self.store.cover_photo)
+
+        gallery = self.client.get(f"/api/v1/stores/{self.store.pk}/photos").json()
+        self.assertEqual(gallery[0]["sizes"]["large"]["webp"], uploaded.replace("original.jpg", "large.webp"))
+        self.assertIsNone(gallery[1]["sizes"])
+
+        thumbnails = ["https://example.com/b.png", uploaded.replace("original.jpg", "thumb.jpg")]
+        review = self.client.get(f"/api/v1/stores/{self.store.pk}/reviews").json()[0]
+        self.assertEqual(review["review_thumbnails"], thumbnails)
+        detail = ReviewSerializer(Reviews.objects.all(), many=True).data[0]
+        self.assertEqual(detail["review_thumbnails"], thumbnails)
+
+
+CITY_HALL = (37.5663, 126.9779)
+
+
+def offset(origin, north=0, east=0):
+    """origin 에서 북쪽 / 동쪽으로 m 만큼 떨어진 위치"""
+    latitude, longitude = origin
+    return (
+        latitude + north / geo.METERS_PER_DEGREE,
+        longitude + east / (geo.METERS_PER_DEGREE * math.cos(math.radians(latitude))),
+    )
+
+
+class TestNearby(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="owner")
+        self.stores = {}
+        for name, kind, location in (
+            ("north300", "cafe", offset(CITY_HALL, north=300)),
+            ("east800", "food", offset(CITY_HALL, east=800)),
+            ("southwest1500", "cafe", offset(CITY_HALL, north=-1060, east=-1060)),
+            ("busan", "food", (35.1796, 129.0756)),
+            ("nowhere", "food", (None, None)),
+        ):
+            self.stores[name] = models.Store.objects.create(
+                name=name, description="desc", kind_menu=kind, city="서울", owner=self.user,
+                latitude=location[0], longitude=location[1],
+            )
+
+    def nearby(self, query):
+        return self.client.get(f"/api/v1/stores/nearby?lat={CITY_HALL[0]}&lng={CITY_HALL[1]}&{query}")
+
+    def test_orders_by_distance_within_radius(self):
+        with self.assertNumQueries(3):
+            # 1) 500m 안 (1개라 page 를 못 채움) 2) 1000m 안의 pk / 거리 (index 만) 3) 그 pk 의 카드 column
+            stores = self.nearby("radius=1000").json()
+        self.assertEqual([store["name"] for store in stores], ["north300", "east800"])
+        self.assertEqual([store["distance"] for store in stores], [300, 800])
+        self.assertIn("cover_photo", stores[0])
+
+        stores = self.nearby("radius=2000").json()
+        self.assertEqual([store["name"] for store in stores], ["north300", "east800", "southwest1500"])
+        self.assertEqual([store["name"] for store in self.nearby("radius=2000&type=cafe").json()], ["north300", "southwest1500"])
+        self.assertEqual(self.nearby("fields=pk,distance").json()[0], {"pk": self.stores["north300"].pk, "distance": 300})
+
+        # 작은 반경에서 page 가 차면 더 넓히지 않는다. 결과는 전체 반경에서 정렬한 것과 같다.
+        expected = list(models.Store.objects.nearby(*CITY_HALL, 2000).values_list("pk", "distance")[:2])
+        with self.assertNumQueries(2):
+            self.assertEqual(models.Store.objects.nearest(*CITY_HALL, 2000, 0, 2, first_radius=250), expected)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get("/api/v1/stores/nearby?lat=37.5").status_code, 400)
+        self.assertEqual(self.client.get("/api/v1/stores/nearby?lat=91&lng=0").status_code, 400)
+        self.assertEqual(self.nearby("radius=abc").status_code, 400)
+        self.assertEqual(self.nearby("radius=100000").status_code, 400)
+        self.assertEqual(self.nearby("type=bar").status_code, 400)
+
+    def test_geocell_follows_location(self):
+        store = self.stores["nowhere"]
+        self.assertIsNone(store.geocell)
+        store.latitude, store.longitude = CITY_HALL
+        store.save(update_fields=["latitude", "longitude"])
+        store.refresh_from_db()
+        self.assertEqual(store.geocell, geo.encode(*CITY_HALL))
+
+        serializer = StoreDetailSerializer(store, data={"latitude": None}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("location", serializer.errors)
+
+    def test_cell_ranges_cover_every_point_in_radius(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            center = (rng.uniform(-80, 80), rng.uniform(-170, 170))
+            radius = rng.choice((50, 1000, 20000))
+            ranges = geo.cell_ranges(geo.bounding_box(*center, radius))
+            self.assertLessEqual(len(ranges), 4)
+            for _ in range(20):
+                bearing, distance = rng.uniform(0, 2 * math.pi), radius * math.sqrt(rng.random())
+                point = offset(center, north=distance * math.cos(bearing), east=distance * math.sin(bearing))
+                if geo.haversine(*center, *point) > radius:
+                    continue
+                cell = geo.encode(*point)
+                self.assertTrue(any(start <= cell < end for start, end in ranges), (center, radius, point))
+
+
+class TestClusters(APITestCase):
+
+    BBOX = "126.9,37.5,127.1,37.6"
+
+    def setUp(self):
+        self.user = User.objects.create(username="owner")
+
+    def create(self, name, location, kind="cafe", pet_friendly=False):
+        return models.Store.objects.create(
+            name=name, description="desc", kind_menu=kind, city="서울", owner=self.user,
+            latitude=location[0], longitude=location[1], pet_friendly=pet_friendly,
+        )
+
+    def snapshot(self):
+        return sorted(
+            (cell.zoom, cell.x, cell.y, cell.kind_menu, cell.pet_friendly, cell.count,
+             round(cell.latitude_sum, 9), round(cell.longitude_sum, 9), cell.top_store_id)
+            for cell in models.StoreCell.objects.all()
+        )
+
+    def get(self, query):
+        return self.client.get(f"/api/v1/stores/clusters?bbox={self.BBOX}&{query}")
+
+    def test_clusters_by_zoom_and_filters(self):
+        a = self.create("a", CITY_HALL)
+        b = self.create("b", offset(CITY_HALL, east=50), kind="food", pet_friendly=True)
+        far = self.create("far", offset(CITY_HALL, north=3000))
+        self.create("no location", (None, None))
+
+        with self.assertNumQueries(2):
+            near, other = self.get("zoom=14").json()
+        self.assertEqual(near["count"], 2)
+        self.assertAlmostEqual(near["latitude"], (a.latitude + b.latitude) / 2)
+        self.assertEqual(near["top_store"], {"pk": b.pk, "name": "b", "kind_menu": "food", "cover_photo": ""})
+        self.assertEqual((other["count"], other["top_store"]["pk"]), (1, far.pk))
+
+        # zoom 이 낮으면 한 cluster 로 묶인다. (최소 단계보다 낮으면 최소 단계)
+        self.assertEqual([cluster["count"] for cluster in self.get("zoom=0").json()], [3])
+        self.assertEqual([cluster["count"] for cluster in self.get("zoom=14&type=cafe").json()], [1, 1])
+        self.assertEqual([cluster["top_store"]["pk"] for cluster in self.get("zoom=14&pet_friendly=true").json()], [b.pk])
+
+    def test_cells_follow_store_changes_and_match_rebuild(self):
+        a = self.create("a", CITY_HALL)
+        b = self.create("b", offset(CITY_HALL, east=50))
+        c = self.create("c", offset(CITY_HALL, north=3000), kind="food")
+
+        b.latitude, b.longitude = offset(CITY_HALL, north=3000)
+        b.save()
+        c.kind_menu = "cafe"
+        c.save(update_fields=["kind_menu"])
+        with self.assertNumQueries(1):
+            # 집계와 관계없는 field 만 저장하면 집계를 건드리지 않는다. (UPDATE 한 번)
+            a.save(update_fields=["description"])
+        c.soft_delete()
+        a.delete()
+
+        incremental = self.snapshot()
+        clusters.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+        self.assertEqual([(cluster["count"], cluster["top_store"]["pk"]) for cluster in self.get("zoom=14").json()], [(1, b.pk)])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get("/api/v1/stores/clusters?zoom=3").status_code, 400)
+        self.assertEqual(self.get("zoom=x").status_code, 400)
+        self.assertEqual(self.get("zoom=10&type=bar").status_code, 400)
+        self.assertEqual(self.get("zoom=10&pet_friendly=yes").status_code, 400)
+        self.assertEqual(self.client.get("/api/v1/stores/clusters?bbox=127,37,126,38&zoom=10").status_code, 400)
+        # 화면에 비해 zoom 이 너무 크면 cell 이 너무 많다.
+        self.assertEqual(self.client.get("/api/v1/stores/clusters?bbox=120,30,135,45&zoom=14").status_code, 400)
+
+
+class TestStoreRegions(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="owner")
+
+    def test_region_is_resolved_from_city(self):
+        gangnam = Region.objects.get(full_name="서울특별시 강남구")
+        serializer = StorePostSerializer(data={"name": "new", "description": "d", "kind_menu": "food", "city": "서울시 강남구"})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        store = serializer.save(owner=self.user)
+        self.assertEqual(store.region, gangnam)
+
+        # region 을 직접 주면 city 로 찾지 않는다.
+        mapo = Region.objects.get(full_name="서울특별시 마포구")
+        serializer = StoreDetailSerializer(store, data={"city": "어딘가", "region": mapo.pk}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.save().region, mapo)
+
+        serializer = StoreDetailSerializer(store, data={"city": "어딘가"}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertIsNone(serializer.save().region)
+
+    def test_list_filters_by_region_and_sub_regions(self):
+        stores = {
+            full_name: models.Store.objects.create(
+                name=full_name, description="d", kind_menu="food", city=full_name, owner=self.user,
+                region=Region.objects.get(full_name=full_name),
+            )
+            for full_name in ("서울특별시 강남구", "경기도 수원시 장안구", "경기도 화성시")
+        }
+
+        def names(region):
+            response = self.client.get(f"/api/v1/stores?region={Region.objects.get(full_name=region).pk}")
+            return [store["name"] for store in response.json()]
+
+        self.assertEqual(names("경기도"), ["경기도 화성시", "경기도 수원시 장안구"])
+        self.assertEqual(names("경기도 수원시"), ["경기도 수원시 장안구"])
+        self.assertEqual(names("서울특별시 강남구"), ["서울특별시 강남구"])
+        self.assertEqual(names("부산광역시"), [])
+        self.assertEqual(
+            self.client.get("/api/v1/stores?fields=region").json()[0]["region"],
+            stores["경기도 화성시"].region_id,
+        )
+        self.assertEqual(self.client.get("/api/v1/stores?region=x").status_code, 400)
+
+
+class TestFacets(APITestCase):
+    URL = "/api/v1/stores/facets"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="owner")
+        self.seoul = Region.objects.get(full_name="서울특별시")
+        self.gangnam = Region.objects.get(full_name="서울특별시 강남구")
+        self.busan = Region.objects.get(full_name="부산광역시")
+        for name, kind, pet_friendly, region in (
+            ("강남 카페", "cafe", True, self.gangnam),
+            ("강남 식당", "food", False, self.gangnam),
+            ("서울 카페", "cafe", False, self.seoul),
+            ("부산 카페", "cafe", True, Region.objects.get(full_name="부산광역시 중구")),
+            ("어딘가 식당", "food", True, None),
+        ):
+            self.create(name, kind, pet_friendly, region)
+        self.create("삭제된 카페", "cafe", True, self.gangnam).soft_delete()
+
+    def create(self, name, kind, pet_friendly, region):
+        return models.Store.objects.create(
+            name=name, description="d", kind_menu=kind, pet_friendly=pet_friendly, city="", owner=self.user, region=region,
+        )
+
+    def get(self, query=""):
+        response = self.client.get(f"{self.URL}?{query}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def region_counts(self, result):
+        return {region["name"]: region["count"] for region in result["region"] if region["count"]}
+
+    def test_counts_exclude_own_facet_filter(self):
+        result = self.get("type=cafe")
+        self.assertEqual(result["total"], 3)
+        # 선택한 type 이 있어도 다른 type 의 수를 보여준다.
+        self.assertEqual(result["kind_menu"], {"food": 2, "cafe": 3, "ect": 0})
+        self.assertEqual(result["pet_friendly"], {"true": 2, "false": 1})
+        self.assertEqual(self.region_counts(result), {"서울특별시": 2, "부산광역시": 1})
+        self.assertEqual(len(result["region"]), 17)
+
+        result = self.get(f"region={self.seoul.pk}&pet_friendly=false")
+        self.assertEqual(result["total"], 2)
+        self.assertEqual(result["kind_menu"], {"food": 1, "cafe": 1, "ect": 0})
+        self.assertEqual(result["pet_friendly"], {"true": 1, "false": 2})
+        # 서울특별시에만 연결된 store 는 어느 구에도 세지 않는다.
+        self.assertEqual(self.region_counts(result), {"강남구": 1})
+
+        # 목록의 결과 수와 같다.
+        for query in ("type=cafe", f"region={self.seoul.pk}&pet_friendly=false", "keyword=카페&pet_friendly=true"):
+            with self.subTest(query=query):
+                self.assertEqual(self.get(query)["total"], len(self.client.get(f"/api/v1/stores?{query}").json()))
+
+    def test_keyword_counts_match_counter_counts(self):
+        # 검색어가 없으면 StoreFacetCount, 있으면 store GROUP BY. 모든 store 에 맞는 검색어로 비교한다.
+        for query in ("", "type=food", f"region={self.seoul.pk}", f"region={self.busan.pk}&pet_friendly=true"):
+            with self.subTest(query=query):
+                self.assertEqual(self.get(query), self.get(f"{query}&keyword= "))
+        self.assertEqual(self.get("keyword=강남")["total"], 2)
+
+    def test_cached_until_a_store_changes(self):
+        first = self.get()
+        with self.assertNumQueries(1):
+            # cache version 만 읽는다.
+            self.assertEqual(self.get(), first)
+
+        store = models.Store.objects.get(name="어딘가 식당")
+        with self.captureOnCommitCallbacks(execute=True):
+            store.kind_menu = "ect"
+            store.region = self.busan
+            store.save()
+        result = self.get()
+        self.assertEqual(result["kind_menu"], {"food": 1, "cafe": 3, "ect": 1})
+        self.assertEqual(self.region_counts(result), {"서울특별시": 3, "부산광역시": 2})
+
+        # 이름만 바뀌어도 검색어 결과가 바뀐다.
+        self.assertEqual(self.get("keyword=바다")["total"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            store.name = "바다 식당"
+            store.save(update_fields=["name"])
+        self.assertEqual(self.get("keyword=바다")["total"], 1)
+
+    def test_counters_follow_store_changes_and_match_rebuild(self):
+        def snapshot():
+            return sorted(models.StoreFacetCount.objects.values_list("kind_menu", "pet_friendly", "region", "count"))
+
+        store = models.Store.objects.get(name="강남 카페")
+        store.pet_friendly = False
+        store.save()
+        models.Store.objects.get(name="서울 카페").soft_delete()
+        models.Store.objects.get(name="부산 카페").delete()
+        models.Store.all_objects.get(name="삭제된 카페").delete()
+        self.create("새 카페", "cafe", False, self.gangnam)
+
+        incremental = snapshot()
+        facets.rebuild()
+        self.assertEqual(incremental, snapshot())
+        self.assertEqual(sum(row[-1] for row in incremental), 4)
+
+    def test_invalid_parameters(self):
+        for query in ("type=bar", "pet_friendly=yes", "region=x"):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"{self.URL}?{query}").status_code, 400)
+        # 목록의 정렬 type 은 무시한다.
+        self.assertEqual(self.get("type=rate")["total"], 5)
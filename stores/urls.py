@@ -4,14 +4,19 @@ from . import views
 
 urlpatterns = [
     path('stores', views.Stores.as_view()),
+    path("stores/nearby", views.StoresNearby.as_view()),
+    path("stores/clusters", views.StoreClusters.as_view()),
+    path("stores/facets", views.StoreFacets.as_view()),
     path("stores/<int:pk>", views.StoresDetail.as_view()),
 
     path("stores/<int:pk>/sellinglists", views.SellingListView.as_view()),
     path("stores/sellinglists/<int:pk>", views.SellingListDetail.as_view()),
+    path("sellinglists/search", views.SellingListSearch.as_view()),
+    path("sellinglists/<int:pk>/stores", views.SellingListStores.as_view()),
 
     path("stores/<int:pk>/reviews", views.StoreReviews.as_view()),
     # path("stores/<int:pk>/reviews/<int:pk>", views.StoreDetailReviews.as_view()),
-    # path("stores/<int:pk>/photos", views.StorePhotosToggle.as_view()),
+    path("stores/<int:pk>/photos", views.StorePhotos.as_view()),
 
     # path("/sellinglists", views.SellingList.as_view()),
 ]
\ No newline at end of file
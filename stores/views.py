@@ -1,16 +1,23 @@
 from django.conf import settings
-from django.db.models import Count, Avg, F, Q
+from django.db import transaction
+from django.db.models import Count, Avg, F, Q, Window
+from django.db.models.functions import RowNumber
 
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.views import APIView
+from config.db_router import ReplicaReadMixin
 from rest_framework.response import Response
 from rest_framework.exceptions import NotFound,PermissionDenied,ParseError,AuthenticationFailed
 from rest_framework.status import HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST, HTTP_201_CREATED
 import jwt
-from .serializer import StoreListSerializer, SellingListSerializer, StoreDetailSerializer, StorePostSerializer
-from .models import Store, SellList
-from reviews.serializers import ReviewSerializer, ReviewDetailSerializer
+from .serializer import StoreListSerializer, StoreListValuesSerializer, NearbyStoreValuesSerializer, SellingListSerializer, SellingListSearchSerializer, StoreDetailSerializer, StorePostSerializer, StorePhotoSerializer, liked_store_pks
+from .models import Store, SellList, StorePhoto
+from regions.models import Region
+from . import clusters, facets
+from reviews.serializers import ReviewSerializer, ReviewDetailSerializer, ReviewValuesSerializer
 from bookings.models import Booking
+from common.serializers import requested_fields
+from config.schema import FIELDS_PARAMETERS
 
 # swagger 추가
 from drf_yasg.utils import swagger_auto_schema
@@ -41,13 +48,114 @@ class SellingList(APIView):
     def post(self, request):
         serializer = SellingListSerializer(data=request.data)
         if serializer.is_valid():
-            new_selling = serializer.save()
+            new_selling = SellList.objects.get_or_create_item(**serializer.validated_data)
             return Response("OK")
             # return Response(SellingListSerializer(new_selling).data)
         else:
             return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
 
+class SellingListSearch(ReplicaReadMixin, APIView):
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    # swagger
+    @swagger_auto_schema(
+        operation_description="Search selling list items by name and return the stores that sell them",
+        responses={200: SellingListSearchSerializer(many=True)},
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Item name (prefix or partial match)", type=openapi.TYPE_STRING),
+            openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER)
+        ]
+    )
+
+    def get(self, request):
+        try:
+            page = request.query_params.get("page", 1) # page를 찾을 수 없다면 1 page
+            page = int(page)
+        except ValueError:
+            page = 1
+
+        page_size = settings.PAGE_SIZE
+        start = (page - 1) * page_size
+        end = start + page_size
+
+        keyword = request.query_params.get("q", "")
+        items = list(SellList.objects.search(keyword).order_by("normalized_name")[start:end])
+
+        # 페이지의 모든 item에 대한 store를 item 수와 상관없이 고정된 수의 쿼리로 가져온다.
+        # item 마다 최신 store PAGE_SIZE 개만 DB 에서 잘라 온다. (ROW_NUMBER() OVER (PARTITION BY item))
+        # 그 뒤의 store 는 sellinglists/<pk>/stores?page= 로 본다.
+        links = (
+            Store.sell_list.through.objects.filter(
+                selllist_id__in=[item.pk for item in items],
+                store__is_deleted=False,
+            )
+            .annotate(rank=Window(RowNumber(), partition_by=F("selllist_id"), order_by=F("store_id").desc()))
+            .filter(rank__lte=page_size)
+            .order_by("selllist_id", "rank")
+            .values_list("selllist_id", "store_id")
+        )
+        store_pks_by_item = {}
+        for item_pk, store_pk in links:
+            store_pks_by_item.setdefault(item_pk, []).append(store_pk)
+
+        store_pks = {pk for pks in store_pks_by_item.values() for pk in pks}
+        stores = Store.objects.with_ratings().select_related("owner").defer("description").in_bulk(store_pks)
+        context = {
+            "request": request,
+            "liked_store_pks": liked_store_pks(request, store_pks),
+            "stores_by_item": {
+                item_pk: [stores[pk] for pk in pks if pk in stores]
+                for item_pk, pks in store_pks_by_item.items()
+            },
+        }
+        serializer = SellingListSearchSerializer(items, many=True, context=context)
+        return Response(serializer.data)
+
+
+class SellingListStores(ReplicaReadMixin, APIView):
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    # swagger
+    @swagger_auto_schema(
+        operation_description="Retrieve the stores that sell a selling list item (newest first)",
+        responses={200: StoreListSerializer(many=True), 404: "Not Found"},
+        manual_parameters=[
+            openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER)
+        ]
+    )
+
+    def get(self, request, pk):
+        if not SellList.objects.filter(pk=pk).exists():
+            raise NotFound
+
+        try:
+            page = request.query_params.get("page", 1) # page를 찾을 수 없다면 1 page
+            page = int(page)
+        except ValueError:
+            page = 1
+
+        page_size = settings.PAGE_SIZE
+        start = (page - 1) * page_size
+        end = start + page_size
+
+        stores = list(
+            Store.objects.with_ratings()
+            .select_related("owner")
+            .defer("description")
+            .filter(sell_list=pk, is_deleted=False)
+            .order_by("-pk")[start:end]
+        )
+        context = {
+            "request": request,
+            "liked_store_pks": liked_store_pks(request, [store.pk for store in stores]),
+        }
+        serializer = StoreListSerializer(stores, many=True, context=context)
+        return Response(serializer.data)
+
+
 class SellingListDetail(APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -58,6 +166,13 @@ class SellingListDetail(APIView):
         except SellList.DoesNotExist:
             raise NotFound
 
+    def get_own_stores(self, request, sell_list):
+        # 판매 목록 항목은 여러 가게가 같이 쓰는 catalog 라서, 요청한 유저의 가게에 연결된 것만 바꾼다.
+        stores = list(Store.objects.filter(owner=request.user, sell_list=sell_list))
+        if not stores:
+            raise PermissionDenied
+        return stores
+
     # swagger
     @swagger_auto_schema(
         operation_description="Retrieve a selling list by its ID",
@@ -71,29 +186,40 @@ class SellingListDetail(APIView):
     
     # swagger
     @swagger_auto_schema(
-        operation_description="Update a selling list by its ID",
+        operation_description="Replace a selling list item on the caller's stores (the shared item is not renamed)",
         request_body=SellingListSerializer,
-        responses={200: "OK", 400: "Bad Request"}
+        responses={200: SellingListSerializer, 400: "Bad Request", 403: "Permission Denied"}
     )
 
     def put(self, request, pk):
         sell_list = self.get_object(pk)
+        stores = self.get_own_stores(request, sell_list)
         serializer = SellingListSerializer(sell_list, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
-            return Response("OK")
+            data = serializer.validated_data
+            with transaction.atomic():
+                # 이름을 바꾸면 같은 이름의 항목을 찾거나 새로 만들어 내 가게에만 다시 연결한다. (copy-on-write)
+                item = SellList.objects.get_or_create_item(
+                    data.get("name", sell_list.name), data.get("description", sell_list.description)
+                )
+                if item != sell_list:
+                    for store in stores:
+                        store.sell_list.remove(sell_list)
+                        store.sell_list.add(item)
+            return Response(SellingListSerializer(item).data)
         else:
             return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
     # swagger
     @swagger_auto_schema(
-        operation_description="Delete a selling list by its ID",
-        responses={204: "No Content"}
+        operation_description="Remove a selling list item from the caller's stores",
+        responses={204: "No Content", 403: "Permission Denied"}
     )
 
     def delete(self, request, pk):
         sell_list = self.get_object(pk)
-        sell_list.delete()
+        for store in self.get_own_stores(request, sell_list):
+            store.sell_list.remove(sell_list)
         return Response(status=HTTP_204_NO_CONTENT)
     
 # stores/pk/sellinglist
@@ -143,13 +269,14 @@ class SellingListView(APIView):
         store = self.get_object(pk)
         sell_list_serializer = SellingListSerializer(data=request.data)
         if sell_list_serializer.is_valid():
-            sell_list_serializer.save()
-            store.sell_list.add(sell_list_serializer.instance)
+            # 이미 같은 메뉴가 있으면 새로 만들지 않고 기존 항목을 연결
+            selling = SellList.objects.get_or_create_item(**sell_list_serializer.validated_data)
+            store.sell_list.add(selling)
             return Response("OK")
         else:
             return Response(sell_list_serializer.errors, status=HTTP_400_BAD_REQUEST)
 
-class Stores(APIView):
+class Stores(ReplicaReadMixin, APIView):
     
     permission_classes = [IsAuthenticatedOrReadOnly]
 
@@ -160,8 +287,10 @@ class Stores(APIView):
         manual_parameters=[
             openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER),
             openapi.Parameter('keyword', openapi.IN_QUERY, description="Keyword to search stores", type=openapi.TYPE_STRING),
-            openapi.Parameter('type', openapi.IN_QUERY, description="Type of store", type=openapi.TYPE_STRING, multiple=True)
-        ]
+            openapi.Parameter('type', openapi.IN_QUERY, description="Type of store", type=openapi.TYPE_STRING, multiple=True),
+            openapi.Parameter('region', openapi.IN_QUERY, description="Region pk (includes its sub-regions, see /regions)", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('pet_friendly', openapi.IN_QUERY, description="true / false", type=openapi.TYPE_BOOLEAN),
+        ] + FIELDS_PARAMETERS
     )
 
     def get(self, request):
@@ -186,6 +315,14 @@ class Stores(APIView):
                 all_store = all_store.filter(name__icontains=keyword)
         except ValueError:
             raise ParseError(detail="Invalid 'keyword' parameter value.")
+
+        # 지역 필터: 선택한 region 과 그 아래 region 의 pk (regions 표의 subquery) 로 stores_store_region_idx 를 탄다.
+        region = query_region(request)
+        if region is not None:
+            all_store = all_store.filter(region__in=Region.objects.subtree(region).values("pk"))
+        pet_friendly = query_bool(request, 'pet_friendly')
+        if pet_friendly is not None:
+            all_store = all_store.filter(pet_friendly=pet_friendly)
         
         # 필터링 처리 :store_type = request.query_params.get('type')
         # store_types = request.query_params.getlist('type')
@@ -233,7 +370,12 @@ class Stores(APIView):
         elif 'review_count' in annotate_conditions:
             all_store = all_store.annotate(**annotate_conditions).order_by('-review_count')
 
-        serializer = StoreListSerializer(all_store[start:end], many=True, context={'request': request})
+        # 목록은 ModelSerializer 대신 .values() row로 같은 응답을 만든다.
+        fields = requested_fields(request, StoreListValuesSerializer.field_names())
+        serializer = StoreListValuesSerializer.from_queryset(
+            StoreListValuesSerializer.prepare_queryset(all_store, fields)[start:end],
+            context={'request': request, 'fields': fields},
+        )
         return Response(serializer.data)
     
     # swagger
@@ -247,44 +389,202 @@ class Stores(APIView):
         serializer = StorePostSerializer(data=request.data)
 
         if serializer.is_valid():
-            sell_list = request.data.get('sell_list')
-            
-            # Store 객체를 먼저 저장
-            store = serializer.save(owner=request.user)
-
-            # sell_list가 있을 때만 처리
-            if sell_list is not None:
-                for sell_list_pk in sell_list:
-                    try:
-                        selling = SellList.objects.get(pk=sell_list_pk)
-                        store.sell_list.add(selling)
-                    except SellList.DoesNotExist:
-                        return Response({"error": f"{sell_list_pk}가 존재하지 않습니다."}, status=400)
-                
+            sell_list = request.data.get('sell_list') or []
+
+            # store를 만들기 전에 sell_list pk를 한 번의 쿼리로 검증
+            try:
+                sell_list_pks = list(dict.fromkeys(int(pk) for pk in sell_list))
+            except (TypeError, ValueError):
+                return Response({"error": "sell_list는 pk 목록이어야 합니다."}, status=400)
+            selling = SellList.objects.in_bulk(sell_list_pks)
+            for sell_list_pk in sell_list_pks:
+                if sell_list_pk not in selling:
+                    return Response({"error": f"{sell_list_pk}가 존재하지 않습니다."}, status=400)
+
+            with transaction.atomic():
+                store = serializer.save(owner=request.user)
+                Store.sell_list.through.objects.bulk_create(
+                    Store.sell_list.through(store_id=store.pk, selllist_id=sell_list_pk)
+                    for sell_list_pk in sell_list_pks
+                )
+
             serializer = StorePostSerializer(store, context={"request": request})
             return Response("OK")
         else:
             return Response(serializer.errors, status=400)
 
 
-class StoresDetail(APIView):
+def query_float(request, name, minimum, maximum, default=None):
+    """query parameter 를 minimum ~ maximum 범위의 float 로 읽는다. 없거나 잘못된 값이면 400"""
+    value = request.query_params.get(name)
+    if value is None and default is not None:
+        return default
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ParseError(detail=f"Invalid '{name}' parameter value.")
+    if not minimum <= value <= maximum:
+        raise ParseError(detail=f"'{name}' must be between {minimum} and {maximum}.")
+    return value
+
+
+def query_bool(request, name):
+    """query parameter 를 true / false 로 읽는다. 없으면 None, 잘못된 값이면 400"""
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    if value not in ("true", "false"):
+        raise ParseError(detail=f"Invalid '{name}' parameter value.")
+    return value == "true"
+
+
+def query_region(request):
+    """region query parameter (Region pk). 없으면 None, 잘못된 값이면 400"""
+    region = request.query_params.get("region")
+    if not region:
+        return None
+    try:
+        return int(region)
+    except ValueError:
+        raise ParseError(detail="Invalid 'region' parameter value.")
+
+
+class StoreFacets(ReplicaReadMixin, APIView):
+    """
+    stores 목록의 filter chip(type, pet_friendly, region)별 store 수 (stores.facets)
+    각 facet 은 자기 자신을 뺀 나머지 filter 를 적용한 수이고, region 은 선택한 region 바로 아래 단계별 수다.
+    """
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    # swagger
+    @swagger_auto_schema(
+        operation_description="Retrieve store counts per kind_menu, pet_friendly and region for the current stores filters",
+        responses={200: "OK", 400: "Bad Request"},
+        manual_parameters=[
+            openapi.Parameter('keyword', openapi.IN_QUERY, description="Keyword to search stores", type=openapi.TYPE_STRING),
+            openapi.Parameter('type', openapi.IN_QUERY, description="Type of store (cafe, food, ect)", type=openapi.TYPE_STRING, multiple=True),
+            openapi.Parameter('pet_friendly', openapi.IN_QUERY, description="true / false", type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter('region', openapi.IN_QUERY, description="Region pk (includes its sub-regions)", type=openapi.TYPE_INTEGER),
+        ]
+    )
+    def get(self, request):
+        # 목록의 정렬 type(rate, reviews)은 수에 영향이 없다.
+        kinds = [store_type for store_type in request.query_params.getlist("type") if store_type not in ("rate", "reviews")]
+        if not all(kind in Store.StoreMenuChoices.values for kind in kinds):
+            raise ParseError(detail="Invalid 'type' parameter value.")
+        return Response(facets.facets(
+            keyword=request.query_params.get("keyword", ""),
+            kinds=kinds,
+            pet_friendly=query_bool(request, "pet_friendly"),
+            region=query_region(request),
+        ))
+
+
+class StoresNearby(ReplicaReadMixin, APIView):
+    """현재 위치에서 radius(m) 안의 store 를 가까운 순서로 (geocell 범위로 후보를 고른 뒤 haversine 거리로 정렬)"""
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    # swagger
+    @swagger_auto_schema(
+        operation_description="Retrieve stores within `radius` meters of a location, nearest first",
+        responses={200: "OK", 400: "Bad Request"},
+        manual_parameters=[
+            openapi.Parameter('lat', openapi.IN_QUERY, description="Latitude", type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('lng', openapi.IN_QUERY, description="Longitude", type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('radius', openapi.IN_QUERY, description=f"Radius in meters (default {settings.NEARBY_DEFAULT_RADIUS}, max {settings.NEARBY_MAX_RADIUS})", type=openapi.TYPE_NUMBER),
+            openapi.Parameter('type', openapi.IN_QUERY, description="Type of store (cafe, food, ect)", type=openapi.TYPE_STRING),
+            openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER),
+        ] + FIELDS_PARAMETERS
+    )
+    def get(self, request):
+        try:
+            page = request.query_params.get("page", 1) # page를 찾을 수 없다면 1 page
+            page = int(page)
+        except ValueError:
+            page = 1
+        page_size = settings.PAGE_SIZE
+        start = (page - 1) * page_size
+        end = start + page_size
+
+        latitude = query_float(request, "lat", -90, 90)
+        longitude = query_float(request, "lng", -180, 180)
+        radius = query_float(request, "radius", 1, settings.NEARBY_MAX_RADIUS, default=settings.NEARBY_DEFAULT_RADIUS)
+
+        stores = Store.objects.all()
+        store_type = request.query_params.get("type")
+        if store_type:
+            if store_type not in Store.StoreMenuChoices.values:
+                raise ParseError(detail="Invalid 'type' parameter value.")
+            stores = stores.filter(kind_menu=store_type)
+
+        fields = requested_fields(request, NearbyStoreValuesSerializer.field_names())
+        serializer = NearbyStoreValuesSerializer.from_nearby(
+            stores.nearest(latitude, longitude, radius, start, end),
+            context={'request': request, 'fields': fields},
+        )
+        return Response(serializer.data)
+
+
+class StoreClusters(ReplicaReadMixin, APIView):
+    """지도 화면(bbox)의 store marker 를 zoom 단계 격자로 묶은 cluster (미리 집계한 StoreCell 만 읽는다)"""
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    # swagger
+    @swagger_auto_schema(
+        operation_description="Retrieve aggregated map clusters (count, centroid, top store) inside a bounding box",
+        responses={200: "OK", 400: "Bad Request"},
+        manual_parameters=[
+            openapi.Parameter('bbox', openapi.IN_QUERY, description="min_lng,min_lat,max_lng,max_lat", type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('zoom', openapi.IN_QUERY, description="Map zoom level (0-22)", type=openapi.TYPE_INTEGER, required=True),
+            openapi.Parameter('type', openapi.IN_QUERY, description="Type of store (cafe, food, ect)", type=openapi.TYPE_STRING),
+            openapi.Parameter('pet_friendly', openapi.IN_QUERY, description="true / false", type=openapi.TYPE_BOOLEAN),
+        ]
+    )
+    def get(self, request):
+        try:
+            min_lng, min_lat, max_lng, max_lat = (float(value) for value in request.query_params.get("bbox", "").split(","))
+            zoom = int(request.query_params.get("zoom", ""))
+        except ValueError:
+            raise ParseError(detail="Invalid 'bbox' or 'zoom' parameter value.")
+        if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= max_lng <= 180 and 0 <= zoom <= 22):
+            raise ParseError(detail="Invalid 'bbox' or 'zoom' parameter value.")
+
+        store_type = request.query_params.get("type")
+        if store_type is not None and store_type not in Store.StoreMenuChoices.values:
+            raise ParseError(detail="Invalid 'type' parameter value.")
+        pet_friendly = query_bool(request, "pet_friendly")
+
+        try:
+            result = clusters.clusters((min_lat, max_lat, min_lng, max_lng), zoom, store_type, pet_friendly)
+        except ValueError as exc:
+            raise ParseError(detail=str(exc))
+        return Response(result)
+
+
+class StoresDetail(ReplicaReadMixin, APIView):
     # 다른 사람 접근 금지
     permission_classes = [IsAuthenticatedOrReadOnly]
     
-    def get_object(self, pk):
+    def get_object(self, pk, queryset=None):
         try:
-            return Store.objects.get(pk=pk)
+            return (queryset if queryset is not None else Store.objects).get(pk=pk)
         except Store.DoesNotExist:
             raise NotFound
 
     # swagger
     @swagger_auto_schema(
         operation_description="Retrieve a store by its ID",
-        responses={200: StoreDetailSerializer, 404: "Not Found"}
+        responses={200: StoreDetailSerializer, 404: "Not Found"},
+        manual_parameters=FIELDS_PARAMETERS,
     )
     def get(self, request, pk):
-        store = self.get_object(pk)
-        serializer = StoreDetailSerializer(store, context={'request': request})
+        # ?fields= / ?exclude= 로 필요한 field 만 요청하면 평점 집계, owner, sell_list 쿼리도 생략한다.
+        fields = requested_fields(request, StoreDetailSerializer.field_names())
+        store = self.get_object(pk, StoreDetailSerializer.prepare_queryset(Store.objects.all(), fields))
+        serializer = StoreDetailSerializer(store, context={'request': request, 'fields': fields})
         return Response(serializer.data)
 
     # swagger
@@ -340,19 +640,20 @@ class StoresDetail(APIView):
         if store.owner.kakao_id != kakao_id:
             raise PermissionDenied
         
-        store.delete()
+        # 목록에서 바로 숨기고, 리뷰 등 연관 데이터 삭제는 background job으로 처리
+        store.soft_delete()
         return Response(status=HTTP_204_NO_CONTENT)
 
 
     
 
-class StoreReviews(APIView):
+class StoreReviews(ReplicaReadMixin, APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-    def get_object(self, pk):
+    def get_object(self, pk, queryset=None):
         try:
-            return Store.objects.get(pk=pk)
+            return (queryset if queryset is not None else Store.objects).get(pk=pk)
         except Store.DoesNotExist:
             raise NotFound
 
@@ -362,7 +663,7 @@ class StoreReviews(APIView):
         responses={200: ReviewSerializer(many=True)},
         manual_parameters=[
             openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER)
-        ]
+        ] + FIELDS_PARAMETERS
     )
 
     def get(self, request, pk):
@@ -375,8 +676,13 @@ class StoreReviews(APIView):
         start = (page - 1) * page_size
         end = start + page_size
         
-        store = self.get_object(pk)
-        serializer = ReviewSerializer(store.reviews.all()[start:end], many=True)
+        # 리뷰 목록에는 store 의 존재 여부만 필요하다.
+        store = self.get_object(pk, Store.objects.only("pk"))
+        fields = requested_fields(request, ReviewValuesSerializer.field_names())
+        serializer = ReviewValuesSerializer.from_queryset(
+            store.reviews.filter(user__is_active=True)[start:end],
+            context={"fields": fields},
+        )
         return Response(serializer.data)
 
     # swagger
@@ -429,5 +735,35 @@ class StoreDetailReviews(APIView):
         end = start + page_size
         
         store = self.get_object(pk)
-        serializer = ReviewDetailSerializer(store.reviews.all()[start:end], many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        serializer = ReviewDetailSerializer(store.reviews.filter(user__is_active=True)[start:end], many=True)
+        return Response(serializer.data)
+
+
+class StorePhotos(ReplicaReadMixin, APIView):
+    """store 상세 화면의 사진 갤러리 (page 단위)"""
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    # swagger
+    @swagger_auto_schema(
+        operation_description="Retrieve photos of a store in gallery order",
+        responses={200: StorePhotoSerializer(many=True), 404: "Not Found"},
+        manual_parameters=[
+            openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER)
+        ]
+    )
+    def get(self, request, pk):
+        try:
+            page = request.query_params.get("page", 1) # page를 찾을 수 없다면 1 page
+            page = int(page)
+        except ValueError:
+            page = 1
+        page_size = settings.PAGE_SIZE
+        start = (page - 1) * page_size
+        end = start + page_size
+
+        if not Store.objects.filter(pk=pk).exists():
+            raise NotFound
+        photos = StorePhoto.objects.filter(store_id=pk).select_related("photo").order_by("position", "pk")[start:end]
+        serializer = StorePhotoSerializer(photos, many=True)
+        return Response(serializer.data)
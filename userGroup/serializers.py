@@ -3,8 +3,9 @@ from .models import Group, SharedList
 from users.serializer import TinyUserSerializer
 from stores.serializer import GroupStoreList
 from rest_framework import serializers
+from common.serializers import SparseFieldsMixin, wants
 
-class GroupSerializer(ModelSerializer):
+class GroupSerializer(SparseFieldsMixin, ModelSerializer):
     members = TinyUserSerializer(many=True, read_only=True)
     owner = TinyUserSerializer(read_only=True)
     class Meta:
@@ -16,6 +17,14 @@ class GroupSerializer(ModelSerializer):
             "owner"
         )
 
+    @classmethod
+    def prepare_queryset(cls, queryset, fields):
+        if wants(fields, "members"):
+            queryset = queryset.prefetch_related("members")
+        if wants(fields, "owner"):
+            queryset = queryset.select_related("owner")
+        return queryset
+
 class MakeGroupSerializer(ModelSerializer):
     class Meta:
         model = Group
@@ -31,14 +40,25 @@ class MakeGroupSerializer(ModelSerializer):
 
 
 
-class GroupDetailSerializer(ModelSerializer):
+class GroupDetailSerializer(SparseFieldsMixin, ModelSerializer):
 
     members = TinyUserSerializer(many=True, read_only=False)
     store = serializers.SerializerMethodField()
     owner = TinyUserSerializer(read_only=True)
     
+    @classmethod
+    def prepare_queryset(cls, queryset, fields):
+        # members 는 권한 확인(GroupDetail.get_object)에도 쓰므로 항상 읽는다.
+        queryset = queryset.prefetch_related("members")
+        if wants(fields, "owner"):
+            queryset = queryset.select_related("owner")
+        if wants(fields, "store"):
+            queryset = queryset.prefetch_related("group__store")
+        return queryset
+
     def get_store(self, obj):
-        shared_lists = SharedList.objects.filter(group=obj)
+        # obj.group: 이 group의 SharedList 들 (prepare_queryset 에서 store 까지 prefetch)
+        shared_lists = obj.group.all()
         # store_names = [store.name for store_list in shared_lists for store in store_list.store.all()]
         # return store_names
         stores = [GroupStoreList(store_list.store.all(), many=True).data for store_list in shared_lists]
@@ -1,3 +1,41 @@
 from django.test import TestCase
 
-# Create your tests here.
+from common.serializers import requested_fields
+from stores.models import Store
+from users.models import User
+from .models import Group, SharedList
+from .serializers import GroupDetailSerializer, GroupSerializer
+
+
+class TestGroupSparseFields(TestCase):
+
+    def setUp(self):
+        owner = User.objects.create(username="owner")
+        member = User.objects.create(username="member")
+        self.group = Group.objects.create(name="맛집 모임", owner=owner)
+        self.group.members.add(member)
+        shared = SharedList.objects.create(group=self.group)
+        shared.store.add(Store.objects.create(name="store", description="d", kind_menu="food", city="서울", owner=owner))
+
+    def serialize(self, serializer_class, fields, queries):
+        queryset = serializer_class.prepare_queryset(Group.objects.all(), fields)
+        with self.assertNumQueries(queries):
+            group = queryset.get(pk=self.group.pk)
+            return serializer_class(group, context={"fields": fields}).data
+
+    def test_full_output_uses_prefetches(self):
+        # group + owner (join), members, shared list, store
+        data = self.serialize(GroupDetailSerializer, None, 4)
+        self.assertEqual(data["owner"]["username"], "owner")
+        self.assertEqual([member["username"] for member in data["members"]], ["member"])
+        self.assertEqual(data["store"][0][0]["name"], "store")
+
+    def test_trimmed_output_skips_queries(self):
+        fields = frozenset({"pk", "name"})
+        self.assertEqual(self.serialize(GroupSerializer, fields, 1), {"pk": self.group.pk, "name": "맛집 모임"})
+        data = self.serialize(GroupDetailSerializer, frozenset({"name", "members"}), 2)
+        self.assertEqual(list(data), ["name", "members"])
+
+    def test_requested_fields(self):
+        request = type("Request", (), {"query_params": {"exclude": "members, owner"}})()
+        self.assertEqual(requested_fields(request, GroupSerializer.field_names()), {"pk", "name"})
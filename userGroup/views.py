@@ -12,6 +12,8 @@ from .models import Group, SharedList
 from stores.models import Store
 from users.models import User
 from .serializers import GroupSerializer, MakeGroupSerializer, GroupDetailSerializer, GroupShowListSerializer
+from common.serializers import requested_fields
+from config.schema import FIELDS_PARAMETERS
 
 # swagger
 from drf_yasg.utils import swagger_auto_schema
@@ -28,7 +30,7 @@ class GroupList(APIView):
         manual_parameters=[
             openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER),
             openapi.Parameter('keyword', openapi.IN_QUERY, description="Keyword to search groups", type=openapi.TYPE_STRING)
-        ]
+        ] + FIELDS_PARAMETERS
     )
 
     def get(self, request):
@@ -73,9 +75,10 @@ class GroupList(APIView):
             start = (page - 1) * page_size
             end = start + page_size
 
-        paginated_groups = user_groups[start:end]
+        fields = requested_fields(request, GroupSerializer.field_names())
+        paginated_groups = GroupSerializer.prepare_queryset(user_groups, fields)[start:end]
 
-        serializer = GroupSerializer(paginated_groups, many=True, context={"request": request})
+        serializer = GroupSerializer(paginated_groups, many=True, context={"request": request, "fields": fields})
         return Response(serializer.data)
 
     # swagger
@@ -98,9 +101,9 @@ class GroupList(APIView):
 class GroupDetail(APIView):
     permission_classes = [IsAuthenticated]
     
-    def get_object(self, user, pk):
+    def get_object(self, user, pk, queryset=None):
         try:
-            group = Group.objects.get(pk=pk)
+            group = (queryset if queryset is not None else Group.objects).get(pk=pk)
             if group.owner != user and user not in group.members.all():
                 raise PermissionDenied("You do not have permission to access this group.")
             return group
@@ -110,15 +113,17 @@ class GroupDetail(APIView):
     # swagger
     @swagger_auto_schema(
         operation_description="Retrieve a group by its ID",
-        responses={200: GroupDetailSerializer, 404: "Not Found"}
+        responses={200: GroupDetailSerializer, 404: "Not Found"},
+        manual_parameters=FIELDS_PARAMETERS,
     )
 
     def get(self, request, pk):
         user = request.user
         if isinstance(user, SimpleLazyObject):
             user = User.objects.get(pk=user.pk)
-        group = self.get_object(user, pk)
-        serializer = GroupDetailSerializer(group, context={'request': request})
+        fields = requested_fields(request, GroupDetailSerializer.field_names())
+        group = self.get_object(user, pk, GroupDetailSerializer.prepare_queryset(Group.objects.all(), fields))
+        serializer = GroupDetailSerializer(group, context={'request': request, 'fields': fields})
         return Response(serializer.data)
     
     # swagger
@@ -0,0 +1,138 @@
+"""
+Kakao 로그인/회원가입 async view
+
+Kakao OAuth 응답을 기다리는 동안 worker를 점유하지 않도록 별도 ASGI 서비스(config/asgi.py)가
+이 두 view만 제공한다. (config/urls_async.py) Kakao 호출은 users.kakao.AsyncKakaoClient, 유저 조회는 Django async ORM을 사용한다.
+나머지 API와 같은 path의 sync view(users.views.KakaoLogin / KakaoSignup)는 기존 WSGI 서비스가 그대로 처리한다.
+
+첫 로그인 때 Kakao profile은 session 대신 서명된 signup_token(django.core.signing)으로 돌려주고,
+회원가입 요청에서 그 token을 검증한다. session table 쓰기/읽기 없이 어느 서버로 와도 가입할 수 있다.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.contrib.auth import alogin
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+
+from . import kakao
+from .models import User
+# 로그인 결과(kakao_jwt, 예약 목록, signup_token)는 sync view와 같은 helper로 만든다.
+from .views import ACCOUNT_DELETING_ERROR, ensure_user_has_booking_list, kakao_jwt, make_signup_token, read_signup_token
+
+
+def _request_data(request):
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError:
+            return {}
+    return request.POST
+
+
+@csrf_exempt
+@require_POST
+async def kakao_login(request):
+    try:
+        code = _request_data(request).get("code")
+
+        if not code:
+            return JsonResponse(
+                {"error": "Authorization code는 필수입니다."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        client = kakao.get_async_client()
+        try:
+            token_data = await client.exchange_code(code)
+            access_token = token_data.get("access_token")
+            refresh_token = token_data.get("refresh_token")
+
+            if not access_token or not refresh_token:
+                return JsonResponse(
+                    {"error": "Access token 또는 Refresh token을 가져올 수 없습니다."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            user_data = await client.get_user(access_token)
+        except kakao.KakaoUnavailable as e:
+            return JsonResponse(e.data, status=status.HTTP_503_SERVICE_UNAVAILABLE, safe=False)
+        except kakao.KakaoError as e:
+            return JsonResponse(e.data, status=status.HTTP_400_BAD_REQUEST, safe=False)
+
+        kakao_account = user_data.get("kakao_account")
+        profile = kakao_account.get("profile")
+        kakao_id = user_data.get("id")
+
+        try:
+            user = await User.objects.aget(kakao_id=kakao_id)
+        except User.DoesNotExist:
+            return JsonResponse({'is_member': False, 'signup_token': make_signup_token(profile, kakao_id)})
+
+        if not user.is_active:
+            return JsonResponse({"error": ACCOUNT_DELETING_ERROR}, status=status.HTTP_403_FORBIDDEN)
+
+        await alogin(request, user)
+        await sync_to_async(ensure_user_has_booking_list)(user)
+        return JsonResponse({'is_member': True, 'kakao_jwt': kakao_jwt(kakao_id)})
+
+    except Exception:
+        return JsonResponse({}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@csrf_exempt
+@require_POST
+async def kakao_signup(request):
+    try:
+        data = _request_data(request)
+        email = data.get("email")
+        if not email:
+            return JsonResponse(
+                {"error": "이메일은 필수입니다."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            profile, kakao_id = read_signup_token(data.get("signup_token") or "")
+        except signing.SignatureExpired:
+            return JsonResponse(
+                {"error": "signup_token이 만료되었습니다. 다시 로그인해 주세요."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except signing.BadSignature:
+            return JsonResponse(
+                {"error": "유효하지 않은 signup_token 입니다."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not profile or not kakao_id:
+            return JsonResponse(
+                {"error": "signup_token에서 필요한 데이터를 찾을 수 없습니다."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user, created = await User.objects.aget_or_create(
+            kakao_id=kakao_id,
+            defaults={
+                'username': profile.get("nickname"),
+                'name': profile.get("nickname"),
+                'avatar': profile.get("profile_image_url"),
+                'kakao_id': kakao_id,
+                'email': email
+            }
+        )
+        if not user.is_active:
+            return JsonResponse({"error": ACCOUNT_DELETING_ERROR}, status=status.HTTP_403_FORBIDDEN)
+
+        user.set_unusable_password()
+        await user.asave()
+        await alogin(request, user)
+        await sync_to_async(ensure_user_has_booking_list)(user)
+
+        return JsonResponse({'signup': True, 'kakao_jwt': kakao_jwt(kakao_id)})
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,263 @@
+"""
+Kakao OAuth client
+
+로그인마다 새 TLS 연결을 맺지 않도록 keep-alive session(connection pool)을 재사용하고,
+Kakao 응답이 느리거나 장애가 나도 worker가 묶이지 않도록 timeout, 재시도, circuit breaker를 둔다.
+주소는 settings.KAKAO_AUTH_URL / KAKAO_API_URL 로 바꿀 수 있어서
+`python manage.py kakao_stub` 로컬 서버를 붙여 오프라인으로 테스트/벤치마크 할 수 있다.
+
+requests/httpx는 로그인 요청에서만 필요하므로 client를 만들 때 import 한다. (worker 부팅 시간 단축)
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+
+from django.conf import settings
+
+
+class KakaoError(Exception):
+    """Kakao가 에러를 응답했거나(status, data) 연결에 실패한 경우"""
+
+    def __init__(self, message, status=None, data=None):
+        super().__init__(message)
+        self.status = status
+        self.data = data if data is not None else {"error": message}
+
+
+class KakaoUnavailable(KakaoError):
+    """timeout, 연결 실패, 5xx, circuit open 처럼 Kakao 쪽 장애로 보는 경우"""
+
+
+class CircuitBreaker:
+    """연속 실패가 failure_threshold 번 쌓이면 reset_timeout 동안 요청을 바로 실패시킨다."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        # half-open 상태에서는 요청을 흘려보내서 회복 여부를 확인한다.
+        return self.state != "open"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+class BaseKakaoClient:
+    """sync/async client가 공유하는 설정, 요청 형식, 응답 처리"""
+
+    def __init__(
+        self,
+        auth_url=None,
+        api_url=None,
+        client_id=None,
+        redirect_uri=None,
+        connect_timeout=None,
+        read_timeout=None,
+        max_retries=None,
+        pool_size=None,
+        breaker=None,
+    ):
+        self.auth_url = (auth_url or settings.KAKAO_AUTH_URL).rstrip("/")
+        self.api_url = (api_url or settings.KAKAO_API_URL).rstrip("/")
+        self.client_id = client_id or settings.KAKAO_CLIENT_ID
+        self.redirect_uri = redirect_uri or settings.KAKAO_REDIRECT_URI
+        self.connect_timeout = connect_timeout or settings.KAKAO_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or settings.KAKAO_READ_TIMEOUT
+        self.max_retries = settings.KAKAO_MAX_RETRIES if max_retries is None else max_retries
+        self.pool_size = pool_size or settings.KAKAO_POOL_SIZE
+        self.breaker = breaker or CircuitBreaker(
+            settings.KAKAO_BREAKER_FAILURES,
+            settings.KAKAO_BREAKER_RESET_SECONDS,
+        )
+
+    def _token_request(self, code):
+        return "POST", f"{self.auth_url}/oauth/token", {
+            "headers": {"Content-Type": "application/x-www-form-urlencoded"},
+            "data": {
+                "grant_type": "authorization_code",
+                "client_id": self.client_id,
+                "redirect_uri": self.redirect_uri,
+                "code": code,
+            },
+        }
+
+    def _user_request(self, access_token):
+        return "GET", f"{self.api_url}/v2/user/me", {
+            "headers": {
+                "Authorization": f"Bearer {access_token}",
+                "Content-type": "application/x-www-form-urlencoded;charset=utf-8",
+            },
+        }
+
+    def _check_circuit(self):
+        if not self.breaker.allow():
+            raise KakaoUnavailable("Kakao 요청이 일시적으로 차단되었습니다. (circuit open)", status=503)
+
+    def _connection_failed(self, error):
+        self.breaker.record_failure()
+        return KakaoUnavailable(f"Kakao 연결 실패: {error.__class__.__name__}", status=503)
+
+    def _handle(self, response):
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            raise KakaoUnavailable("Kakao 서버 오류", status=response.status_code, data=self._json(response))
+        self.breaker.record_success()
+        if response.status_code != 200:
+            raise KakaoError("Kakao 요청 실패", status=response.status_code, data=self._json(response))
+        return self._json(response)
+
+    @staticmethod
+    def _json(response):
+        try:
+            return response.json()
+        except ValueError:
+            return {"error": response.text[:200]}
+
+
+class KakaoClient(BaseKakaoClient):
+
+    def __init__(self, **kwargs):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        super().__init__(**kwargs)
+        self.request_errors = requests.RequestException
+        # 인가 code는 한 번만 쓸 수 있으므로 POST는 연결 실패(요청 전송 전)만 재시도한다.
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=0.1,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _request(self, method, url, options):
+        self._check_circuit()
+        try:
+            response = self.session.request(
+                method, url, timeout=(self.connect_timeout, self.read_timeout), **options
+            )
+        except self.request_errors as e:
+            raise self._connection_failed(e)
+        return self._handle(response)
+
+    def exchange_code(self, code):
+        """인가 code로 access/refresh token을 발급받는다."""
+        return self._request(*self._token_request(code))
+
+    def get_user(self, access_token):
+        return self._request(*self._user_request(access_token))
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncKakaoClient(BaseKakaoClient):
+    """ASGI의 async 로그인 view용. 요청을 기다리는 동안 worker를 점유하지 않는다."""
+
+    def __init__(self, **kwargs):
+        import httpx
+
+        super().__init__(**kwargs)
+        self.request_errors = httpx.HTTPError
+        # httpx transport의 retries는 연결 실패만 재시도한다 (POST에도 안전).
+        self.http = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=self.max_retries),
+        )
+
+    async def _request(self, method, url, options):
+        self._check_circuit()
+        try:
+            response = await self.http.request(method, url, **options)
+        except self.request_errors as e:
+            raise self._connection_failed(e)
+        return self._handle(response)
+
+    async def exchange_code(self, code):
+        return await self._request(*self._token_request(code))
+
+    async def get_user(self, access_token):
+        return await self._request(*self._user_request(access_token))
+
+    async def aclose(self):
+        await self.http.aclose()
+
+
+_client = None
+_breaker = None
+_client_lock = threading.Lock()
+
+
+def get_breaker():
+    """sync/async client가 process 안에서 공유하는 circuit breaker"""
+    global _breaker
+    if _breaker is None:
+        with _client_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker(settings.KAKAO_BREAKER_FAILURES, settings.KAKAO_BREAKER_RESET_SECONDS)
+    return _breaker
+
+
+def get_client():
+    """process 당 하나의 client(connection pool, circuit breaker)를 공유한다."""
+    global _client
+    if _client is None:
+        breaker = get_breaker()
+        with _client_lock:
+            if _client is None:
+                _client = KakaoClient(breaker=breaker)
+    return _client
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """event loop 당 하나의 AsyncKakaoClient를 공유한다 (httpx client는 loop에 묶인다)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncKakaoClient(
+            pool_size=settings.KAKAO_ASYNC_POOL_SIZE,
+            breaker=get_breaker(),
+        )
+    return client
@@ -0,0 +1,99 @@
+"""
+Kakao OAuth 흉내를 내는 로컬 서버 (개발/벤치마크용)
+
+    python manage.py kakao_stub --port 8765 --latency 0.05 --fail-rate 0.1
+    KAKAO_AUTH_URL=http://127.0.0.1:8765 KAKAO_API_URL=http://127.0.0.1:8765 python manage.py runserver
+
+- POST /oauth/token : code "invalid" 는 400(invalid_grant), 그 외에는 token 발급
+- GET  /v2/user/me  : token에서 만든 고정 kakao id와 profile 반환
+"""
+
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class KakaoStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive 지원 (connection pool 효과 측정용)
+    # header/body를 따로 보내면 keep-alive 연결에서 Nagle + delayed ACK로 ~40ms씩 밀린다.
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _simulate(self):
+        """설정된 지연을 주고, fail_rate 확률로 503을 응답했으면 True"""
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        server.requests += 1
+        if server.fail_rate and random.random() < server.fail_rate:
+            self._send(503, {"error": "stub_unavailable"})
+            return True
+        return False
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode())
+        if self.path != "/oauth/token":
+            return self._send(404, {"error": "not_found"})
+        if self._simulate():
+            return
+        code = form.get("code", [""])[0]
+        if not code or code == "invalid":
+            return self._send(400, {"error": "invalid_grant", "error_code": "KOE320"})
+        self._send(200, {
+            "token_type": "bearer",
+            "access_token": f"stub-access-{code}",
+            "refresh_token": f"stub-refresh-{code}",
+            "expires_in": 21599,
+        })
+
+    def do_GET(self):
+        if self.path != "/v2/user/me":
+            return self._send(404, {"error": "not_found"})
+        if self._simulate():
+            return
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not token.startswith("stub-access-"):
+            return self._send(401, {"msg": "this access token does not exist", "code": -401})
+        code = token.removeprefix("stub-access-")
+        self._send(200, {
+            "id": zlib.crc32(code.encode()),
+            "kakao_account": {
+                "profile": {
+                    "nickname": f"stub-{code}",
+                    "profile_image_url": "http://k.kakaocdn.net/dn/stub/img_640x640.jpg",
+                },
+            },
+        })
+
+
+def make_server(host="127.0.0.1", port=0, latency=0.0, fail_rate=0.0):
+    server = ThreadingHTTPServer((host, port), KakaoStubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.fail_rate = fail_rate
+    server.requests = 0
+    return server
+
+
+def start_in_thread(**kwargs):
+    """테스트/벤치마크에서 쓰기 위해 background thread로 띄우고 (server, base_url)를 반환한다."""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
@@ -0,0 +1,70 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+from users.kakao import CircuitBreaker, KakaoClient, KakaoError
+from users.kakao_stub import start_in_thread
+
+
+class Command(BaseCommand):
+    help = "로컬 Kakao stub 서버로 로그인(token 발급 + 유저 조회) 지연과 실패 처리를 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--latency", type=float, default=0.0)
+        parser.add_argument("--fail-rate", type=float, default=0.0)
+
+    def handle(self, *args, **options):
+        server, base_url = start_in_thread(latency=options["latency"], fail_rate=options["fail_rate"])
+        try:
+            self.run("bare requests (기존)", lambda code: self.bare_login(base_url, code), options)
+            client = KakaoClient(
+                auth_url=base_url,
+                api_url=base_url,
+                pool_size=options["concurrency"],
+                breaker=CircuitBreaker(failure_threshold=10 ** 9),
+            )
+            self.run("KakaoClient (pool)", lambda code: self.client_login(client, code), options)
+        finally:
+            server.shutdown()
+
+    def bare_login(self, base_url, code):
+        token = requests.post(f"{base_url}/oauth/token", data={"code": code})
+        if token.status_code != 200:
+            return False
+        user = requests.get(
+            f"{base_url}/v2/user/me",
+            headers={"Authorization": f"Bearer {token.json()['access_token']}"},
+        )
+        return user.status_code == 200
+
+    def client_login(self, client, code):
+        try:
+            token = client.exchange_code(code)
+            client.get_user(token["access_token"])
+            return True
+        except KakaoError:
+            return False
+
+    def run(self, label, login, options):
+        def timed(i):
+            start = time.perf_counter()
+            ok = login(f"code{i}")
+            return (time.perf_counter() - start) * 1000, ok
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as pool:
+            results = list(pool.map(timed, range(options["logins"])))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(ms for ms, _ in results)
+        failed = sum(1 for _, ok in results if not ok)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        self.stdout.write(
+            f"{label:<22} {len(results) / elapsed:8.1f} logins/s  "
+            f"p50={statistics.median(latencies):.2f}ms p95={p95:.2f}ms failed={failed}"
+        )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from users.kakao_stub import make_server
+
+
+class Command(BaseCommand):
+    help = "Kakao OAuth를 흉내내는 로컬 stub 서버를 실행합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency", type=float, default=0.0, help="응답마다 추가할 지연(초)")
+        parser.add_argument("--fail-rate", type=float, default=0.0, help="503을 응답할 확률 (0~1)")
+
+    def handle(self, *args, **options):
+        server = make_server(
+            options["host"],
+            options["port"],
+            latency=options["latency"],
+            fail_rate=options["fail_rate"],
+        )
+        host, port = server.server_address
+        self.stdout.write(f"Kakao stub: http://{host}:{port} (KAKAO_AUTH_URL / KAKAO_API_URL 에 설정)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
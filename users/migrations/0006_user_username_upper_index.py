@@ -0,0 +1,26 @@
+from django.db import migrations
+
+# review admin 의 search_fields "=user__username" 은 iexact, 즉 Postgres 에서 UPPER("username"::text) = UPPER('x') 이다.
+# username 의 unique index 로는 처리할 수 없으므로 같은 식에 index를 만든다. (SQLite 에서는 만들지 않는다)
+INDEX = "users_user_username_upper_idx"
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {INDEX} ON users_user (UPPER("username"::text))')
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_alter_user_kakao_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.utils import timezone
+from common.jobs import enqueue
 
 
 class UserManager(BaseUserManager):
@@ -37,4 +39,17 @@ class User(AbstractUser):
     objects = UserManager()
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+    def soft_delete(self):
+        """계정을 비활성화하고 가게를 목록에서 숨긴 뒤, 실제 삭제는 users.purge_user job에 맡긴다."""
+        self.is_active = False
+        self.save(update_fields=["is_active"])
+        # queryset.update() 는 stores.signals 를 거치지 않아 지도 clustering(StoreCell), facet 수(StoreFacetCount)와
+        # facet cache 에서 빠지지 않는다. purge 때는 이미 is_deleted 라 빠지지 않으므로 여기서 한 개씩 저장한다.
+        deleted_at = timezone.now()
+        for store in self.rooms.all():
+            store.is_deleted = True
+            store.deleted_at = deleted_at
+            store.save(update_fields=["is_deleted", "deleted_at", "updated_at"])
+        return enqueue("users.purge_user", {"user_pk": self.pk})
\ No newline at end of file
@@ -1,6 +1,7 @@
 from rest_framework.serializers import ModelSerializer
 from rest_framework import serializers
 from .models import User 
+from common.serializers import DateTimeColumn
 
 class TinyUserSerializer(ModelSerializer):
     class Meta:
@@ -11,6 +12,14 @@ class TinyUserSerializer(ModelSerializer):
             "username",
             "date_joined"
         )
+
+# ValuesSerializer 에서 Nested("user__", TinyUserValuesFields) 로 쓰는 TinyUserSerializer
+TinyUserValuesFields = {
+    "pk": "pk",
+    "avatar": "avatar",
+    "username": "username",
+    "date_joined": DateTimeColumn("date_joined"),
+}
     
 class PrivateUserSerializer(ModelSerializer):
     class Meta:
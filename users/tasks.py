@@ -0,0 +1,31 @@
+from common.jobs import task, delete_in_batches
+from reviews.models import Reviews
+from bookings.models import Booking
+from stores.models import Store
+from stores.tasks import purge_store
+from userGroup.models import Group, SharedList
+from .models import User
+
+
+@task("users.purge_user")
+def purge_user(job, user_pk):
+    """soft delete 된 user의 가게, 리뷰, 예약/그룹 row를 batch 단위로 지운 뒤 user를 삭제한다."""
+    store_pks = list(Store.all_objects.filter(owner_id=user_pk).values_list("pk", flat=True))
+    for count, store_pk in enumerate(store_pks, 1):
+        # reviews, bookings ... 는 모든 store 와 user 자신의 row 를 합친 수로 남는다. (delete_in_batches)
+        purge_store(job, store_pk)
+        job.update_progress(stores=count)
+    delete_in_batches(Reviews.objects.filter(user_id=user_pk), job=job, label="reviews")
+    delete_in_batches(
+        Booking.store.through.objects.filter(booking__user_id=user_pk), job=job, label="bookings"
+    )
+    delete_in_batches(
+        SharedList.store.through.objects.filter(sharedlist__group__owner_id=user_pk),
+        job=job,
+        label="shared_lists",
+    )
+    delete_in_batches(
+        Group.members.through.objects.filter(user_id=user_pk), job=job, label="group_members"
+    )
+    User.objects.filter(pk=user_pk, is_active=False).delete()
+    job.update_progress(user=True)
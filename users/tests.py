@@ -1,3 +1,296 @@
-from django.test import TestCase
+import asyncio
+import time
+import zlib
 
-# Create your tests here.
+import jwt
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.utils.module_loading import import_string
+from rest_framework.test import APITestCase
+
+from bookings.models import Booking
+from common.jobs import run_pending
+from reviews.models import Reviews
+from stores import clusters
+from stores.models import Store, StoreCell, StoreFacetCount
+from .kakao import CircuitBreaker, KakaoClient, KakaoError, KakaoUnavailable
+from .views import make_signup_token
+from .kakao_stub import start_in_thread
+from .models import User
+
+
+class TestUserDelete(APITestCase):
+
+    def test_delete_me_hides_user_then_job_purges(self):
+        user = User.objects.create(username="leaving")
+        other = User.objects.create(username="staying")
+        store = Store.objects.create(name="s", description="d", kind_menu="food", city="서울", owner=user)
+        Reviews.objects.create(user=other, store=store, description="r")
+        Reviews.objects.create(user=user, store=None, description="r")
+
+        self.client.force_login(user)
+        response = self.client.delete("/api/v1/users/me")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get("/api/v1/users/leaving").status_code, 404)
+        self.assertFalse(Store.objects.filter(pk=store.pk).exists())
+
+        run_pending()
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        self.assertFalse(Store.all_objects.filter(pk=store.pk).exists())
+        self.assertEqual(Reviews.objects.count(), 0)
+
+    @override_settings(PURGE_BATCH_SIZE=2)
+    def test_purge_progress_adds_up_every_store(self):
+        user = User.objects.create(username="leaving")
+        other = User.objects.create(username="staying")
+        for name in ("a", "b"):
+            store = Store.objects.create(name=name, description="d", kind_menu="food", city="서울", owner=user)
+            for i in range(3):
+                Reviews.objects.create(user=other, store=store, description=str(i))
+        Reviews.objects.create(user=user, store=None, description="mine")
+
+        job = user.soft_delete()
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.progress["reviews"], job.progress["stores"]), (7, 2))
+
+    def test_delete_me_removes_stores_from_cluster_cells(self):
+        user = User.objects.create(username="leaving")
+        other = User.objects.create(username="staying")
+        Store.objects.create(name="a", description="d", kind_menu="cafe", city="서울", owner=user, latitude=37.5665, longitude=126.978)
+        kept = Store.objects.create(name="b", description="d", kind_menu="cafe", city="서울", owner=other, latitude=37.5665, longitude=126.978)
+
+        user.soft_delete()
+        cell = StoreCell.objects.get(zoom=14)
+        self.assertEqual((cell.count, cell.top_store_id), (1, kept.pk))
+
+        run_pending()
+        incremental = sorted(StoreCell.objects.values_list("zoom", "x", "y", "count", "top_store"))
+        clusters.rebuild()
+        self.assertEqual(incremental, sorted(StoreCell.objects.values_list("zoom", "x", "y", "count", "top_store")))
+
+    def test_delete_me_removes_stores_from_facet_counts(self):
+        cache.clear()
+        user = User.objects.create(username="leaving")
+        Store.objects.create(name="a", description="d", kind_menu="cafe", city="서울", owner=user)
+        self.assertEqual(self.client.get("/api/v1/stores/facets").json()["total"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.soft_delete()
+        self.assertFalse(StoreFacetCount.objects.exists())
+        # facet cache version 도 올라가서 cache 된 수를 쓰지 않는다.
+        self.assertEqual(self.client.get("/api/v1/stores/facets").json()["total"], 0)
+
+        run_pending()
+        self.assertFalse(StoreFacetCount.objects.exists())
+
+
+class TestTokenAPIFastPath(APITestCase):
+
+    def test_token_request_skips_session_and_csrf(self):
+        user = User.objects.create(username="token-user")
+        self.client.force_login(User.objects.create(username="session-user"))
+        token = jwt.encode({"pk": user.pk}, settings.SECRET_KEY, algorithm="HS256")
+
+        # session row를 읽지 않고 token 유저 조회 한 번만 한다.
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/v1/users/me", HTTP_JWT=token)
+        self.assertEqual(response.data["username"], "token-user")
+        self.assertNotIn("sessionid", response.cookies)
+
+        # token이 없으면 기존처럼 session으로 인증한다.
+        self.assertEqual(self.client.get("/api/v1/users/me").data["username"], "session-user")
+
+    def test_token_of_deleted_user_is_rejected(self):
+        user = User.objects.create(username="leaving")
+        token = jwt.encode({"pk": user.pk}, settings.SECRET_KEY, algorithm="HS256")
+        user.soft_delete()
+
+        response = self.client.get("/api/v1/users/me", HTTP_JWT=token)
+        self.assertIn(response.status_code, (401, 403))
+
+
+class TestKakaoClient(SimpleTestCase):
+
+    def setUp(self):
+        self.server, self.base_url = start_in_thread()
+        self.addCleanup(self.server.shutdown)
+
+    def kakao_client(self, **kwargs):
+        return KakaoClient(auth_url=self.base_url, api_url=self.base_url, **kwargs)
+
+    def test_login_flow_against_stub(self):
+        client = self.kakao_client()
+        token = client.exchange_code("abc")
+        user = client.get_user(token["access_token"])
+        self.assertEqual(user["kakao_account"]["profile"]["nickname"], "stub-abc")
+
+        with self.assertRaises(KakaoError) as e:
+            client.exchange_code("invalid")
+        self.assertEqual(e.exception.status, 400)
+        self.assertNotIsInstance(e.exception, KakaoUnavailable)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        self.server.fail_rate = 1.0
+        client = self.kakao_client(max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        for _ in range(2):
+            with self.assertRaises(KakaoUnavailable):
+                client.exchange_code("abc")
+        requests_before = self.server.requests
+        with self.assertRaises(KakaoUnavailable):
+            client.exchange_code("abc")
+        self.assertEqual(self.server.requests, requests_before)
+        self.assertEqual(client.breaker.state, "open")
+
+
+@override_settings(ROOT_URLCONF="config.urls_async", MIDDLEWARE=settings.ASGI_MIDDLEWARE)
+class TestKakaoLoginView(APITestCase):
+    # ASGI 서비스 (config/urls_async.py)
+
+    def setUp(self):
+        self.server, base_url = start_in_thread()
+        self.addCleanup(self.server.shutdown)
+        settings_override = override_settings(KAKAO_AUTH_URL=base_url, KAKAO_API_URL=base_url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    async def test_login_and_signup(self):
+        response = await self.async_client.post(
+            "/api/v1/users/kakao", {"code": "abc"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()["is_member"])
+        signup_token = response.json()["signup_token"]
+
+        response = await self.async_client.post(
+            "/api/v1/users/kakao-signup",
+            {"email": "stub@example.com", "signup_token": signup_token},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["signup"])
+        user = await User.objects.aget(email="stub@example.com")
+        self.assertEqual(user.username, "stub-abc")
+
+        response = await self.async_client.post(
+            "/api/v1/users/kakao", {"code": "abc"}, content_type="application/json"
+        )
+        self.assertTrue(response.json()["is_member"])
+
+    async def test_deleted_user_cannot_log_in_or_sign_up(self):
+        user = await User.objects.acreate(username="leaving", kakao_id=zlib.crc32(b"abc"))
+        await sync_to_async(user.soft_delete)()
+
+        response = await self.async_client.post(
+            "/api/v1/users/kakao", {"code": "abc"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 403)
+
+        response = await self.async_client.post(
+            "/api/v1/users/kakao-signup",
+            {"email": "stub@example.com", "signup_token": make_signup_token({"nickname": "stub"}, user.kakao_id)},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(await Booking.objects.filter(user=user).aexists())
+
+    def test_middleware_is_async_capable(self):
+        # sync 전용 middleware 가 있으면 요청마다 thread 를 잡고 Kakao 응답을 기다린다.
+        for path in settings.ASGI_MIDDLEWARE:
+            with self.subTest(middleware=path):
+                self.assertTrue(getattr(import_string(path), "async_capable", False))
+
+    async def test_logins_wait_for_kakao_concurrently(self):
+        self.server.latency = 0.2  # 로그인 한 번에 Kakao 호출 두 번 (0.4초)
+        logins = 10
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            self.async_client.post("/api/v1/users/kakao", {"code": f"c{i}"}, content_type="application/json")
+            for i in range(logins)
+        ))
+        elapsed = time.perf_counter() - start
+        self.assertEqual({response.status_code for response in responses}, {200})
+        # 하나씩 처리하면 4초 걸린다.
+        self.assertLess(elapsed, 0.4 * logins / 4)
+
+    async def test_invalid_code(self):
+        response = await self.async_client.post(
+            "/api/v1/users/kakao", {"code": "invalid"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "invalid_grant")
+
+    async def test_signup_rejects_tampered_or_expired_token(self):
+        token = make_signup_token({"nickname": "stub"}, 1)
+        for bad in ("", token[:-2] + "xx"):
+            response = await self.async_client.post(
+                "/api/v1/users/kakao-signup",
+                {"email": "stub@example.com", "signup_token": bad},
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 400)
+
+        with override_settings(KAKAO_SIGNUP_TOKEN_MAX_AGE=-1):
+            response = await self.async_client.post(
+                "/api/v1/users/kakao-signup",
+                {"email": "stub@example.com", "signup_token": token},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(await User.objects.filter(email="stub@example.com").aexists())
+
+
+class TestSyncKakaoLoginView(APITestCase):
+    # WSGI 서비스의 sync view (config/urls.py)
+
+    def setUp(self):
+        self.server, base_url = start_in_thread()
+        self.addCleanup(self.server.shutdown)
+        settings_override = override_settings(KAKAO_AUTH_URL=base_url, KAKAO_API_URL=base_url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_login_and_signup(self):
+        response = self.client.post("/api/v1/users/kakao", {"code": "abc"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()["is_member"])
+        signup_token = response.json()["signup_token"]
+
+        response = self.client.post(
+            "/api/v1/users/kakao-signup", {"email": "stub@example.com", "signup_token": "x"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            "/api/v1/users/kakao-signup", {"email": "stub@example.com", "signup_token": signup_token}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(User.objects.get(email="stub@example.com").username, "stub-abc")
+
+        response = self.client.post("/api/v1/users/kakao", {"code": "abc"}, format="json")
+        self.assertTrue(response.json()["is_member"])
+        self.assertEqual(self.client.post("/api/v1/users/kakao", {"code": "invalid"}, format="json").status_code, 400)
+
+    def test_deleted_user_cannot_log_in_or_sign_up(self):
+        user = User.objects.create(username="leaving", kakao_id=zlib.crc32(b"abc"))
+        user.soft_delete()
+
+        self.assertEqual(self.client.post("/api/v1/users/kakao", {"code": "abc"}, format="json").status_code, 403)
+        response = self.client.post(
+            "/api/v1/users/kakao-signup",
+            {"email": "stub@example.com", "signup_token": make_signup_token({"nickname": "stub"}, user.kakao_id)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Booking.objects.filter(user=user).exists())
+
+    def test_only_kakao_views_are_served_over_asgi(self):
+        from django.urls import resolve
+
+        from . import async_views, views
+
+        self.assertIs(resolve("/api/v1/users/kakao").func.view_class, views.KakaoLogin)
+        with override_settings(ROOT_URLCONF="config.urls_async"):
+            self.assertIs(resolve("/api/v1/users/kakao", urlconf="config.urls_async").func, async_views.kakao_login)
+            self.assertEqual(self.client.get("/api/v1/stores").status_code, 404)
@@ -8,6 +8,7 @@ urlpatterns = [
     # path("users/log-out", LogOut.as_view()),
     # path("users/jwt-login", JWTLogIn.as_view()),
     # path("users/jwt-signup", JWTSignup.as_view()),
+    # 같은 path를 별도 ASGI 서비스가 async view로도 제공한다 (config/urls_async.py)
     path("users/kakao", KakaoLogin.as_view()),
     path("users/kakao-signup", KakaoSignup.as_view()),
     # path("users/token-login", obtain_auth_token),
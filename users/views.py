@@ -10,18 +10,18 @@ from rest_framework.exceptions import ParseError, NotFound
 from rest_framework.status import HTTP_200_OK, HTTP_403_FORBIDDEN
 from rest_framework_simplejwt.tokens import RefreshToken
 
-import requests
 from .serializer import UserSerializer
 from .models import User
 from reviews.models import Reviews
-from reviews.serializers import ReviewSerializer
+from reviews.serializers import ReviewSerializer, ReviewValuesSerializer
 from stores.models import Store
-from stores.serializer import StoreDetailSerializer, StoreListSerializer
+from stores.serializer import StoreDetailSerializer, StoreListSerializer, StoreListValuesSerializer
 from .serializer import PrivateUserSerializer, TinyUserSerializer
 from bookings.models import Booking
-import os
-import environ
-from pathlib import Path
+from django.core import signing
+from . import kakao
+from common.serializers import requested_fields
+from config.schema import FIELDS_PARAMETERS
 import logging
 
 # swagger
@@ -73,6 +73,19 @@ class Me(APIView):
         else:
             return Response(serializer.errors)
 
+    # swagger
+    @swagger_auto_schema(
+        operation_description="Delete the authenticated user's account",
+        responses={204: "No Content", 403: "Forbidden"}
+    )
+
+    def delete(self, request):
+        # 계정은 바로 비활성화하고, 가게/리뷰 등 연관 데이터 삭제는 background job으로 처리
+        request.user.soft_delete()
+        if hasattr(request, "session"):  # token 인증 요청은 session이 없다 (config.middleware)
+            logout(request)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class Users(APIView):
 
@@ -109,7 +122,7 @@ class PublicUser(APIView):
 
     def get(self, request, username):
         try:
-            user = User.objects.get(username=username)
+            user = User.objects.get(username=username, is_active=True)
         except User.DoesNotExist:
             raise NotFound
         serializer = TinyUserSerializer(user)
@@ -125,7 +138,7 @@ class UserReviews(APIView):
         responses={200: ReviewSerializer(many=True)},
         manual_parameters=[
             openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER)
-        ]
+        ] + FIELDS_PARAMETERS
     )
 
     def get(self, request, username):
@@ -140,12 +153,15 @@ class UserReviews(APIView):
         start = (page - 1) * page_size
         end = start + page_size
 
-        all_reviews = Reviews.objects.filter(user__username=username)
+        all_reviews = Reviews.objects.filter(
+            user__username=username,
+            user__is_active=True,
+        ).exclude(store__is_deleted=True)
 
-        serializer = ReviewSerializer(
+        fields = requested_fields(request, ReviewValuesSerializer.field_names())
+        serializer = ReviewValuesSerializer.from_queryset(
             all_reviews.all()[start:end],
-            many=True,
-            context={"request": request},
+            context={"request": request, "fields": fields},
         )
         return Response(serializer.data)
 # # __ 은 관계를 나타내는 Django ORN,
@@ -227,7 +243,7 @@ class UserStore(APIView):
         responses={200: StoreListSerializer(many=True)},
         manual_parameters=[
             openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER)
-        ]
+        ] + FIELDS_PARAMETERS
     )
 
     def get(self, request, username):
@@ -243,10 +259,10 @@ class UserStore(APIView):
         end = start + page_size
 
         all_stores = Store.objects.filter(owner__username=username)
-        serializer = StoreListSerializer(
-            all_stores.all()[start:end],
-            many=True,
-            context={"request": request},
+        fields = requested_fields(request, StoreListValuesSerializer.field_names())
+        serializer = StoreListValuesSerializer.from_queryset(
+            StoreListValuesSerializer.prepare_queryset(all_stores, fields)[start:end],
+            context={"request": request, "fields": fields},
         )
         return Response(serializer.data)
 # # context={"request": request}
@@ -304,7 +320,7 @@ class UserStoreDetail(APIView):
 
     def delete(self, request, pk, username):
         review = self.get_list(pk, request.user)
-        review.delete()
+        review.soft_delete()
         return Response(status=HTTP_200_OK)
 
 
@@ -387,22 +403,49 @@ class LogOut(APIView):
         return Response({"ok": "bye"})
 
 
-env = environ.Env()
-BASE_DIR = Path(__file__).resolve().parent.parent
-environ.Env.read_env(os.path.join(BASE_DIR, ".env"))
+# 탈퇴(soft delete) 후 users.purge_user job 이 지우기 전의 계정으로 로그인/가입하면
+ACCOUNT_DELETING_ERROR = "탈퇴 처리 중인 계정입니다."
+
+SIGNUP_TOKEN_SALT = "users.kakao-signup"
+
+
+def make_signup_token(profile, kakao_id):
+    # 회원가입에 필요한 Kakao profile을 서명해서 client에 맡긴다.
+    return signing.dumps({'kakao_id': kakao_id, 'profile': profile}, salt=SIGNUP_TOKEN_SALT, compress=True)
+
+
+def read_signup_token(token):
+    """(profile, kakao_id) 반환. 위조/만료된 token이면 signing.BadSignature"""
+    data = signing.loads(token, salt=SIGNUP_TOKEN_SALT, max_age=settings.KAKAO_SIGNUP_TOKEN_MAX_AGE)
+    return data.get('profile'), data.get('kakao_id')
+
 
+# Kakao 로그인/회원가입 helper는 async view(users/async_views.py)도 그대로 가져다 쓴다.
+def ensure_user_has_booking_list(user):
+    # 유저에게 예약 목록이 있는지 확인하고, 없으면 생성
+    if not Booking.objects.filter(user=user).exists():
+        Booking.objects.create(user=user)
+
+
+def kakao_jwt(kakao_id):
+    payload = {'kakao_id': kakao_id}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
+
+
+# Kakao 로그인/회원가입 (sync, 기본 WSGI 서비스)
+# 같은 동작의 async view(users/async_views.py)는 별도 ASGI 서비스(config/urls_async.py)에서만 쓴다.
 class KakaoLogin(APIView):
 
     # swagger
     @swagger_auto_schema(
-        operation_description="Log in using Kakao OAuth",
+        operation_description="Log in using Kakao OAuth. Non-members get a signup_token for kakao-signup.",
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
             properties={
                 'code': openapi.Schema(type=openapi.TYPE_STRING, description='Kakao authorization code')
             }
         ),
-        responses={200: "OK", 400: "Bad Request"}
+        responses={200: "OK", 400: "Bad Request", 503: "Kakao Unavailable"}
     )
 
     def post(self, request):
@@ -411,82 +454,47 @@ class KakaoLogin(APIView):
 
             if not code:
                 return Response(
-                    {"error": "Authorization code는 필수입니다."}, 
+                    {"error": "Authorization code는 필수입니다."},
                     status=status.HTTP_400_BAD_REQUEST
                 )
- 
-            access_token_response = requests.post(
-                    "https://kauth.kakao.com/oauth/token",
-                    headers={"Content-Type": "application/x-www-form-urlencoded"},
-                    data={
-                        "grant_type": "authorization_code",
-                        "client_id": "583f1ebb47209c90313ca9808363f605",
-                        # "redirect_uri": "http://127.0.0.1:3000/social/kakao",
-                        "redirect_uri": "https://delight-spot-web.vercel.app/social/kakao",
-                        "code": code,
-                    },
-                )
 
-            if access_token_response.status_code != 200:
-                return Response(
-                    access_token_response.json(), 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            access_token = access_token_response.json().get("access_token")
-            refresh_token = access_token_response.json().get("refresh_token")
-
-            if not access_token or not refresh_token:
-                return Response(
-                    {"error": "Access token 또는 Refresh token을 가져올 수 없습니다."}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            user_data_response = requests.get(
-                "https://kapi.kakao.com/v2/user/me",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Content-type": "application/x-www-form-urlencoded;charset=utf-8",
-                }
-            )
-
-            if user_data_response.status_code != 200:
-                return Response(
-                    user_data_response.json(), 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            user_data = user_data_response.json()
+            client = kakao.get_client()
+            try:
+                token_data = client.exchange_code(code)
+                access_token = token_data.get("access_token")
+                refresh_token = token_data.get("refresh_token")
+
+                if not access_token or not refresh_token:
+                    return Response(
+                        {"error": "Access token 또는 Refresh token을 가져올 수 없습니다."},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+                user_data = client.get_user(access_token)
+            except kakao.KakaoUnavailable as e:
+                return Response(e.data, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            except kakao.KakaoError as e:
+                return Response(e.data, status=status.HTTP_400_BAD_REQUEST)
 
             kakao_account = user_data.get("kakao_account")
             profile = kakao_account.get("profile")
             kakao_id = user_data.get("id")
 
-            # 세션에 profile과 kakao_id 저장
-            request.session['kakao_profile'] = profile
-            request.session['kakao_id'] = kakao_id
-
             try:
                 user = User.objects.get(kakao_id=kakao_id)
-                login(request, user)
+            except User.DoesNotExist:
+                return Response({'is_member': False, 'signup_token': make_signup_token(profile, kakao_id)})
 
-                # 유저에게 예약 목록이 있는지 확인하고, 없으면 생성
-                self.ensure_user_has_booking_list(user)
+            if not user.is_active:
+                return Response({"error": ACCOUNT_DELETING_ERROR}, status=status.HTTP_403_FORBIDDEN)
 
-                # JWT 토큰 생성
-                payload = {'kakao_id': kakao_id}
-                jwt_token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
-                return Response(status=status.HTTP_200_OK, data={'is_member': True, 'kakao_jwt': jwt_token})
-            except User.DoesNotExist:
-                return Response(status=status.HTTP_200_OK, data={'is_member': False})
+            login(request, user)
+            ensure_user_has_booking_list(user)
+            return Response({'is_member': True, 'kakao_jwt': kakao_jwt(kakao_id)})
 
-        except Exception as e:
+        except Exception:
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-    def ensure_user_has_booking_list(self, user):
-        if not Booking.objects.filter(user=user).exists():
-            Booking.objects.create(user=user)
-
 
 class KakaoSignup(APIView):
 
@@ -496,7 +504,8 @@ class KakaoSignup(APIView):
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
             properties={
-                'email': openapi.Schema(type=openapi.TYPE_STRING, description='Email')
+                'email': openapi.Schema(type=openapi.TYPE_STRING, description='Email'),
+                'signup_token': openapi.Schema(type=openapi.TYPE_STRING, description='signup_token from users/kakao'),
             }
         ),
         responses={200: "OK", 400: "Bad Request"}
@@ -507,16 +516,26 @@ class KakaoSignup(APIView):
             email = request.data.get("email")
             if not email:
                 return Response(
-                    {"error": "이메일은 필수입니다."}, 
+                    {"error": "이메일은 필수입니다."},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            profile = request.session.get('kakao_profile')
-            kakao_id = request.session.get('kakao_id')
+            try:
+                profile, kakao_id = read_signup_token(request.data.get("signup_token") or "")
+            except signing.SignatureExpired:
+                return Response(
+                    {"error": "signup_token이 만료되었습니다. 다시 로그인해 주세요."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            except signing.BadSignature:
+                return Response(
+                    {"error": "유효하지 않은 signup_token 입니다."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
             if not profile or not kakao_id:
                 return Response(
-                    {"error": "세션에서 필요한 데이터를 찾을 수 없습니다."}, 
+                    {"error": "signup_token에서 필요한 데이터를 찾을 수 없습니다."},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
@@ -530,25 +549,14 @@ class KakaoSignup(APIView):
                     'email': email
                 }
             )
-
-            if not created:
-                user.kakao_id = kakao_id
-                user.refresh_token = request.session.get('refresh_token')
-                user.save()
+            if not user.is_active:
+                return Response({"error": ACCOUNT_DELETING_ERROR}, status=status.HTTP_403_FORBIDDEN)
 
             user.set_unusable_password()
             user.save()
             login(request, user)
+            ensure_user_has_booking_list(user)
 
-            # 유저에게 예약 목록이 있는지 확인하고, 없으면 생성
-            self.ensure_user_has_booking_list(user)
-
-            payload = {'kakao_id': kakao_id}
-            jwt_token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
-            return Response(status=status.HTTP_200_OK, data={'signup': True, 'kakao_jwt': jwt_token})
+            return Response({'signup': True, 'kakao_jwt': kakao_jwt(kakao_id)})
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        
-    def ensure_user_has_booking_list(self, user):
-        if not Booking.objects.filter(user=user).exists():
-            Booking.objects.create(user=user)
\ No newline at end of file